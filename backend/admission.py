@@ -0,0 +1,213 @@
+"""
+Admission control for LLM-bound work.
+Each worker process lets at most LLM_MAX_IN_FLIGHT Gemini calls run at
+once. Requests beyond that wait in a FIFO queue of at most LLM_MAX_QUEUE
+entries until a slot frees up or their deadline passes; a request that
+finds the queue full, or whose deadline passes while queued, is rejected
+with OverloadedError right away instead of piling onto a provider that
+is already rate limiting us. The same controller serves threads (Flask
+app) and coroutines (async app).
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from metrics import ADMISSION_DECISIONS, increment
+
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+LLM_MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', 8))
+LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', 16))
+# Seconds a request may wait, from its arrival, for its Gemini call to start
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', 5))
+
+_controller = None
+_controller_pid = None
+_controller_lock = threading.Lock()
+
+
+class OverloadedError(Exception):
+    """Raised when a request can't be admitted; retry_after is a suggested wait in seconds."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Server is busy ({reason.replace('_', ' ')}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """A queued request: a thread blocked on an Event or a coroutine awaiting a Future."""
+
+    def __init__(self, loop=None):
+        self.granted = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class Slot:
+    """A granted admission; release() it when the guarded call has finished (repeat calls are ignored)."""
+
+    def __init__(self, controller):
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, deadline-aware FIFO wait queue."""
+
+    def __init__(self, name, limit=LLM_MAX_IN_FLIGHT, max_queue=LLM_MAX_QUEUE, enabled=ADMISSION_ENABLED):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.enabled = enabled
+        self._in_flight = 0
+        self._waiters = deque()
+        self._average_hold = 2.0  # seconds; moving average of slot hold times
+        self._admitted = 0
+        self._rejected = {'queue_full': 0, 'timeout': 0}
+        self._lock = threading.Lock()
+
+    def _retry_after(self):
+        """Suggested seconds before retrying: the time for the current queue to drain."""
+        return max(1, math.ceil(self._average_hold * (len(self._waiters) + 1) / self.limit))
+
+    def _try_enter(self, bounded):
+        """Take a slot or queue a waiter (call with _lock held). Returns None if a slot was taken."""
+        if not self.enabled or (self._in_flight < self.limit and not self._waiters):
+            self._in_flight += 1
+            self._admitted += 1
+            return None
+        if bounded and len(self._waiters) >= self.max_queue:
+            raise self._reject('queue_full')
+        return True
+
+    def _reject(self, reason):
+        self._rejected[reason] += 1
+        increment(ADMISSION_DECISIONS, controller=self.name, decision=f"rejected_{reason}")
+        return OverloadedError(reason, self._retry_after())
+
+    def _abandon(self, waiter):
+        """Take a timed-out or cancelled waiter out of the queue (call with _lock held)."""
+        if waiter.granted:
+            return True
+        self._waiters.remove(waiter)
+        return False
+
+    def acquire(self, deadline=None):
+        """
+        Wait for a slot in the calling thread.
+
+        Args:
+            deadline (float): time.monotonic() by which the slot must be
+                granted; None to wait as long as it takes, without the queue
+                bound (for background work that is bounded elsewhere)
+
+        Returns:
+            Slot: The granted slot
+
+        Raises:
+            OverloadedError: If the queue is full or the deadline passed
+        """
+        with self._lock:
+            if self._try_enter(bounded=deadline is not None) is None:
+                return self._granted()
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        if not waiter.event.wait(timeout):
+            with self._lock:
+                if not self._abandon(waiter):
+                    raise self._reject('timeout')
+        return self._granted()
+
+    async def acquire_async(self, deadline=None):
+        """Async version of acquire: waits on the event loop instead of blocking a thread."""
+        with self._lock:
+            if self._try_enter(bounded=deadline is not None) is None:
+                return self._granted()
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if not self._abandon(waiter):
+                    raise self._reject('timeout')
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = self._abandon(waiter)
+            if granted:
+                # The slot was handed over just as the request went away: pass it on
+                self._release(0)
+            raise
+        return self._granted()
+
+    def _granted(self):
+        increment(ADMISSION_DECISIONS, controller=self.name, decision='admitted')
+        return Slot(self)
+
+    def _release(self, held):
+        with self._lock:
+            if held:
+                self._average_hold += 0.1 * (held - self._average_hold)
+            # Hand the slot straight to the oldest waiter, so newcomers can't overtake the queue
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self._admitted += 1
+                waiter.wake()
+                return
+            self._in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'in_flight': self._in_flight,
+                'queued': len(self._waiters),
+                'limit': self.limit,
+                'max_queue': self.max_queue,
+                'admitted': self._admitted,
+                'rejected': dict(self._rejected)
+            }
+
+
+def get_llm_admission():
+    """Return this worker's admission controller for Gemini calls, recreating it after a fork."""
+    global _controller, _controller_pid
+
+    pid = os.getpid()
+    if _controller is None or _controller_pid != pid:
+        with _controller_lock:
+            if _controller is None or _controller_pid != pid:
+                _controller = AdmissionController('llm')
+                _controller_pid = pid
+
+    return _controller
+
+
+def request_deadline(arrived):
+    """Deadline for a request that arrived at time.monotonic() `arrived` to get its LLM slot."""
+    return arrived + LLM_QUEUE_TIMEOUT
@@ -2,36 +2,23 @@
 AI Resume Analyzer using LangChain + Google Gemini API.
 Extracts skills, weaknesses, and suitable job roles from resume text.
 """
+import asyncio
 import os
 import json
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 
+from incremental_json import IncrementalJSONObject
+from llm_registry import GEMINI_API_ENDPOINT, get_chain, get_llm, get_prompt, warm_up
+from metrics import provider_call
 
-def analyze_resume(resume_text, gemini_api_key):
-    """
-    Analyze resume text using Gemini AI via LangChain.
-    
-    Args:
-        resume_text (str): Extracted text from resume
-        gemini_api_key (str): Google Gemini API key
-        
-    Returns:
-        dict: Analysis containing skills, weaknesses, and job roles
-    """
-    try:
-        # Initialize Gemini model
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=gemini_api_key,
-            temperature=0.3
-        )
-        
-        # Create prompt template
-        prompt_template = PromptTemplate(
-            input_variables=["resume_text"],
-            template="""
+# Bump PROMPT_VERSION whenever ANALYSIS_PROMPT changes so cached analyses
+# produced by the old prompt are no longer served.
+# The JSON keys are ordered so that skills and suitable_roles stream first,
+# letting analyze_resume_streaming start the job search before weaknesses arrive.
+GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_TEMPERATURE = 0.3
+PROMPT_VERSION = "2"
+
+ANALYSIS_PROMPT = """
 You are an expert career counselor and resume analyst. Analyze the following resume and provide a structured JSON response.
 
 Resume Text:
@@ -40,9 +27,9 @@ Resume Text:
 Provide your analysis in the following strict JSON format (no additional text outside JSON):
 {{
     "skills": ["skill1", "skill2", "skill3", ...],
-    "weaknesses": ["weakness1", "weakness2", ...],
     "suitable_roles": ["role1", "role2", "role3", ...],
-    "experience_level": "entry/mid/senior"
+    "experience_level": "entry/mid/senior",
+    "weaknesses": ["weakness1", "weakness2", ...]
 }}
 
 Instructions:
@@ -53,37 +40,176 @@ Instructions:
 
 Return ONLY valid JSON, no markdown or explanations.
 """
-        )
+
+
+def _parse_analysis(response):
+    """Parse the model's JSON answer, removing markdown code blocks if present."""
+    response = response.strip()
+    if response.startswith("```json"):
+        response = response[7:]
+    if response.startswith("```"):
+        response = response[3:]
+    if response.endswith("```"):
+        response = response[:-3]
+    
+    return json.loads(response.strip())
+
+
+def _fallback_analysis(error):
+    """Placeholder analysis returned when the model's JSON can't be parsed."""
+    return {
+        "skills": ["Unable to parse skills - review resume format"],
+        "weaknesses": ["Resume format may need improvement"],
+        "suitable_roles": ["General positions"],
+        "experience_level": "unknown",
+        "error": f"JSON parsing error: {str(error)}"
+    }
+
+
+def warm_up_analyzer(gemini_api_key):
+    """Build this worker's Gemini client and analysis chain before the first request."""
+    warm_up(GEMINI_MODEL, GEMINI_TEMPERATURE, gemini_api_key, ANALYSIS_PROMPT)
+
+
+def analyze_resume(resume_text, gemini_api_key):
+    """
+    Analyze resume text using Gemini AI via LangChain.
+    
+    Args:
+        resume_text (str): Extracted text from resume
+        gemini_api_key (str): Google Gemini API key
         
-        # Create chain
-        chain = LLMChain(llm=llm, prompt=prompt_template)
+    Returns:
+        dict: Analysis containing skills, weaknesses, and job roles
+    """
+    try:
+        # Reuse this worker's Gemini client and chain (built on first use)
+        chain = get_chain(GEMINI_MODEL, GEMINI_TEMPERATURE, gemini_api_key, ANALYSIS_PROMPT)
         
         # Run analysis
-        response = chain.run(resume_text=resume_text)
+        with provider_call('gemini'):
+            response = chain.run(resume_text=resume_text)
+        
+        return _parse_analysis(response)
+    
+    except json.JSONDecodeError as e:
+        return _fallback_analysis(e)
+    
+    except Exception as e:
+        raise Exception(f"Error analyzing resume: {str(e)}")
+
+
+def analyze_resume_streaming(resume_text, gemini_api_key, on_field=None):
+    """
+    Analyze resume text while streaming the Gemini response.
+    
+    The JSON answer is parsed incrementally and on_field is called as soon
+    as each top-level field (skills, suitable_roles, ...) is complete, so
+    callers can start dependent work before the model has finished.
+    
+    Args:
+        resume_text (str): Extracted text from resume
+        gemini_api_key (str): Google Gemini API key
+        on_field (callable): Optional callback(key, value, fields_so_far)
+        
+    Returns:
+        dict: Analysis containing skills, weaknesses, and job roles
+    """
+    try:
+        llm = get_llm(GEMINI_MODEL, GEMINI_TEMPERATURE, gemini_api_key)
+        prompt = get_prompt(ANALYSIS_PROMPT).format(resume_text=resume_text)
+        
+        parser = IncrementalJSONObject()
+        chunks = []
+        
+        with provider_call('gemini'):
+            for chunk in llm.stream(prompt):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                chunks.append(text)
+                for key, value in parser.feed(text):
+                    if on_field:
+                        on_field(key, value, parser.fields)
+        
+        if parser.complete:
+            return parser.fields
+        
+        # The incremental parser gave up (e.g. malformed output); parse the whole answer
+        return _parse_analysis("".join(chunks))
+    
+    except json.JSONDecodeError as e:
+        return _fallback_analysis(e)
+    
+    except Exception as e:
+        raise Exception(f"Error analyzing resume: {str(e)}")
+
+
+async def analyze_resume_async(resume_text, gemini_api_key):
+    """
+    Async version of analyze_resume, using the chain's native async invocation.
+    
+    The Gemini client has no async REST transport, so with a custom
+    GEMINI_API_ENDPOINT (e.g. the benchmark stub) the sync call runs in a thread.
+    
+    Returns:
+        dict: Analysis containing skills, weaknesses, and job roles
+    """
+    if GEMINI_API_ENDPOINT:
+        return await asyncio.to_thread(analyze_resume, resume_text, gemini_api_key)
+    
+    try:
+        chain = get_chain(GEMINI_MODEL, GEMINI_TEMPERATURE, gemini_api_key, ANALYSIS_PROMPT)
+        
+        with provider_call('gemini'):
+            response = await chain.ainvoke({'resume_text': resume_text})
+        
+        return _parse_analysis(response['text'])
+    
+    except json.JSONDecodeError as e:
+        return _fallback_analysis(e)
+    
+    except Exception as e:
+        raise Exception(f"Error analyzing resume: {str(e)}")
+
+
+async def analyze_resume_streaming_async(resume_text, gemini_api_key, on_field=None):
+    """
+    Async version of analyze_resume_streaming; on_field is called from the event loop.
+    
+    Returns:
+        dict: Analysis containing skills, weaknesses, and job roles
+    """
+    if GEMINI_API_ENDPOINT:
+        # No async REST transport (see analyze_resume_async): stream in a thread, call back on the loop
+        loop = asyncio.get_running_loop()
+        
+        def on_field_threadsafe(key, value, fields):
+            if on_field:
+                loop.call_soon_threadsafe(on_field, key, value, dict(fields))
+        
+        return await asyncio.to_thread(analyze_resume_streaming, resume_text, gemini_api_key, on_field_threadsafe)
+    
+    try:
+        llm = get_llm(GEMINI_MODEL, GEMINI_TEMPERATURE, gemini_api_key)
+        prompt = get_prompt(ANALYSIS_PROMPT).format(resume_text=resume_text)
+        
+        parser = IncrementalJSONObject()
+        chunks = []
         
-        # Parse JSON response
-        # Remove markdown code blocks if present
-        response = response.strip()
-        if response.startswith("```json"):
-            response = response[7:]
-        if response.startswith("```"):
-            response = response[3:]
-        if response.endswith("```"):
-            response = response[:-3]
+        with provider_call('gemini'):
+            async for chunk in llm.astream(prompt):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                chunks.append(text)
+                for key, value in parser.feed(text):
+                    if on_field:
+                        on_field(key, value, parser.fields)
         
-        analysis = json.loads(response.strip())
+        if parser.complete:
+            return parser.fields
         
-        return analysis
+        return _parse_analysis("".join(chunks))
     
     except json.JSONDecodeError as e:
-        # Fallback if JSON parsing fails
-        return {
-            "skills": ["Unable to parse skills - review resume format"],
-            "weaknesses": ["Resume format may need improvement"],
-            "suitable_roles": ["General positions"],
-            "experience_level": "unknown",
-            "error": f"JSON parsing error: {str(e)}"
-        }
+        return _fallback_analysis(e)
     
     except Exception as e:
         raise Exception(f"Error analyzing resume: {str(e)}")
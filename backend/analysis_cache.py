@@ -0,0 +1,162 @@
+"""
+Content-addressed cache for resume analysis results.
+Two tiers: an in-process LRU for the current worker and a SQLite table
+shared by all gunicorn workers. Entries expire after a TTL and the
+oldest ones are evicted once a tier is full.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from storage import get_connection
+
+log = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true'
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', 7 * 24 * 3600))  # 7 days
+ANALYSIS_CACHE_MEMORY_ITEMS = int(os.getenv('ANALYSIS_CACHE_MEMORY_ITEMS', 256))
+ANALYSIS_CACHE_MAX_ROWS = int(os.getenv('ANALYSIS_CACHE_MAX_ROWS', 5000))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analysis_cache_last_access ON analysis_cache (last_access);
+"""
+
+
+class _LRUCache:
+    """Small thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_items, ttl):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if time.time() - created_at > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, created_at=None):
+        with self._lock:
+            self._items[key] = (value, created_at or time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+_memory = _LRUCache(ANALYSIS_CACHE_MEMORY_ITEMS, ANALYSIS_CACHE_TTL)
+
+
+def normalize_resume_text(resume_text):
+    """Collapse whitespace so trivially different extractions share a key."""
+    return " ".join(resume_text.split())
+
+
+def make_cache_key(resume_text, model_name, prompt_version):
+    """
+    Build the cache key for an analysis.
+
+    Args:
+        resume_text (str): Text returned by extract_text_from_pdf
+        model_name (str): Gemini model used for the analysis
+        prompt_version (str): Version of the analysis prompt
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{model_name}\n{prompt_version}\n".encode('utf-8'))
+    digest.update(normalize_resume_text(resume_text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def get_cached_analysis(key):
+    """
+    Look up a cached analysis, checking the in-process tier first.
+
+    Args:
+        key (str): Key from make_cache_key
+
+    Returns:
+        dict or None: Cached analysis, or None on a miss
+    """
+    if not ANALYSIS_CACHE_ENABLED:
+        return None
+
+    analysis = _memory.get(key)
+    if analysis is not None:
+        return json.loads(analysis)
+
+    try:
+        conn = get_connection('analysis_cache', _SCHEMA)
+        row = conn.execute(
+            "SELECT value, created_at FROM analysis_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at = row
+        now = time.time()
+        if now - created_at > ANALYSIS_CACHE_TTL:
+            conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+            return None
+
+        conn.execute("UPDATE analysis_cache SET last_access = ? WHERE key = ?", (now, key))
+        _memory.set(key, value, created_at)
+        return json.loads(value)
+
+    except Exception as e:
+        log.warning("Analysis cache read failed: %s", e)
+        return None
+
+
+def store_analysis(key, analysis):
+    """
+    Store an analysis in both cache tiers and evict old entries.
+
+    Args:
+        key (str): Key from make_cache_key
+        analysis (dict): Analysis returned by analyze_resume
+    """
+    if not ANALYSIS_CACHE_ENABLED:
+        return
+
+    value = json.dumps(analysis)
+    now = time.time()
+    _memory.set(key, value, now)
+
+    try:
+        conn = get_connection('analysis_cache', _SCHEMA)
+        conn.execute(
+            "INSERT OR REPLACE INTO analysis_cache (key, value, created_at, last_access) "
+            "VALUES (?, ?, ?, ?)",
+            (key, value, now, now)
+        )
+        conn.execute(
+            "DELETE FROM analysis_cache WHERE created_at < ?", (now - ANALYSIS_CACHE_TTL,)
+        )
+        conn.execute(
+            "DELETE FROM analysis_cache WHERE key IN ("
+            "SELECT key FROM analysis_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (ANALYSIS_CACHE_MAX_ROWS,)
+        )
+
+    except Exception as e:
+        log.warning("Analysis cache write failed: %s", e)
@@ -0,0 +1,242 @@
+"""
+Background analysis jobs with per-stage progress.
+Jobs run on a bounded thread pool inside the worker that accepted them,
+while their status lives in SQLite so any gunicorn worker can answer a
+poll or progress stream for any job.
+
+A worker touches its unfinished jobs every ANALYSIS_JOB_HEARTBEAT
+seconds. If a worker dies (killed at its timeout, OOM, restarted) its
+jobs stop being touched; once ANALYSIS_JOB_STALE_AFTER seconds pass
+without an update, the next read marks such a job failed instead of
+leaving it queued or running forever.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from storage import get_connection
+
+log = logging.getLogger(__name__)
+
+ANALYSIS_JOB_WORKERS = int(os.getenv('ANALYSIS_JOB_WORKERS', 4))
+ANALYSIS_JOB_QUEUE_SIZE = int(os.getenv('ANALYSIS_JOB_QUEUE_SIZE', 32))
+ANALYSIS_JOB_RETENTION = int(os.getenv('ANALYSIS_JOB_RETENTION', 3600))  # seconds
+ANALYSIS_JOB_HEARTBEAT = float(os.getenv('ANALYSIS_JOB_HEARTBEAT', 10))  # seconds
+ANALYSIS_JOB_STALE_AFTER = float(os.getenv('ANALYSIS_JOB_STALE_AFTER', 60))  # seconds without an update
+
+ORPHANED_ERROR = "Analysis was interrupted because its server worker stopped; please resubmit"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    stages TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class QueueFullError(Exception):
+    """Raised when the worker's analysis job queue is full."""
+
+
+_executor = None
+_executor_pid = None
+_pending = 0
+_active = set()  # IDs of this worker's unfinished jobs
+_lock = threading.Lock()
+
+
+def _connection():
+    return get_connection('analysis_jobs', _SCHEMA)
+
+
+def _get_executor():
+    """Return this process's job pool, recreating it after a fork (call with _lock held)."""
+    global _executor, _executor_pid, _pending
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        _executor = ThreadPoolExecutor(max_workers=ANALYSIS_JOB_WORKERS, thread_name_prefix='analysis-job')
+        _executor_pid = pid
+        _pending = 0
+        # Jobs of a parent process don't run here
+        _active.clear()
+        threading.Thread(target=_heartbeat, name='analysis-job-heartbeat', daemon=True).start()
+    return _executor
+
+
+def _heartbeat():
+    """Keep this worker's unfinished jobs fresh, so other workers don't take them for orphans."""
+    while True:
+        time.sleep(ANALYSIS_JOB_HEARTBEAT)
+        with _lock:
+            job_ids = list(_active)
+        if not job_ids:
+            continue
+        try:
+            _connection().execute(
+                f"UPDATE analysis_jobs SET updated_at = ? WHERE status IN ('queued', 'running') "
+                f"AND id IN ({', '.join('?' * len(job_ids))})",
+                (time.time(), *job_ids)
+            )
+        except Exception as e:
+            log.warning("Analysis job heartbeat failed: %s", e)
+
+
+def _update(job_id, stage, status='running', result=None, error=None):
+    conn = _connection()
+    row = conn.execute("SELECT stages FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+    stages = json.loads(row[0]) if row else []
+    now = time.time()
+    stages.append({'stage': stage, 'at': now})
+    conn.execute(
+        "UPDATE analysis_jobs SET status = ?, stage = ?, stages = ?, result = ?, error = ?, updated_at = ? "
+        "WHERE id = ?",
+        (status, stage, json.dumps(stages), json.dumps(result) if result is not None else None, error, now, job_id)
+    )
+
+
+def _run(job_id, fn, args):
+    global _pending
+
+    def progress(stage):
+        _update(job_id, stage)
+
+    try:
+        result = fn(*args, progress=progress)
+        _update(job_id, 'done', status='done', result=result)
+    except Exception as e:
+        log.error("Analysis job failed: %s", e, extra={'job_id': job_id})
+        _update(job_id, 'failed', status='failed', error=str(e))
+    finally:
+        with _lock:
+            _pending -= 1
+            _active.discard(job_id)
+
+
+def submit(fn, *args):
+    """
+    Queue fn(*args, progress=callback) to run in the background.
+
+    fn reports progress by calling progress(stage_name) and returns a
+    JSON-serialisable result.
+
+    Args:
+        fn (callable): Pipeline function to run
+        *args: Positional arguments for fn
+
+    Returns:
+        str: Job ID
+
+    Raises:
+        QueueFullError: If this worker already has ANALYSIS_JOB_QUEUE_SIZE jobs pending
+    """
+    global _pending
+
+    job_id = uuid.uuid4().hex
+    now = time.time()
+
+    with _lock:
+        executor = _get_executor()
+        if _pending >= ANALYSIS_JOB_QUEUE_SIZE:
+            raise QueueFullError("Too many analyses in progress, please retry shortly")
+        _pending += 1
+
+    try:
+        conn = _connection()
+        conn.execute("DELETE FROM analysis_jobs WHERE updated_at < ?", (now - ANALYSIS_JOB_RETENTION,))
+        conn.execute(
+            "INSERT INTO analysis_jobs (id, status, stage, stages, created_at, updated_at) "
+            "VALUES (?, 'queued', 'queued', ?, ?, ?)",
+            (job_id, json.dumps([{'stage': 'queued', 'at': now}]), now, now)
+        )
+        with _lock:
+            _active.add(job_id)
+        executor.submit(_run, job_id, fn, args)
+    except Exception:
+        with _lock:
+            _pending -= 1
+            _active.discard(job_id)
+        raise
+
+    return job_id
+
+
+def get_job(job_id):
+    """
+    Return the current state of a job.
+
+    Args:
+        job_id (str): ID returned by submit
+
+    Returns:
+        dict or None: {'id', 'status', 'stage', 'stages', 'result', 'error'}, or None if unknown
+    """
+    conn = _connection()
+    row = conn.execute(
+        "SELECT status, stage, stages, result, error, updated_at FROM analysis_jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    status, stage, stages, result, error, updated_at = row
+    if status in ('queued', 'running') and updated_at < time.time() - ANALYSIS_JOB_STALE_AFTER:
+        status, stage, stages, error = _fail_orphan(conn, job_id, stages, updated_at)
+    return {
+        'id': job_id,
+        'status': status,
+        'stage': stage,
+        'stages': json.loads(stages),
+        'result': json.loads(result) if result else None,
+        'error': error
+    }
+
+
+def _fail_orphan(conn, job_id, stages, updated_at):
+    """Mark a job whose worker stopped updating it as failed; returns its new status, stage, stages and error."""
+    now = time.time()
+    stages = json.dumps(json.loads(stages) + [{'stage': 'failed', 'at': now}])
+    # Only if nothing (its worker, another reader) updated it since it was read
+    conn.execute(
+        "UPDATE analysis_jobs SET status = 'failed', stage = 'failed', stages = ?, error = ?, updated_at = ? "
+        "WHERE id = ? AND updated_at = ?",
+        (stages, ORPHANED_ERROR, now, job_id, updated_at)
+    )
+    log.warning("Marked orphaned analysis job as failed", extra={'job_id': job_id})
+    return 'failed', 'failed', stages, ORPHANED_ERROR
+
+
+def iter_progress(job_id, poll_interval=0.25, timeout=120):
+    """
+    Yield the job's state each time its stage changes, until it finishes.
+
+    Args:
+        job_id (str): ID returned by submit
+        poll_interval (float): Seconds between status checks
+        timeout (float): Give up after this many seconds
+
+    Yields:
+        dict: Job state as returned by get_job
+    """
+    deadline = time.monotonic() + timeout
+    last_stage = None
+
+    while time.monotonic() < deadline:
+        job = get_job(job_id)
+        if job is None:
+            return
+        if job['stage'] != last_stage:
+            last_stage = job['stage']
+            yield job
+        if job['status'] in ('done', 'failed'):
+            return
+        time.sleep(poll_interval)
@@ -2,20 +2,46 @@
 CareerUp Flask Backend
 Handles resume upload, parsing, AI analysis, and job matching.
 """
+import io
+import json
+import logging
 import os
-from flask import Flask, request, jsonify
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from flask import Flask, Request, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
 
-from resume_parser import extract_text_from_pdf
-from ai_analyzer import analyze_resume
+import metrics
+import pdf_pool
+import structured_logging
+from admission import OverloadedError, get_llm_admission, request_deadline
+from pdf_pool import PDFRejectedError
+from ai_analyzer import analyze_resume, analyze_resume_streaming, warm_up_analyzer, GEMINI_MODEL, PROMPT_VERSION
+from analysis_cache import make_cache_key, get_cached_analysis, store_analysis
 from job_fetcher import fetch_jobs_by_skills
 from job_fetcher_adzuna import fetch_jobs_adzuna
+import job_cache
+import job_index
+import job_pages
+from job_pages import InvalidJobQueryError
+import provider_chain
+import provider_quota
+from provider_chain import ProvidersUnavailableError
+import analysis_jobs
+from skill_extractor import local_analysis, cross_check
+from text_compactor import RESUME_COMPACTION, compact_resume_text, compaction_signature
+from job_search import JOB_FANOUT, build_queries, fan_out
+from batch_analysis import SharedJobSearch, analyze_batch, iter_uploaded_pdfs
 
 # Load environment variables
 load_dotenv()
 
+structured_logging.configure()
+log = logging.getLogger(__name__)
+
 app = Flask(__name__)
 
 # CORS Configuration for production
@@ -35,12 +61,46 @@ CORS(app, resources={
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+BATCH_PATH = '/api/analyze/batch'
+BATCH_MAX_UPLOAD_SIZE = int(os.getenv('BATCH_MAX_UPLOAD_SIZE', 200 * 1024 * 1024))  # 200MB
+
+# 'memory' hands upload bytes straight to PyMuPDF, 'disk' saves them to UPLOAD_FOLDER first
+PDF_INGEST_MODE = os.getenv('PDF_INGEST_MODE', 'memory').lower()
+
+# Stream the Gemini response and start fetching jobs as soon as skills and roles are known
+ANALYSIS_STREAMING = os.getenv('ANALYSIS_STREAMING', 'false').lower() == 'true'
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
-# Create upload folder if it doesn't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+class UploadRequest(Request):
+    """Request that allows a larger body for the batch endpoint."""
+
+    @property
+    def max_content_length(self):
+        if self.path == BATCH_PATH:
+            return BATCH_MAX_UPLOAD_SIZE
+        return super().max_content_length
+
+
+class MemoryUploadRequest(UploadRequest):
+    """Request that keeps uploaded files in memory instead of spooling large ones to a temp file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.path == BATCH_PATH:
+            # Batches can be hundreds of MB; let them spool to temp files as usual
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return io.BytesIO()
+
+
+if PDF_INGEST_MODE == 'memory':
+    # Uploads are capped by MAX_CONTENT_LENGTH, so buffering them in memory is bounded
+    app.request_class = MemoryUploadRequest
+else:
+    app.request_class = UploadRequest
+    # Create upload folder if it doesn't exist
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # API Keys
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -48,12 +108,202 @@ JSEARCH_API_KEY = os.getenv('JSEARCH_API_KEY')
 ADZUNA_APP_ID = os.getenv('ADZUNA_APP_ID')
 ADZUNA_APP_KEY = os.getenv('ADZUNA_APP_KEY')
 
+# Seconds to wait for Gemini before answering from the local skill extractor (0 = wait forever)
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', 0))
+
+# Start the job search from locally extracted skills while Gemini is still running
+LOCAL_SKILL_PREFETCH = os.getenv('LOCAL_SKILL_PREFETCH', 'false').lower() == 'true'
+
+# Shared pool for request-scoped background work (prefetches, Gemini calls with a timeout)
+_background = ThreadPoolExecutor(max_workers=int(os.getenv('BACKGROUND_WORKERS', 16)),
+                                  thread_name_prefix='analysis-bg')
+
+# Build the Gemini client and chain when the worker starts instead of on its first request
+LLM_WARM_UP = os.getenv('LLM_WARM_UP', 'true').lower() == 'true'
+
+# Set when gunicorn.conf.py preloads the app in the master; workers are then warmed up by its post_fork hook
+GUNICORN_PRELOAD = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+
+def _warm_up_llm():
+    try:
+        warm_up_analyzer(GEMINI_API_KEY)
+    except Exception as e:
+        log.warning("LLM warm-up failed: %s", e)
+
+
+def warm_up_worker():
+    """
+    Build this worker's Gemini client and PDF extraction processes in the background.
+    
+    The worker serves requests (e.g. /api/health) right away; the first
+    analysis only waits for whatever isn't ready yet. Must run after the
+    fork: nothing built in a gunicorn master is reused by its workers.
+    """
+    if LLM_WARM_UP and GEMINI_API_KEY:
+        _background.submit(_warm_up_llm)
+    if pdf_pool.PDF_POOL_ENABLED:
+        _background.submit(pdf_pool.warm_up)
+
+
+if not GUNICORN_PRELOAD:
+    warm_up_worker()
+
+
+@app.before_request
+def start_request():
+    """Tag everything logged for this request with its ID (the client's X-Request-ID if it sent one)."""
+    structured_logging.start_request(request.headers.get('X-Request-ID'))
+
+
+@app.after_request
+def add_request_id(response):
+    response.headers['X-Request-ID'] = structured_logging.request_id.get()
+    return response
+
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def read_resume_text(file):
+    """
+    Extract text from an uploaded resume using the configured ingestion mode.
+    
+    Args:
+        file (FileStorage): Uploaded PDF from request.files
+        
+    Returns:
+        str: Extracted resume text
+    """
+    if PDF_INGEST_MODE == 'memory':
+        return pdf_pool.extract_text(file.read())
+    
+    # Prefix with a random ID so concurrent uploads with the same name can't overwrite each other
+    filename = f"{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    file.save(filepath)
+    
+    try:
+        return pdf_pool.extract_text(filepath)
+    finally:
+        os.remove(filepath)
+
+
+def search_providers(skills, job_roles, max_results=15):
+    """
+    Run one live job search over the provider chain: Adzuna first, JSearch as backup.
+    
+    JSearch is called when Adzuna fails, is slow (hedging), has its
+    circuit breaker open or has used up its quota; see provider_chain.
+    When no provider answers, whatever the local job index holds is served.
+    
+    Args:
+        skills (list): Skills extracted from the resume
+        job_roles (list): Suitable job roles; the first one is searched
+        max_results (int): Maximum number of job results
+        
+    Returns:
+        list: Matching job listings (empty if no provider succeeded and nothing is indexed)
+    """
+    providers = []
+    
+    # Use Adzuna as PRIMARY source (real apply links)
+    if ADZUNA_APP_ID and ADZUNA_APP_KEY:
+        providers.append(('adzuna', lambda: fetch_jobs_adzuna(
+            skills,
+            ADZUNA_APP_ID,
+            ADZUNA_APP_KEY,
+            max_results=max_results,
+            job_roles=job_roles
+        )))
+    else:
+        log.info("Adzuna credentials not configured, trying JSearch", extra={'sample': True})
+    
+    if JSEARCH_API_KEY:
+        providers.append(('jsearch', lambda: fetch_jobs_by_skills(
+            skills, 
+            JSEARCH_API_KEY,
+            max_results=max_results,
+            job_roles=job_roles
+        )))
+    
+    if not providers:
+        return []
+    
+    try:
+        return provider_chain.search(providers)
+    except ProvidersUnavailableError as e:
+        log.warning("Job search failed, falling back to the job index: %s", e)
+        return job_index.search_fallback(skills, job_roles, limit=max_results)
+
+
+def fetch_matching_jobs(skills, job_roles):
+    """
+    Fetch jobs for the given skills and roles from the local index, else the live providers.
+    
+    With JOB_FANOUT enabled every suggested role (and the top skills) is
+    searched concurrently and the results are merged; otherwise only the
+    first role is searched.
+    
+    Args:
+        skills (list): Skills extracted from the resume
+        job_roles (list): Suitable job roles from the analysis
+        
+    Returns:
+        list: Matching job listings (empty if no provider succeeded)
+    """
+    # Answer from the local index when it has enough fresh matches
+    indexed = job_index.search_if_enough(skills, job_roles, limit=15)
+    if job_index.JOB_INDEX_ENABLED:
+        metrics.count_cache('job_index', 'miss' if indexed is None else 'hit')
+    if indexed is not None:
+        log.info("Serving jobs from the local job index", extra={'jobs': len(indexed)})
+        return indexed
+    
+    if not JOB_FANOUT:
+        return search_providers(skills, job_roles)
+    
+    queries = build_queries(skills, job_roles)
+    return fan_out(queries, lambda query: search_providers(skills, [query]), max_results=15)
+
+
+def analyze_with_early_job_fetch(resume_text, fetch_jobs=None):
+    """
+    Run the streaming analysis and start the job search while Gemini is still writing.
+    
+    The job search is kicked off once both skills and suitable_roles have
+    streamed in, so it overlaps with the generation of the remaining fields.
+    
+    Args:
+        resume_text (str): Extracted resume text
+        fetch_jobs (callable): Job search function, defaults to fetch_matching_jobs
+        
+    Returns:
+        tuple: (analysis dict, Future of the job list or None if the search never started)
+    """
+    fetch_jobs = fetch_jobs or fetch_matching_jobs
+    executor = ThreadPoolExecutor(max_workers=1)
+    started = {}
+    
+    def on_field(key, value, fields):
+        if 'jobs' in started or 'skills' not in fields or 'suitable_roles' not in fields:
+            return
+        if fields['skills']:
+            log.info("Skills and roles streamed in, starting the job search early")
+            started['jobs'] = executor.submit(structured_logging.in_context(fetch_jobs),
+                                              fields['skills'], fields['suitable_roles'])
+    
+    try:
+        analysis = analyze_resume_streaming(resume_text, GEMINI_API_KEY, on_field=on_field)
+    finally:
+        # Don't wait here: the caller collects the job search result
+        executor.shutdown(wait=False)
+    
+    return analysis, started.get('jobs')
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -62,10 +312,225 @@ def health_check():
         'service': 'CareerUp Backend',
         'gemini_configured': bool(GEMINI_API_KEY),
         'adzuna_configured': bool(ADZUNA_APP_ID and ADZUNA_APP_KEY),
-        'jsearch_configured': bool(JSEARCH_API_KEY)
+        'jsearch_configured': bool(JSEARCH_API_KEY),
+        'job_cache': job_cache.get_stats(),
+        'job_index': job_index.get_stats(),
+        'providers': provider_chain.get_stats(),
+        'quotas': provider_quota.get_stats(),
+        'admission': get_llm_admission().stats(),
+        'logging': structured_logging.get_stats()
     })
 
 
+def analyze_with_timeout(resume_text, cache_key, fetch_jobs, early_job_fetch=True, slot=None):
+    """
+    Run the Gemini analysis, giving up after GEMINI_TIMEOUT seconds.
+    
+    On timeout the call keeps running in the background and its result is
+    cached when it arrives, so a re-upload gets the full analysis.
+    
+    Args:
+        resume_text (str): Extracted resume text
+        cache_key (str): Analysis cache key for this resume
+        fetch_jobs (callable): Job search function for the streaming early kickoff
+        early_job_fetch (bool): Allow the streaming mode to start the job search early
+        slot (Slot): Admission slot released once Gemini answers, even after a timeout
+        
+    Returns:
+        tuple: (analysis dict, Future of the job list or None)
+        
+    Raises:
+        TimeoutError: If Gemini did not answer within GEMINI_TIMEOUT
+    """
+    def analyze():
+        try:
+            if ANALYSIS_STREAMING and early_job_fetch:
+                return analyze_with_early_job_fetch(resume_text, fetch_jobs)
+            return analyze_resume(resume_text, GEMINI_API_KEY), None
+        finally:
+            if slot is not None:
+                slot.release()
+    
+    if GEMINI_TIMEOUT <= 0:
+        return analyze()
+    
+    future = _background.submit(structured_logging.in_context(analyze))
+    try:
+        return future.result(timeout=GEMINI_TIMEOUT)
+    except FuturesTimeoutError:
+        def cache_late_result(done):
+            if done.exception() is None and 'error' not in done.result()[0]:
+                store_analysis(cache_key, done.result()[0])
+        future.add_done_callback(cache_late_result)
+        raise TimeoutError(f"Gemini did not answer within {GEMINI_TIMEOUT:g}s")
+
+
+def _same_primary_role(local, analysis):
+    """Check whether the locally suggested primary role is one Gemini also suggested."""
+    if not local['suitable_roles']:
+        return False
+    primary = local['suitable_roles'][0].lower()
+    return any(role.lower() == primary for role in analysis.get('suitable_roles', []))
+
+
+def get_uploaded_resume():
+    """
+    Validate the 'resume' file in the current request.
+    
+    Returns:
+        tuple: (file, None) if valid, otherwise (None, error response)
+    """
+    # Check if file is present
+    if 'resume' not in request.files:
+        return None, (jsonify({'error': 'No resume file provided'}), 400)
+    
+    file = request.files['resume']
+    
+    if file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not allowed_file(file.filename):
+        return None, (jsonify({'error': 'Only PDF files are allowed'}), 400)
+    
+    return file, None
+
+
+def can_hold_stream():
+    """
+    Check whether this server can keep a long response open.
+
+    A single-threaded worker (gunicorn's default sync worker) would serve
+    nothing else until the stream ends, and is killed at its timeout.
+    """
+    return bool(request.environ.get('wsgi.multithread'))
+
+
+def is_readable_resume(resume_text):
+    """Reject resumes whose extracted text is too short to analyze."""
+    return bool(resume_text) and len(resume_text) >= 50
+
+
+def run_analysis(resume_text, progress=None, fetch_jobs=None, timings=None, admission_deadline=None):
+    """
+    Analyze extracted resume text and fetch matching jobs.
+    
+    Args:
+        resume_text (str): Extracted resume text
+        progress (callable): Optional callback(stage) called after each stage
+        fetch_jobs (callable): Job search function, defaults to fetch_matching_jobs
+        timings (RequestTimings): Collects per-stage durations; a new one is used if omitted
+        admission_deadline (float): time.monotonic() by which the Gemini call
+            must be admitted; None waits for a slot however long it takes
+        
+    Returns:
+        dict: Response payload with analysis, jobs and resume preview
+        
+    Raises:
+        OverloadedError: If the Gemini call was not admitted by admission_deadline
+    """
+    fetch_jobs = fetch_jobs or fetch_matching_jobs
+    timings = timings or metrics.RequestTimings()
+    
+    # Local pre-pass: sub-millisecond skill extraction used for prefetching, fallback and cross-checking
+    with timings.stage('local_skills'):
+        local = local_analysis(resume_text)
+    
+    # Compact the text sent to Gemini (whitespace, repeated headers/footers, token budget)
+    if RESUME_COMPACTION:
+        with timings.stage('compaction'):
+            llm_text, compaction = compact_resume_text(resume_text)
+        log.info("Compacted resume", extra={'tokens_before': compaction['tokens_before'],
+                                            'tokens_after': compaction['tokens_after']})
+    else:
+        llm_text, compaction = resume_text, None
+    
+    # Step 2: Analyze resume with AI (skipped when this resume was analyzed before)
+    cache_key = make_cache_key(resume_text, GEMINI_MODEL, f"{PROMPT_VERSION}/{compaction_signature()}")
+    with timings.stage('analysis_cache'):
+        analysis = get_cached_analysis(cache_key)
+    cache_hit = analysis is not None
+    metrics.count_cache('analysis', 'hit' if cache_hit else 'miss')
+    degraded = False
+    
+    prefetch_future = None
+    if LOCAL_SKILL_PREFETCH and not cache_hit and local['skills']:
+        prefetch_future = _background.submit(structured_logging.in_context(fetch_jobs),
+                                             local['skills'], local['suitable_roles'])
+    
+    jobs_future = None
+    
+    if cache_hit:
+        log.info("Analysis cache hit, skipping the Gemini call")
+    elif not GEMINI_API_KEY:
+        log.warning("Gemini not configured, using local skill extraction")
+        analysis, degraded = local, True
+    else:
+        # Wait for one of this worker's Gemini slots; a rejection fails the request instead of degrading it
+        with timings.stage('admission'):
+            slot = get_llm_admission().acquire(admission_deadline)
+        try:
+            with timings.stage('gemini'):
+                analysis, jobs_future = analyze_with_timeout(
+                    llm_text, cache_key, fetch_jobs, early_job_fetch=prefetch_future is None, slot=slot
+                )
+        except Exception as e:
+            log.warning("Gemini analysis unavailable, using local skill extraction: %s", e)
+            analysis, degraded = local, True
+        
+        if 'error' in analysis:
+            # JSON parse failure: keep the error but replace the placeholder skills and roles
+            analysis, degraded = {**local, 'error': analysis['error']}, True
+        elif not degraded:
+            store_analysis(cache_key, analysis)
+    
+    if progress:
+        progress('analyzed')
+    
+    # Step 3: Fetch matching jobs - use Adzuna API (real apply links for India)
+    # A prefetched or early-started search only counts the time still spent waiting for it
+    with timings.stage('jobs'):
+        if prefetch_future is not None and _same_primary_role(local, analysis):
+            jobs = prefetch_future.result()
+        elif jobs_future is not None:
+            jobs = jobs_future.result()
+        elif analysis.get('skills') and len(analysis['skills']) > 0:
+            jobs = fetch_jobs(analysis['skills'], analysis.get('suitable_roles'))
+        else:
+            jobs = []
+    
+    if progress:
+        progress('jobs_fetched')
+    
+    return {
+        'success': True,
+        'analysis': {
+            'skills': analysis.get('skills', []),
+            'weaknesses': analysis.get('weaknesses', []),
+            'suitable_roles': analysis.get('suitable_roles', []),
+            'experience_level': analysis.get('experience_level', 'unknown')
+        },
+        'jobs': jobs,
+        'cached': cache_hit,
+        'degraded': degraded,
+        'compaction': compaction,
+        'skill_check': cross_check(analysis.get('skills', []), local['skills']),
+        'resume_preview': resume_text[:500] + '...' if len(resume_text) > 500 else resume_text
+    }
+
+
+def run_analysis_job(pdf_bytes, progress):
+    """Background version of /api/analyze: parse, analyze and fetch jobs, reporting each stage."""
+    timings = metrics.RequestTimings()
+    with timings.stage('parse'):
+        resume_text = pdf_pool.extract_text(pdf_bytes)
+    
+    if not is_readable_resume(resume_text):
+        raise Exception('Resume appears to be empty or unreadable')
+    
+    progress('parsed')
+    return run_analysis(resume_text, progress, timings=timings)
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_resume_endpoint():
     """
@@ -73,98 +538,178 @@ def analyze_resume_endpoint():
     
     Expects:
         - 'resume' file in multipart/form-data
+        - optional query parameter timings=true
         
     Returns:
-        - JSON with analysis (skills, weaknesses, suitable_roles) and job matches
+        - JSON with analysis (skills, weaknesses, suitable_roles) and job matches,
+          plus per-stage durations in milliseconds under 'timings' if requested
+        - 503 with Retry-After when too many analyses are waiting for Gemini
     """
+    arrived = time.monotonic()
     try:
-        # Check if file is present
-        if 'resume' not in request.files:
-            return jsonify({'error': 'No resume file provided'}), 400
+        file, error_response = get_uploaded_resume()
+        if error_response:
+            return error_response
         
-        file = request.files['resume']
+        timings = metrics.RequestTimings()
         
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        # Step 1: Extract text from PDF
+        with timings.stage('parse'):
+            resume_text = read_resume_text(file)
         
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Only PDF files are allowed'}), 400
+        if not is_readable_resume(resume_text):
+            return jsonify({'error': 'Resume appears to be empty or unreadable'}), 400
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        result = run_analysis(resume_text, timings=timings, admission_deadline=request_deadline(arrived))
+        if request.args.get('timings', '').lower() in ('1', 'true'):
+            result['timings'] = timings.as_dict()
+        return jsonify(result)
+    
+    except OverloadedError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503, {'Retry-After': str(e.retry_after)}
+    
+    except PDFRejectedError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/jobs', methods=['POST'])
+def jobs_endpoint():
+    """
+    Fetch more jobs for an analysis without uploading the resume again.
+    
+    Expects:
+        - JSON body with 'skills' and 'roles' (or 'suitable_roles') from
+          an analysis, optional 'location', 'employment_type' ('full_time'
+          or 'internship') and 'page_size', and 'cursor' from the previous
+          page to load the next one
         
-        try:
-            # Step 1: Extract text from PDF
-            resume_text = extract_text_from_pdf(filepath)
-            
-            if not resume_text or len(resume_text) < 50:
-                return jsonify({'error': 'Resume appears to be empty or unreadable'}), 400
-            
-            # Step 2: Analyze resume with AI
-            analysis = analyze_resume(resume_text, GEMINI_API_KEY)
-            
-            # Step 3: Fetch matching jobs - use Adzuna API (real apply links for India)
-            jobs = []
-            if analysis.get('skills') and len(analysis['skills']) > 0:
-                # Use Adzuna as PRIMARY source (real apply links)
-                if ADZUNA_APP_ID and ADZUNA_APP_KEY:
-                    try:
-                        print("🔍 Fetching jobs from Adzuna API (India)...")
-                        jobs = fetch_jobs_adzuna(
-                            analysis['skills'],
-                            ADZUNA_APP_ID,
-                            ADZUNA_APP_KEY,
-                            max_results=15,
-                            job_roles=analysis.get('suitable_roles')
-                        )
-                    except Exception as adzuna_error:
-                        print(f"❌ Adzuna API failed: {adzuna_error}")
-                        # Fallback to JSearch if Adzuna fails
-                        if JSEARCH_API_KEY:
-                            try:
-                                print("🔄 Trying JSearch API as backup...")
-                                jobs = fetch_jobs_by_skills(
-                                    analysis['skills'], 
-                                    JSEARCH_API_KEY,
-                                    job_roles=analysis.get('suitable_roles')
-                                )
-                            except Exception as jsearch_error:
-                                print(f"⚠️  JSearch also failed: {jsearch_error}")
-                else:
-                    print("⚠️  Adzuna credentials not configured, trying JSearch...")
-                    if JSEARCH_API_KEY:
-                        try:
-                            jobs = fetch_jobs_by_skills(
-                                analysis['skills'], 
-                                JSEARCH_API_KEY,
-                                job_roles=analysis.get('suitable_roles')
-                            )
-                        except Exception as job_error:
-                            print(f"⚠️  JSearch failed: {job_error}")
-            
-            # Clean up uploaded file
-            os.remove(filepath)
-            
-            # Return combined response
-            return jsonify({
-                'success': True,
-                'analysis': {
-                    'skills': analysis.get('skills', []),
-                    'weaknesses': analysis.get('weaknesses', []),
-                    'suitable_roles': analysis.get('suitable_roles', []),
-                    'experience_level': analysis.get('experience_level', 'unknown')
-                },
-                'jobs': jobs,
-                'resume_preview': resume_text[:500] + '...' if len(resume_text) > 500 else resume_text
-            })
+    Returns:
+        - JSON with the page's jobs, the provider that served them and
+          'next_cursor' (null on the last page)
+    """
+    payload = request.get_json(silent=True)
+    try:
+        query = job_pages.parse_query(payload)
+        with metrics.timer('jobs_page'):
+            page = job_pages.fetch_page(
+                query,
+                cursor=payload.get('cursor'),
+                adzuna_credentials=(ADZUNA_APP_ID, ADZUNA_APP_KEY) if ADZUNA_APP_ID and ADZUNA_APP_KEY else None,
+                jsearch_api_key=JSEARCH_API_KEY
+            )
+        return jsonify({'success': True, **page})
+    
+    except InvalidJobQueryError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except ProvidersUnavailableError as e:
+        return jsonify({
+            'success': False,
+            'error': f"No job provider is available right now: {e}"
+        }), 503
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Stage latency histograms, provider status counters and cache hit ratios.
+    
+    Returns:
+        - Prometheus text exposition, summed over all gunicorn workers
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route(BATCH_PATH, methods=['POST'])
+def analyze_batch_endpoint():
+    """
+    Analyze many resumes in one request.
+    
+    Expects:
+        - 'resumes' files (PDFs) and/or 'archive' zip files of PDFs in multipart/form-data
         
-        except Exception as e:
-            # Clean up file on error
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            raise e
+    Returns:
+        - NDJSON stream with one line per resume (in completion order, tagged
+          with its upload index and filename, with 'jobs_error' if its job
+          search failed) followed by a summary line
+    """
+    if not can_hold_stream():
+        return jsonify({
+            'error': 'Batch analysis needs threaded workers (gunicorn --config gunicorn.conf.py); '
+                     'submit resumes one by one to /api/analyze/jobs instead'
+        }), 503
+    
+    files = request.files.getlist('resumes') + request.files.getlist('archive')
+    if not files:
+        return jsonify({'error': 'No resume files provided'}), 400
+    
+    shared_search = SharedJobSearch(fetch_matching_jobs)
+    
+    def results():
+        total = 0
+        for result in analyze_batch(
+            iter_uploaded_pdfs(files, MAX_FILE_SIZE),
+            lambda resume_text: shared_search.annotate(run_analysis(resume_text, fetch_jobs=shared_search)),
+            readable=is_readable_resume
+        ):
+            total += 1
+            yield json.dumps(result) + "\n"
+        
+        yield json.dumps({
+            'summary': True,
+            'resumes': total,
+            'job_searches': shared_search.searches,
+            'job_searches_reused': shared_search.reused,
+            'job_searches_failed': shared_search.failed
+        }) + "\n"
+    
+    return Response(stream_with_context(results()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/analyze/jobs', methods=['POST'])
+def submit_analysis_job():
+    """
+    Queue a resume analysis and return immediately.
+    
+    Expects:
+        - 'resume' file in multipart/form-data
+        
+    Returns:
+        - 202 with the job ID and the URL to poll its progress, plus the URL
+          to stream it if this server has threads to hold the stream
+    """
+    try:
+        file, error_response = get_uploaded_resume()
+        if error_response:
+            return error_response
+        
+        job_id = analysis_jobs.submit(structured_logging.in_context(run_analysis_job), file.read())
+        
+        body = {'success': True, 'job_id': job_id, 'status_url': f"/api/analyze/jobs/{job_id}"}
+        if can_hold_stream():
+            body['events_url'] = f"/api/analyze/jobs/{job_id}/events"
+        return jsonify(body), 202
+    
+    except analysis_jobs.QueueFullError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503, {'Retry-After': '5'}
     
     except Exception as e:
         return jsonify({
@@ -173,9 +718,59 @@ def analyze_resume_endpoint():
         }), 500
 
 
+@app.route('/api/analyze/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """
+    Poll an analysis job.
+    
+    Returns:
+        - JSON with status (queued/running/done/failed), current stage,
+          stage history, and the /api/analyze payload once done
+    """
+    job = analysis_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify(job)
+
+
+@app.route('/api/analyze/jobs/<job_id>/events', methods=['GET'])
+def stream_analysis_job(job_id):
+    """
+    Stream an analysis job's progress as Server-Sent Events.
+    
+    Each stage change is sent as a 'progress' event; the final event is
+    'done' (with the result) or 'failed', or 'timeout' if the job is still
+    unfinished when the stream gives up (keep polling the job then).
+    Single-threaded workers don't serve streams: poll the job instead.
+    """
+    if not can_hold_stream():
+        return jsonify({
+            'error': 'Progress streams need threaded workers; poll the job instead',
+            'status_url': f"/api/analyze/jobs/{job_id}"
+        }), 501
+    
+    if analysis_jobs.get_job(job_id) is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    
+    def events():
+        job = None
+        for job in analysis_jobs.iter_progress(job_id):
+            event = job['status'] if job['status'] in ('done', 'failed') else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+        
+        if job is None or job['status'] not in ('done', 'failed'):
+            timeout = {'id': job_id, 'status': job['status'] if job else None,
+                       'status_url': f"/api/analyze/jobs/{job_id}"}
+            yield f"event: timeout\ndata: {json.dumps(timeout)}\n\n"
+    
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
 if __name__ == '__main__':
     print("🚀 CareerUp Backend Starting...")
-    print(f"📁 Upload folder: {UPLOAD_FOLDER}")
+    print(f"📁 PDF ingestion mode: {PDF_INGEST_MODE}")
+    print(f"🌊 Streaming analysis: {ANALYSIS_STREAMING}")
+    print(f"🔀 Multi-role job search: {JOB_FANOUT}")
     print(f"🔑 Gemini API configured: {bool(GEMINI_API_KEY)}")
     print(f"🔑 Adzuna API configured: {bool(ADZUNA_APP_ID and ADZUNA_APP_KEY)} (PRIMARY)")
     print(f"🔑 JSearch API configured: {bool(JSEARCH_API_KEY)} (Backup)")
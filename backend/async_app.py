@@ -0,0 +1,486 @@
+"""
+CareerUp async backend (aiohttp).
+Serves the analyze flow from a single event loop per process: Adzuna and
+JSearch are called through aiohttp, Gemini through LangChain's async
+invocation, and PDF parsing, SQLite and other blocking steps run in
+threads. One process handles many concurrent analyses because waiting on
+a provider no longer holds a worker thread.
+
+Run with either of:
+    gunicorn async_app:app --worker-class aiohttp.GunicornWebWorker
+    python async_app.py
+"""
+import asyncio
+import fnmatch
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+import metrics
+import pdf_pool
+import structured_logging
+from admission import OverloadedError, get_llm_admission, request_deadline
+from pdf_pool import PDFRejectedError
+from ai_analyzer import (analyze_resume_async, analyze_resume_streaming_async, warm_up_analyzer,
+                         GEMINI_MODEL, PROMPT_VERSION)
+from analysis_cache import make_cache_key, get_cached_analysis, store_analysis
+from http_client import close_async_session
+from job_fetcher import fetch_jobs_by_skills_async
+from job_fetcher_adzuna import fetch_jobs_adzuna_async
+import job_cache
+import job_index
+import job_pages
+from job_pages import InvalidJobQueryError
+import provider_chain
+import provider_quota
+from provider_chain import ProvidersUnavailableError
+from skill_extractor import local_analysis, cross_check
+from text_compactor import RESUME_COMPACTION, compact_resume_text, compaction_signature
+from job_search import JOB_FANOUT, build_queries, fan_out_async
+
+# Load environment variables
+load_dotenv()
+
+structured_logging.configure()
+log = logging.getLogger(__name__)
+
+# Same origins as the Flask app's CORS configuration
+CORS_ORIGINS = ["http://localhost:3000", "https://*.vercel.app", "https://careerup-navy.vercel.app"]
+
+ALLOWED_EXTENSIONS = {'pdf'}
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+ANALYSIS_STREAMING = os.getenv('ANALYSIS_STREAMING', 'false').lower() == 'true'
+
+# API Keys
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+JSEARCH_API_KEY = os.getenv('JSEARCH_API_KEY')
+ADZUNA_APP_ID = os.getenv('ADZUNA_APP_ID')
+ADZUNA_APP_KEY = os.getenv('ADZUNA_APP_KEY')
+
+# Seconds to wait for Gemini before answering from the local skill extractor (0 = wait forever)
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', 0))
+
+# Start the job search from locally extracted skills while Gemini is still running
+LOCAL_SKILL_PREFETCH = os.getenv('LOCAL_SKILL_PREFETCH', 'false').lower() == 'true'
+
+LLM_WARM_UP = os.getenv('LLM_WARM_UP', 'true').lower() == 'true'
+
+# Threads for blocking steps (PDF hand-off, SQLite, sync Gemini fallback); asyncio's default is cpu_count + 4
+ASYNC_BLOCKING_THREADS = int(os.getenv('ASYNC_BLOCKING_THREADS', 64))
+
+# Tasks that outlive their request (late Gemini answers); referenced so they aren't garbage-collected
+_background_tasks = set()
+
+
+def _keep(task):
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def allowed_file(filename):
+    """Check if file extension is allowed."""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def is_readable_resume(resume_text):
+    """Reject resumes whose extracted text is too short to analyze."""
+    return bool(resume_text) and len(resume_text) >= 50
+
+
+def _same_primary_role(local, analysis):
+    """Check whether the locally suggested primary role is one Gemini also suggested."""
+    if not local['suitable_roles']:
+        return False
+    primary = local['suitable_roles'][0].lower()
+    return any(role.lower() == primary for role in analysis.get('suitable_roles', []))
+
+
+async def search_providers(skills, job_roles, max_results=15):
+    """
+    Run one live job search over the provider chain: Adzuna first, JSearch as backup.
+
+    Returns:
+        list: Matching job listings (empty if no provider succeeded)
+    """
+    providers = []
+
+    if ADZUNA_APP_ID and ADZUNA_APP_KEY:
+        providers.append(('adzuna', lambda: fetch_jobs_adzuna_async(
+            skills,
+            ADZUNA_APP_ID,
+            ADZUNA_APP_KEY,
+            max_results=max_results,
+            job_roles=job_roles
+        )))
+    else:
+        log.info("Adzuna credentials not configured, trying JSearch", extra={'sample': True})
+
+    if JSEARCH_API_KEY:
+        providers.append(('jsearch', lambda: fetch_jobs_by_skills_async(
+            skills,
+            JSEARCH_API_KEY,
+            max_results=max_results,
+            job_roles=job_roles
+        )))
+
+    if not providers:
+        return []
+
+    try:
+        return await provider_chain.search_async(providers)
+    except ProvidersUnavailableError as e:
+        log.warning("Job search failed, falling back to the job index: %s", e)
+        return await asyncio.to_thread(job_index.search_fallback, skills, job_roles, max_results)
+
+
+async def fetch_matching_jobs(skills, job_roles):
+    """
+    Fetch jobs for the given skills and roles from the local index, else the live providers.
+
+    Returns:
+        list: Matching job listings (empty if no provider succeeded)
+    """
+    indexed = await asyncio.to_thread(job_index.search_if_enough, skills, job_roles, 15)
+    if job_index.JOB_INDEX_ENABLED:
+        metrics.count_cache('job_index', 'miss' if indexed is None else 'hit')
+    if indexed is not None:
+        log.info("Serving jobs from the local job index", extra={'jobs': len(indexed)})
+        return indexed
+
+    if not JOB_FANOUT:
+        return await search_providers(skills, job_roles)
+
+    queries = build_queries(skills, job_roles)
+    return await fan_out_async(queries, lambda query: search_providers(skills, [query]), max_results=15)
+
+
+async def analyze_with_early_job_fetch(resume_text):
+    """
+    Run the streaming analysis and start the job search as soon as skills and roles are in.
+
+    Returns:
+        tuple: (analysis dict, Task of the job list or None if the search never started)
+    """
+    started = {}
+
+    def on_field(key, value, fields):
+        if 'jobs' in started or 'skills' not in fields or 'suitable_roles' not in fields:
+            return
+        if fields['skills']:
+            log.info("Skills and roles streamed in, starting the job search early")
+            started['jobs'] = asyncio.ensure_future(fetch_matching_jobs(fields['skills'], fields['suitable_roles']))
+
+    analysis = await analyze_resume_streaming_async(resume_text, GEMINI_API_KEY, on_field=on_field)
+    return analysis, started.get('jobs')
+
+
+async def analyze_with_timeout(resume_text, cache_key, early_job_fetch=True, slot=None):
+    """
+    Run the Gemini analysis, giving up after GEMINI_TIMEOUT seconds.
+
+    On timeout the call keeps running and its result is cached when it
+    arrives; the admission slot is released only then.
+
+    Returns:
+        tuple: (analysis dict, Task of the job list or None)
+
+    Raises:
+        TimeoutError: If Gemini did not answer within GEMINI_TIMEOUT
+    """
+    async def analyze():
+        try:
+            if ANALYSIS_STREAMING and early_job_fetch:
+                return await analyze_with_early_job_fetch(resume_text)
+            return await analyze_resume_async(resume_text, GEMINI_API_KEY), None
+        finally:
+            if slot is not None:
+                slot.release()
+
+    if GEMINI_TIMEOUT <= 0:
+        return await analyze()
+
+    task = asyncio.ensure_future(analyze())
+    done, _ = await asyncio.wait({task}, timeout=GEMINI_TIMEOUT)
+    if task in done:
+        return task.result()
+
+    def cache_late_result(finished):
+        if not finished.cancelled() and finished.exception() is None and 'error' not in finished.result()[0]:
+            store_analysis(cache_key, finished.result()[0])
+    task.add_done_callback(cache_late_result)
+    _keep(task)
+    raise TimeoutError(f"Gemini did not answer within {GEMINI_TIMEOUT:g}s")
+
+
+async def run_analysis(resume_text, timings, admission_deadline=None):
+    """
+    Analyze extracted resume text and fetch matching jobs.
+
+    Args:
+        resume_text (str): Extracted resume text
+        timings (RequestTimings): Collects per-stage durations
+        admission_deadline (float): time.monotonic() by which the Gemini call
+            must be admitted; None waits for a slot however long it takes
+
+    Returns:
+        dict: Same payload as the Flask app's /api/analyze
+
+    Raises:
+        OverloadedError: If the Gemini call was not admitted by admission_deadline
+    """
+    with timings.stage('local_skills'):
+        local = local_analysis(resume_text)
+
+    if RESUME_COMPACTION:
+        with timings.stage('compaction'):
+            llm_text, compaction = compact_resume_text(resume_text)
+    else:
+        llm_text, compaction = resume_text, None
+
+    cache_key = make_cache_key(resume_text, GEMINI_MODEL, f"{PROMPT_VERSION}/{compaction_signature()}")
+    with timings.stage('analysis_cache'):
+        analysis = await asyncio.to_thread(get_cached_analysis, cache_key)
+    cache_hit = analysis is not None
+    metrics.count_cache('analysis', 'hit' if cache_hit else 'miss')
+    degraded = False
+
+    prefetch_task = None
+    if LOCAL_SKILL_PREFETCH and not cache_hit and local['skills']:
+        prefetch_task = asyncio.ensure_future(fetch_matching_jobs(local['skills'], local['suitable_roles']))
+
+    jobs_task = None
+
+    if cache_hit:
+        log.info("Analysis cache hit, skipping the Gemini call")
+    elif not GEMINI_API_KEY:
+        log.warning("Gemini not configured, using local skill extraction")
+        analysis, degraded = local, True
+    else:
+        with timings.stage('admission'):
+            slot = await get_llm_admission().acquire_async(admission_deadline)
+        try:
+            with timings.stage('gemini'):
+                analysis, jobs_task = await analyze_with_timeout(
+                    llm_text, cache_key, early_job_fetch=prefetch_task is None, slot=slot
+                )
+        except Exception as e:
+            log.warning("Gemini analysis unavailable, using local skill extraction: %s", e)
+            analysis, degraded = local, True
+
+        if 'error' in analysis:
+            analysis, degraded = {**local, 'error': analysis['error']}, True
+        elif not degraded:
+            await asyncio.to_thread(store_analysis, cache_key, analysis)
+
+    with timings.stage('jobs'):
+        if prefetch_task is not None and _same_primary_role(local, analysis):
+            jobs = await prefetch_task
+        elif jobs_task is not None:
+            jobs = await jobs_task
+        elif analysis.get('skills') and len(analysis['skills']) > 0:
+            jobs = await fetch_matching_jobs(analysis['skills'], analysis.get('suitable_roles'))
+        else:
+            jobs = []
+
+    return {
+        'success': True,
+        'analysis': {
+            'skills': analysis.get('skills', []),
+            'weaknesses': analysis.get('weaknesses', []),
+            'suitable_roles': analysis.get('suitable_roles', []),
+            'experience_level': analysis.get('experience_level', 'unknown')
+        },
+        'jobs': jobs,
+        'cached': cache_hit,
+        'degraded': degraded,
+        'compaction': compaction,
+        'skill_check': cross_check(analysis.get('skills', []), local['skills']),
+        'resume_preview': resume_text[:500] + '...' if len(resume_text) > 500 else resume_text
+    }
+
+
+async def health_check(request):
+    """Health check endpoint."""
+    return web.json_response({
+        'status': 'healthy',
+        'service': 'CareerUp Backend (async)',
+        'gemini_configured': bool(GEMINI_API_KEY),
+        'adzuna_configured': bool(ADZUNA_APP_ID and ADZUNA_APP_KEY),
+        'jsearch_configured': bool(JSEARCH_API_KEY),
+        'job_cache': await asyncio.to_thread(job_cache.get_stats),
+        'job_index': await asyncio.to_thread(job_index.get_stats),
+        'providers': provider_chain.get_stats(),
+        'quotas': await asyncio.to_thread(provider_quota.get_stats),
+        'admission': get_llm_admission().stats(),
+        'logging': structured_logging.get_stats()
+    })
+
+
+async def analyze_resume_endpoint(request):
+    """
+    Upload a resume, analyze it, and fetch matching jobs (same contract as the Flask app).
+
+    Expects:
+        - 'resume' file in multipart/form-data
+        - optional query parameter timings=true
+    """
+    arrived = time.monotonic()
+    try:
+        form = await request.post()
+        file = form.get('resume')
+        if file is None or not hasattr(file, 'file'):
+            return web.json_response({'error': 'No resume file provided'}, status=400)
+        if not file.filename:
+            return web.json_response({'error': 'No file selected'}, status=400)
+        if not allowed_file(file.filename):
+            return web.json_response({'error': 'Only PDF files are allowed'}, status=400)
+
+        timings = metrics.RequestTimings()
+
+        with timings.stage('parse'):
+            resume_text = await asyncio.to_thread(pdf_pool.extract_text, file.file.read())
+
+        if not is_readable_resume(resume_text):
+            return web.json_response({'error': 'Resume appears to be empty or unreadable'}, status=400)
+
+        result = await run_analysis(resume_text, timings, admission_deadline=request_deadline(arrived))
+        if request.query.get('timings', '').lower() in ('1', 'true'):
+            result['timings'] = timings.as_dict()
+        return web.json_response(result)
+
+    except web.HTTPRequestEntityTooLarge:
+        raise
+
+    except OverloadedError as e:
+        return web.json_response({'success': False, 'error': str(e)}, status=503,
+                                 headers={'Retry-After': str(e.retry_after)})
+
+    except PDFRejectedError as e:
+        return web.json_response({'success': False, 'error': str(e)}, status=422)
+
+    except Exception as e:
+        return web.json_response({'success': False, 'error': str(e)}, status=500)
+
+
+async def jobs_endpoint(request):
+    """
+    Fetch more jobs for an analysis without uploading the resume again (same contract as the Flask app).
+
+    Paging runs on the sync fetchers in a thread.
+    """
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None
+    try:
+        query = job_pages.parse_query(payload)
+        with metrics.timer('jobs_page'):
+            page = await asyncio.to_thread(
+                job_pages.fetch_page,
+                query,
+                payload.get('cursor'),
+                (ADZUNA_APP_ID, ADZUNA_APP_KEY) if ADZUNA_APP_ID and ADZUNA_APP_KEY else None,
+                JSEARCH_API_KEY
+            )
+        return web.json_response({'success': True, **page})
+
+    except InvalidJobQueryError as e:
+        return web.json_response({'error': str(e)}, status=400)
+
+    except ProvidersUnavailableError as e:
+        return web.json_response(
+            {'success': False, 'error': f"No job provider is available right now: {e}"}, status=503
+        )
+
+    except Exception as e:
+        return web.json_response({'success': False, 'error': str(e)}, status=500)
+
+
+async def metrics_endpoint(request):
+    """Stage latency histograms, provider counters and cache hit ratios in Prometheus format."""
+    return web.Response(text=await asyncio.to_thread(metrics.render), content_type='text/plain')
+
+
+def _allowed_origin(origin):
+    return any(fnmatch.fnmatchcase(origin, pattern) for pattern in CORS_ORIGINS)
+
+
+@web.middleware
+async def request_id_middleware(request, handler):
+    """Tag everything logged for this request with its ID (the client's X-Request-ID if it sent one)."""
+    request_id = structured_logging.start_request(request.headers.get('X-Request-ID'))
+    response = await handler(request)
+    response.headers['X-Request-ID'] = request_id
+    return response
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    origin = request.headers.get('Origin')
+    if request.method == 'OPTIONS' and origin:
+        response = web.Response()
+    else:
+        response = await handler(request)
+    if origin and _allowed_origin(origin):
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.headers['Vary'] = 'Origin'
+    return response
+
+
+def _warm_up_llm():
+    try:
+        warm_up_analyzer(GEMINI_API_KEY)
+    except Exception as e:
+        log.warning("LLM warm-up failed: %s", e)
+
+
+async def _on_startup(app):
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=ASYNC_BLOCKING_THREADS, thread_name_prefix='async-blocking')
+    )
+
+    # Build the Gemini client and start the PDF pool after the worker has forked,
+    # in threads so the worker starts serving (e.g. /api/health) right away
+    if LLM_WARM_UP and GEMINI_API_KEY:
+        _keep(asyncio.ensure_future(asyncio.to_thread(_warm_up_llm)))
+    if pdf_pool.PDF_POOL_ENABLED:
+        _keep(asyncio.ensure_future(asyncio.to_thread(pdf_pool.warm_up)))
+
+
+async def _on_cleanup(app):
+    await close_async_session()
+
+
+def create_app():
+    """Build the aiohttp application."""
+    app = web.Application(middlewares=[request_id_middleware, cors_middleware], client_max_size=MAX_FILE_SIZE)
+    app.router.add_get('/api/health', health_check)
+    app.router.add_post('/api/analyze', analyze_resume_endpoint)
+    app.router.add_post('/api/jobs', jobs_endpoint)
+    app.router.add_get('/api/metrics', metrics_endpoint)
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+app = create_app()
+
+
+if __name__ == '__main__':
+    print("🚀 CareerUp async backend starting...")
+    print(f"🌊 Streaming analysis: {ANALYSIS_STREAMING}")
+    print(f"🔀 Multi-role job search: {JOB_FANOUT}")
+    print(f"🔑 Gemini API configured: {bool(GEMINI_API_KEY)}")
+    print(f"🔑 Adzuna API configured: {bool(ADZUNA_APP_ID and ADZUNA_APP_KEY)} (PRIMARY)")
+    print(f"🔑 JSearch API configured: {bool(JSEARCH_API_KEY)} (Backup)")
+
+    port = int(os.environ.get('PORT', 5000))
+    web.run_app(app, host='0.0.0.0', port=port)
@@ -0,0 +1,221 @@
+"""
+Bulk resume analysis for placement-cell uploads.
+PDFs (or PDFs inside a zip) are parsed on a thread pool, analyzed with a
+bounded number of concurrent Gemini calls, and resumes that share a
+primary role share a single job search. Results are yielded one resume
+at a time as they finish, with a bounded number of resumes in flight so
+memory does not grow with the size of the batch.
+"""
+import logging
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import metrics
+import pdf_pool
+
+BATCH_PARSE_WORKERS = int(os.getenv('BATCH_PARSE_WORKERS', 4))
+BATCH_ANALYSIS_CONCURRENCY = int(os.getenv('BATCH_ANALYSIS_CONCURRENCY', 4))
+BATCH_MAX_IN_FLIGHT = int(os.getenv('BATCH_MAX_IN_FLIGHT', 16))
+BATCH_MAX_RESUMES = int(os.getenv('BATCH_MAX_RESUMES', 500))
+
+log = logging.getLogger(__name__)
+
+
+def iter_uploaded_pdfs(files, max_file_size):
+    """
+    Yield (filename, pdf_bytes or None, error) for uploaded PDFs and zip archives.
+
+    Files are read one at a time, so only the resumes currently in flight
+    are held in memory.
+
+    Args:
+        files (list): FileStorage objects from request.files
+        max_file_size (int): Largest single PDF accepted, in bytes
+
+    Yields:
+        tuple: (filename, bytes, None) for a PDF, or (filename, None, error message)
+    """
+    count = 0
+    for file in files:
+        name = file.filename or ''
+        lower = name.lower()
+
+        if lower.endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(file.stream)
+            except zipfile.BadZipFile:
+                yield name, None, 'Not a valid zip file'
+                continue
+
+            with archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+                        continue
+                    count += 1
+                    if count > BATCH_MAX_RESUMES:
+                        yield info.filename, None, f'Batch limit of {BATCH_MAX_RESUMES} resumes reached'
+                        return
+                    if info.file_size > max_file_size:
+                        yield info.filename, None, 'File too large'
+                        continue
+                    try:
+                        data = archive.read(info)
+                    except Exception as e:
+                        # A corrupt or encrypted member fails only itself, not the rest of the batch
+                        yield info.filename, None, f'Could not read this file from the zip: {e}'
+                        continue
+                    yield info.filename, data, None
+
+        elif lower.endswith('.pdf'):
+            count += 1
+            if count > BATCH_MAX_RESUMES:
+                yield name, None, f'Batch limit of {BATCH_MAX_RESUMES} resumes reached'
+                return
+            data = file.read()
+            if len(data) > max_file_size:
+                yield name, None, 'File too large'
+                continue
+            yield name, data, None
+
+        else:
+            yield name, None, 'Only PDF or zip files are allowed'
+
+
+class SharedJobSearch:
+    """
+    Deduplicate job searches across the resumes of one batch.
+
+    Resumes whose primary role (or top skill when no role is given) match
+    reuse the same in-flight or finished search. A failed search gives
+    every resume sharing it an empty job list, and annotate() flags their
+    results with the error instead of leaving them looking like a search
+    that found nothing.
+    """
+
+    def __init__(self, fetch_jobs):
+        self._fetch_jobs = fetch_jobs
+        self._results = {}
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.reused = 0
+        self.failed = 0
+
+    @staticmethod
+    def _key(skills, job_roles):
+        primary = job_roles[0] if job_roles else (skills[0] if skills else '')
+        return " ".join(primary.lower().split())
+
+    def __call__(self, skills, job_roles):
+        key = self._key(skills, job_roles)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                entry = {'event': threading.Event(), 'jobs': [], 'error': None}
+                self._results[key] = entry
+                self.searches += 1
+                owner = True
+            else:
+                self.reused += 1
+                owner = False
+
+        if owner:
+            try:
+                entry['jobs'] = self._fetch_jobs(skills, job_roles)
+            except Exception as e:
+                log.warning("Shared job search failed: %s", e, extra={'role': key})
+                entry['error'] = f"Job search failed: {e}"
+                with self._lock:
+                    self.failed += 1
+            finally:
+                entry['event'].set()
+        else:
+            entry['event'].wait()
+
+        return list(entry['jobs'])
+
+    def annotate(self, result):
+        """
+        Add 'jobs_error' to a resume's result if the search it shared failed.
+
+        Args:
+            result (dict): Per-resume payload with the 'analysis' the search was keyed on
+
+        Returns:
+            dict: The same result
+        """
+        analysis = result.get('analysis') or {}
+        with self._lock:
+            entry = self._results.get(self._key(analysis.get('skills') or [], analysis.get('suitable_roles') or []))
+        if entry is not None and entry['error']:
+            result['jobs_error'] = entry['error']
+        return result
+
+
+def analyze_batch(pdfs, analyze, readable=lambda text: bool(text)):
+    """
+    Parse and analyze many resumes concurrently, yielding each result as it finishes.
+
+    Args:
+        pdfs (iterable): (filename, bytes, error) tuples from iter_uploaded_pdfs
+        analyze (callable): analyze(resume_text) returning the per-resume payload
+        readable (callable): readable(resume_text) rejecting unusable extractions
+
+    Yields:
+        dict: {'index', 'filename', 'success', ...payload or 'error'}
+    """
+    parse_pool = ThreadPoolExecutor(max_workers=BATCH_PARSE_WORKERS, thread_name_prefix='batch-parse')
+    analysis_pool = ThreadPoolExecutor(max_workers=BATCH_ANALYSIS_CONCURRENCY, thread_name_prefix='batch-analyze')
+
+    def process(index, filename, data):
+        # Parsing runs on the parse pool; the analysis step is handed to the smaller analysis pool
+        try:
+            with metrics.timer('parse'):
+                resume_text = pdf_pool.extract_text(data)
+            if not readable(resume_text):
+                return {'index': index, 'filename': filename, 'success': False,
+                        'error': 'Resume appears to be empty or unreadable'}
+        except Exception as e:
+            return {'index': index, 'filename': filename, 'success': False, 'error': str(e)}
+
+        return analysis_pool.submit(run_analysis_step, index, filename, resume_text)
+
+    def run_analysis_step(index, filename, resume_text):
+        try:
+            result = analyze(resume_text)
+            return {'index': index, 'filename': filename, **result}
+        except Exception as e:
+            return {'index': index, 'filename': filename, 'success': False, 'error': str(e)}
+
+    in_flight = set()
+    try:
+        for index, (filename, data, error) in enumerate(pdfs):
+            if error:
+                yield {'index': index, 'filename': filename, 'success': False, 'error': error}
+                continue
+
+            in_flight.add(parse_pool.submit(process, index, filename, data))
+
+            while len(in_flight) >= BATCH_MAX_IN_FLIGHT:
+                yield from _drain(in_flight, in_flight_limit=BATCH_MAX_IN_FLIGHT - 1)
+
+        yield from _drain(in_flight, in_flight_limit=0)
+
+    finally:
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+        analysis_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _drain(in_flight, in_flight_limit):
+    """Yield finished results until at most in_flight_limit resumes are still running."""
+    while len(in_flight) > in_flight_limit:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_flight.discard(future)
+            result = future.result()
+            if isinstance(result, Future):
+                # Parsing finished and the analysis step was queued; track that instead
+                in_flight.add(result)
+            else:
+                yield result
@@ -0,0 +1,4 @@
+"""
+Local benchmarks for the CareerUp backend.
+Run them from the backend directory, e.g. `python -m benchmarks.bench_http_pool`.
+"""
@@ -0,0 +1,211 @@
+"""
+End-to-end load test of POST /api/analyze, fully offline.
+Starts the provider stubs (Gemini, Adzuna, JSearch stand-ins) and the
+app under gunicorn with a scratch data directory, uploads synthetic
+resumes at the given concurrency and reports throughput plus
+p50/p95/p99 for the whole request (as seen by the client) and for every
+stage reported in the response's 'timings' block.
+
+The analysis cache, job cache and job index are disabled by default so
+every request exercises the full path; pass --warm-caches to keep them.
+The Adzuna quota is off too, or the stub would stop being called after
+the first few analyses. Extra backend settings can be passed as --env NAME=VALUE.
+
+--server async runs async_app under gunicorn's aiohttp worker instead
+of the Flask app (--threads is then ignored).
+
+To see admission control shed load, cap the Gemini stub's capacity and
+send more concurrent analyses than it can serve; 503 answers are
+reported separately from the successful ones.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_analyze_e2e --requests 200 --concurrency 16 --workers 2 --threads 8
+    python -m benchmarks.bench_analyze_e2e --requests 200 --concurrency 64 --workers 1 --server async
+    python -m benchmarks.bench_analyze_e2e --gemini-latency 4000 --adzuna-error-rate 0.1 --env ANALYSIS_STREAMING=true
+    python -m benchmarks.bench_analyze_e2e --server async --workers 1 --concurrency 48 --gemini-capacity 8 \
+        --env LLM_MAX_IN_FLIGHT=8 --env LLM_MAX_QUEUE=8 --env LLM_QUEUE_TIMEOUT=3
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.provider_stubs import add_stub_arguments
+from benchmarks.resume_pdfs import make_resume_set
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before it was ready")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def _stub_command(args, port):
+    command = [sys.executable, '-m', 'benchmarks.provider_stubs', '--port', str(port)]
+    for name, value in vars(args).items():
+        if name.split('_')[0] in ('gemini', 'adzuna', 'jsearch') or name == 'description_chars':
+            command += [f"--{name.replace('_', '-')}", str(value)]
+    return command
+
+
+def _backend_env(args, stub_url, data_dir):
+    env = dict(os.environ)
+    env.update({
+        'GEMINI_API_KEY': 'benchmark-key',
+        'GEMINI_API_ENDPOINT': stub_url,
+        'ADZUNA_APP_ID': 'benchmark',
+        'ADZUNA_APP_KEY': 'benchmark',
+        'ADZUNA_SEARCH_URL': f"{stub_url}/v1/api/jobs/in/search",
+        'JSEARCH_API_KEY': 'benchmark-key',
+        'JSEARCH_SEARCH_URL': f"{stub_url}/search",
+        'CAREERUP_DATA_DIR': data_dir,
+        'PROVIDER_QUOTA_ENABLED': 'false',
+    })
+    if not args.warm_caches:
+        env.update({'ANALYSIS_CACHE_ENABLED': 'false', 'JOB_CACHE_ENABLED': 'false', 'JOB_INDEX_ENABLED': 'false'})
+    for setting in args.env:
+        name, _, value = setting.partition('=')
+        env[name] = value
+    return env
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def _report(label, samples):
+    if not samples:
+        return
+    print(f"{label:<16} n={len(samples):<5} p50 {_percentile(samples, 0.5):8.1f} ms   "
+          f"p95 {_percentile(samples, 0.95):8.1f} ms   p99 {_percentile(samples, 0.99):8.1f} ms")
+
+
+def drive(url, resumes, total, concurrency):
+    """
+    Upload resumes round-robin to /api/analyze from `concurrency` threads.
+
+    Returns:
+        tuple: (elapsed seconds, client latencies in ms, list of timings dicts, {status: count},
+            latencies in ms of the 503 answers)
+    """
+    latencies, timings, statuses, rejected = [], [], {}, []
+    sessions = {}
+
+    def one(index):
+        session = sessions.setdefault(index % concurrency, requests.Session())
+        filename, _, data = resumes[index % len(resumes)]
+        start = time.perf_counter()
+        try:
+            response = session.post(url, files={'resume': (filename, data, 'application/pdf')}, timeout=120)
+            status = response.status_code
+            body = response.json() if response.headers.get('Content-Type', '').startswith('application/json') else {}
+        except requests.exceptions.RequestException as e:
+            status, body = type(e).__name__, {}
+        elapsed = (time.perf_counter() - start) * 1000
+
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            latencies.append(elapsed)
+            if 'timings' in body:
+                timings.append(body['timings'])
+        elif status == 503:
+            rejected.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return time.perf_counter() - start, latencies, timings, statuses, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=4, help='untimed requests sent first')
+    parser.add_argument('--resumes', type=int, default=40, help='distinct synthetic resumes')
+    parser.add_argument('--max-pages', type=int, default=4, help='resumes have 1..max-pages pages')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per gunicorn worker')
+    parser.add_argument('--server', choices=['flask', 'async'], default='flask',
+                        help='app.py under gthread workers, or async_app.py under aiohttp workers')
+    parser.add_argument('--warm-caches', action='store_true', help='keep the analysis/job caches and job index on')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='extra environment for the backend (repeatable)')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    resumes = make_resume_set(args.resumes, args.max_pages)
+    stub_port, app_port = _free_port(), _free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    processes = []
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        try:
+            stubs = subprocess.Popen(_stub_command(args, stub_port), cwd=BACKEND_DIR, stdout=subprocess.DEVNULL)
+            processes.append(stubs)
+            _wait_until_up(stub_url, stubs)
+
+            if args.server == 'async':
+                server_args = ['async_app:app', '--worker-class', 'aiohttp.GunicornWebWorker']
+            else:
+                server_args = ['app:app', '--threads', str(args.threads)]
+            backend = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', *server_args, '--bind', f"127.0.0.1:{app_port}",
+                 '--workers', str(args.workers), '--timeout', '120', '--log-level', 'warning'],
+                cwd=BACKEND_DIR, env=_backend_env(args, stub_url, data_dir),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            processes.append(backend)
+            _wait_until_up(f"{app_url}/api/health", backend)
+
+            analyze_url = f"{app_url}/api/analyze?timings=true"
+            if args.warmup:
+                drive(analyze_url, resumes, args.warmup, min(args.concurrency, args.warmup))
+
+            layout = f"{args.workers} async workers" if args.server == 'async' else f"{args.workers}x{args.threads}"
+            print(f"{args.requests} requests, concurrency {args.concurrency}, gunicorn {layout}, "
+                  f"{len(resumes)} resumes of 1-{args.max_pages} pages, caches {'on' if args.warm_caches else 'off'}")
+            print(f"stub latency: gemini {args.gemini_latency:g} ms, adzuna {args.adzuna_latency:g} ms, "
+                  f"jsearch {args.jsearch_latency:g} ms\n")
+
+            elapsed, latencies, timings, statuses, rejected = drive(analyze_url, resumes, args.requests, args.concurrency)
+
+            print(f"throughput       {len(latencies) / elapsed:8.2f} req/s   ({elapsed:.1f} s, statuses {statuses})")
+            _report('request', latencies)
+            _report('rejected (503)', rejected)
+            stages = sorted({stage for timing in timings for stage in timing if stage != 'total'})
+            for stage in stages:
+                _report(stage, [timing[stage] for timing in timings if stage in timing])
+            _report('server total', [timing['total'] for timing in timings])
+
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare a fresh connection per provider call (module-level requests.get)
+against the pooled keep-alive session from http_client, both talking to a
+local stub HTTPS server.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_http_pool --requests 200 --threads 4
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_client import create_session
+from benchmarks.stub_server import make_self_signed_cert, start_stub_server
+
+
+def _run(label, get, url, total, threads):
+    """Issue `total` GETs over `threads` threads and print latency stats."""
+    def timed_get(_):
+        start = time.perf_counter()
+        response = get(url)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(timed_get, range(total)))
+    elapsed = time.perf_counter() - start
+
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{label:<24} {total / elapsed:8.1f} req/s   p50 {p50:6.2f} ms   p95 {p95:6.2f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='requests per mode')
+    parser.add_argument('--threads', type=int, default=4, help='concurrent client threads')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert = make_self_signed_cert(tmp)
+        server, base_url = start_stub_server(cert=cert)
+        url = f"{base_url}/v1/api/jobs/in/search/1"
+        ca_bundle = cert[0]
+
+        print(f"Stub HTTPS server: {base_url}  ({args.requests} requests, {args.threads} threads)\n")
+
+        per_request = _run(
+            'handshake-per-request',
+            lambda u: requests.get(u, timeout=10, verify=ca_bundle),
+            url, args.requests, args.threads
+        )
+
+        session = create_session(pool_maxsize=args.threads)
+        session.get(url, timeout=10, verify=ca_bundle)  # open the first connection outside the timing
+        pooled = _run(
+            'pooled keep-alive',
+            lambda u: session.get(u, timeout=10, verify=ca_bundle),
+            url, args.requests, args.threads
+        )
+
+        print(f"\nSpeed-up: {per_request / pooled:.1f}x")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
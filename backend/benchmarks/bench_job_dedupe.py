@@ -0,0 +1,130 @@
+"""
+Measure job_dedupe on synthetic candidate pools with known duplicates.
+Each pool mixes distinct postings (several per company, often with the
+same title) with re-listings of some of them as another provider or
+query would return them: a different apply link, a reworded title
+("Senior ...", "... - Bangalore"), a company suffix ("Pvt Ltd") and the
+description cut at a different length. Reports the time of the LSH
+index against comparing every pair of signatures, how many re-listings
+were caught and how many distinct postings were wrongly merged, and how
+many of the top 15 ranked slots repeat a posting without deduplication.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_job_dedupe --sizes 100 300 1000 3000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+import job_dedupe
+from job_dedupe import NearDuplicateIndex, dedupe, signature
+from job_ranker import rank_jobs
+
+WORDS = ("python java sql react node django flask spring aws docker kubernetes excel pandas tableau "
+         "golang typescript team build scalable systems customers growth startup fintech product "
+         "engineer developer analyst intern design deliver own features mentor review code quality "
+         "data pipelines dashboards stakeholders agile sprint cloud services apis testing").split()
+TITLES = ["Python Developer", "Data Analyst", "Backend Engineer", "Frontend Developer", "DevOps Engineer"]
+COMPANIES = ["Infosys", "TCS", "Wipro", "Flipkart", "Zomato", "Swiggy", "Paytm", "Razorpay", "Freshworks", "Zoho"]
+SKILLS = ["Python", "Django", "SQL", "AWS", "Docker"]
+ROLES = ["Python Developer", "Backend Engineer"]
+
+
+def _posting(rng, number):
+    description = " ".join(rng.choices(WORDS, k=80))
+    return {
+        'title': rng.choice(TITLES),
+        'company': rng.choice(COMPANIES),
+        'location': "Bangalore, India",
+        'description': description[:300] + "...",
+        'apply_link': f"https://jobs.example.com/{number}",
+        'posting': number,
+        'full_description': description
+    }
+
+
+def _relisting(rng, posting, copy):
+    title = posting['title']
+    title = rng.choice([title, f"Senior {title}", f"{title} - Bangalore", f"{title} (Full Time)"])
+    company = posting['company'] + rng.choice(["", " Pvt Ltd", " Limited"])
+    cut = rng.randrange(240, 300)
+    return {
+        **posting,
+        'title': title,
+        'company': company,
+        'description': posting['full_description'][:cut] + "...",
+        'apply_link': f"https://other.example.com/{posting['posting']}/{copy}"
+    }
+
+
+def make_pool(size, duplicate_share, rng):
+    """Return `size` listings of which about duplicate_share are re-listings of the others."""
+    distinct = max(int(size * (1 - duplicate_share)), 1)
+    postings = [_posting(rng, number) for number in range(distinct)]
+    pool = list(postings)
+    copy = 0
+    while len(pool) < size:
+        copy += 1
+        pool.append(_relisting(rng, rng.choice(postings), copy))
+    rng.shuffle(pool)
+    return pool
+
+
+def _brute_force(jobs):
+    """Keep a listing unless its signature is close to any kept one at the same company."""
+    kept, kept_signatures, kept_companies = [], [], []
+    for job in jobs:
+        values, company = signature(job), job_dedupe._company(job)
+        duplicate = any(
+            company == other_company and np.count_nonzero(values == other) >= job_dedupe.JOB_DEDUPE_THRESHOLD * 64
+            for other, other_company in zip(kept_signatures, kept_companies)
+        )
+        if not duplicate:
+            kept.append(job)
+            kept_signatures.append(values)
+            kept_companies.append(company)
+    return kept
+
+
+def _timed(function, jobs):
+    start = time.perf_counter()
+    result = function(jobs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000, 3000])
+    parser.add_argument('--duplicates', type=float, default=0.3, help='share of re-listings in each pool')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    for size in args.sizes:
+        pool = make_pool(size, args.duplicates, rng)
+        job_dedupe._signatures.clear()
+        for job in pool:
+            signature(job)  # time the index, not the hashing, in both columns
+
+        index = NearDuplicateIndex()
+        kept, lsh_ms = _timed(lambda jobs: [job for job in jobs if index.add(job)], pool)
+        brute_ms = _timed(_brute_force, pool)[1] if size <= 1000 else float('nan')
+
+        distinct = len({job['posting'] for job in pool})
+        merged = distinct - len({job['posting'] for job in kept})
+        missed = len(kept) - len({job['posting'] for job in kept})
+        caught = (size - distinct) - missed
+
+        top = rank_jobs(pool, SKILLS, ROLES, top_k=15)
+        wasted = len(top) - len({job['posting'] for job in top})
+        top_deduped = dedupe(rank_jobs(pool, SKILLS, ROLES), 'benchmark')[:15]
+        wasted_after = len(top_deduped) - len({job['posting'] for job in top_deduped})
+
+        print(f"{size:>5} listings  LSH {lsh_ms:7.2f} ms  all pairs {brute_ms:8.2f} ms  "
+              f"re-listings caught {caught}/{size - distinct}  wrongly merged {merged}  "
+              f"top-15 repeats {wasted} -> {wasted_after}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure job_index search latency on a synthetic index: N listings are
+ingested into a throwaway data directory, then the typical analysis
+query (a few roles plus top skills) is timed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_job_index --listings 20000 --queries 500
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+ROLES = ["Python Developer", "Data Analyst", "Frontend Developer", "Backend Developer",
+         "Java Developer", "DevOps Engineer", "Data Scientist", "Android Developer",
+         "QA Engineer", "Full Stack Developer", "Machine Learning Engineer", "UI/UX Designer"]
+SKILLS = ["Python", "Django", "Flask", "SQL", "Excel", "React", "JavaScript", "Node.js", "Java",
+          "Spring Boot", "Docker", "Kubernetes", "AWS", "Pandas", "TensorFlow", "Kotlin",
+          "Selenium", "Figma", "Tableau", "Power BI", "Git", "Linux", "MongoDB", "TypeScript"]
+FILLER = ("We are hiring for our growing team in Bangalore. You will work with cross functional "
+          "teams, own features end to end and learn from experienced engineers.").split()
+
+
+def _listing(i, rng):
+    level = rng.choice(["", "Junior ", "Senior ", "Trainee "])
+    words = rng.sample(SKILLS, 4) + rng.sample(FILLER, 15)
+    rng.shuffle(words)
+    return {
+        "title": f"{level}{rng.choice(ROLES)}",
+        "company": f"Company {i % 997}",
+        "location": "Bangalore, India",
+        "description": " ".join(words)[:300] + "...",
+        "apply_link": f"https://jobs.example.com/{i}",
+        "employment_type": "Full-time",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--listings', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ['CAREERUP_DATA_DIR'] = tempfile.mkdtemp(prefix='job-index-bench-')
+    import job_index
+
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for offset in range(0, args.listings, 1000):
+        job_index.ingest([_listing(i, rng) for i in range(offset, min(offset + 1000, args.listings))], 'bench')
+    print(f"ingested {args.listings} listings in {time.perf_counter() - start:.2f} s")
+
+    samples = []
+    for _ in range(args.queries):
+        roles = rng.sample(ROLES, 3)
+        skills = rng.sample(SKILLS, 10)
+        start = time.perf_counter()
+        job_index.search(skills, roles, limit=15)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"search  mean {statistics.mean(samples):7.3f} ms   p50 {statistics.median(samples):7.3f} ms   "
+          f"p95 {p95:7.3f} ms   max {samples[-1]:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
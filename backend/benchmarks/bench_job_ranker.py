@@ -0,0 +1,63 @@
+"""
+Measure job_ranker.rank_jobs on synthetic candidate sets of different
+sizes. "cold" listings are seen for the first time and must be tokenized;
+"warm" listings were ranked before (as cached and indexed listings
+usually are) and only need their cached term ids.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_job_ranker --sizes 50 200 500 1000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+import job_ranker
+
+WORDS = ("python java sql react node.js django flask spring boot aws docker kubernetes excel pandas "
+         "power bi tableau c++ c# golang typescript team work build scalable systems customers growth "
+         "bangalore hyderabad pune startup fintech product engineer developer analyst intern").split()
+SKILLS = ["Python", "Django", "SQL", "AWS", "Docker", "REST APIs", "Git", "Pandas"]
+ROLES = ["Python Developer", "Backend Developer", "Data Analyst"]
+
+
+def _listings(count, rng):
+    return [
+        {
+            "title": " ".join(rng.sample(WORDS, 3)),
+            "description": " ".join(rng.choices(WORDS, k=45))[:300] + "...",
+        }
+        for _ in range(count)
+    ]
+
+
+def _measure(jobs, iterations):
+    samples = []
+    for _ in range(iterations):
+        # Fresh dict objects, as after json.loads from the caches
+        batch = json.loads(json.dumps(jobs))
+        start = time.perf_counter()
+        job_ranker.rank_jobs(batch, SKILLS, ROLES, top_k=15)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 500, 1000])
+    parser.add_argument('--iterations', type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    for size in args.sizes:
+        jobs = _listings(size, rng)
+        start = time.perf_counter()
+        job_ranker.rank_jobs(jobs, SKILLS, ROLES, top_k=15)
+        cold = (time.perf_counter() - start) * 1000
+        warm = _measure(jobs, args.iterations)
+        print(f"{size:>5} listings   cold {cold:7.2f} ms   warm p50 {warm:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
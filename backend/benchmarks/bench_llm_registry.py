@@ -0,0 +1,67 @@
+"""
+Measure the per-request setup cost that llm_registry removes: building a
+ChatGoogleGenerativeAI client, PromptTemplate and LLMChain on every call
+versus looking them up in the per-worker registry. No network calls are
+made; a dummy API key is used.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_llm_registry --iterations 200
+"""
+import argparse
+import statistics
+import time
+import warnings
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain.prompts import PromptTemplate
+from langchain.chains import LLMChain
+
+import llm_registry
+from ai_analyzer import ANALYSIS_PROMPT, GEMINI_MODEL, GEMINI_TEMPERATURE
+
+API_KEY = "benchmark-dummy-key"
+
+
+def build_per_request():
+    llm = ChatGoogleGenerativeAI(model=GEMINI_MODEL, google_api_key=API_KEY, temperature=GEMINI_TEMPERATURE)
+    prompt = PromptTemplate(input_variables=["resume_text"], template=ANALYSIS_PROMPT)
+    return LLMChain(llm=llm, prompt=prompt)
+
+
+def from_registry():
+    return llm_registry.get_chain(GEMINI_MODEL, GEMINI_TEMPERATURE, API_KEY, ANALYSIS_PROMPT)
+
+
+def _measure(label, build, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        build()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(samples):8.3f} ms   p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    # The very first client in a process also pays one-off gRPC/auth initialisation
+    start = time.perf_counter()
+    build_per_request()
+    print(f"first client in process  {(time.perf_counter() - start) * 1000:8.3f} ms\n")
+
+    per_request = _measure('build per request', build_per_request, args.iterations)
+    llm_registry.warm_up(GEMINI_MODEL, GEMINI_TEMPERATURE, API_KEY, ANALYSIS_PROMPT)
+    cached = _measure('registry lookup', from_registry, args.iterations)
+
+    print(f"\nSaved per request: {per_request - cached:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
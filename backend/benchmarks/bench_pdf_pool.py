@@ -0,0 +1,73 @@
+"""
+Measure PDF extraction throughput under concurrent load: in-process
+PyMuPDF (resume_parser) versus the sandboxed process pool (pdf_pool).
+Synthetic resumes are generated with PyMuPDF; a mix of short resumes and
+occasional long documents is submitted from several threads at once, as
+concurrent uploads would be.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_pdf_pool --threads 8 --documents 200
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz  # PyMuPDF
+
+import pdf_pool
+from resume_parser import extract_text_from_bytes
+
+RESUME_LINE = ("Python developer with Django, Flask, SQL and AWS experience. Built REST APIs and "
+               "data pipelines; led a team of four on a microservices migration. ")
+
+
+def make_pdf(pages):
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(40, 40, 560, 800), f"Page {page_num + 1}\n" + RESUME_LINE * 25, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _run(label, extract, documents, threads):
+    samples = []
+
+    def one(data):
+        start = time.perf_counter()
+        extract(data)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, documents))
+    elapsed = time.perf_counter() - start
+
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<12} {len(documents) / elapsed:7.1f} docs/s   p50 {statistics.median(samples):7.1f} ms   "
+          f"p95 {p95:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--long-every', type=int, default=20, help='every Nth document has 40 pages')
+    args = parser.parse_args()
+
+    short, long = make_pdf(2), make_pdf(40)
+    documents = [long if i % args.long_every == 0 else short for i in range(1, args.documents + 1)]
+    print(f"{args.documents} documents ({args.documents // args.long_every} with 40 pages), "
+          f"{args.threads} threads, {pdf_pool.PDF_POOL_WORKERS} pool processes, {os.cpu_count()} CPUs")
+
+    pdf_pool.warm_up()
+    _run('in-process', extract_text_from_bytes, documents, args.threads)
+    _run('pool', pdf_pool.extract_text, documents, args.threads)
+
+
+if __name__ == '__main__':
+    main()
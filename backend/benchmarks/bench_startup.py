@@ -0,0 +1,151 @@
+"""
+Measure cold start: how long importing the app takes and how soon a
+freshly started gunicorn answers its first requests.
+
+Import time is measured in fresh interpreters with the LLM stack
+imported eagerly (LAZY_IMPORTS=false, the old behaviour) and lazily.
+Then gunicorn is started in each mode against the provider stubs and
+the script reports, from the moment the process was spawned, when
+/api/health first answers and when the first /api/analyze completes.
+Finally the worker is killed and the same two times are measured for
+its replacement, which is what a gunicorn worker restart costs:
+
+    eager    LAZY_IMPORTS=false, warm-up at import (before this change)
+    lazy     heavy imports deferred, warm-up in a background thread
+    preload  GUNICORN_PRELOAD=true: the master imports everything once,
+             workers fork with it already loaded
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup --import-runs 5 --workers 1
+    python -m benchmarks.bench_startup --server async --modes lazy preload
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.bench_analyze_e2e import BACKEND_DIR, _backend_env, _free_port, _stub_command, _wait_until_up
+from benchmarks.provider_stubs import add_stub_arguments
+from benchmarks.resume_pdfs import make_resume_set
+
+MODES = {
+    'eager': {'LAZY_IMPORTS': 'false'},
+    'lazy': {},
+    'preload': {'GUNICORN_PRELOAD': 'true'},
+}
+
+_IMPORT_SNIPPET = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+def import_time(module, env):
+    """Seconds to import the app module in a fresh interpreter, without warm-up side effects."""
+    env = {**os.environ, **env, 'LLM_WARM_UP': 'false', 'PDF_POOL_ENABLED': 'false'}
+    output = subprocess.run([sys.executable, '-c', _IMPORT_SNIPPET.format(module=module)], cwd=BACKEND_DIR,
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _until(check, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"not ready within {timeout}s")
+
+
+def first_requests(app_url, resume, started):
+    """Return (seconds to the first /api/health answer, seconds to the first /api/analyze answer) since started."""
+    _until(lambda: requests.get(f"{app_url}/api/health", timeout=1).status_code == 200)
+    health = time.perf_counter() - started
+    filename, _, data = resume
+    _until(lambda: requests.post(f"{app_url}/api/analyze", files={'resume': (filename, data, 'application/pdf')},
+                                 timeout=60).status_code == 200)
+    return health, time.perf_counter() - started
+
+
+def _workers(master_pid):
+    output = subprocess.run(['pgrep', '-P', str(master_pid)], capture_output=True, text=True).stdout
+    return [int(pid) for pid in output.split()]
+
+
+def run_mode(args, mode, stub_url, resume):
+    """Start gunicorn in a mode, time its first requests, then kill its workers and time the replacements."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {**_backend_env(args, stub_url, data_dir), **MODES[mode]}
+        app_port = _free_port()
+        app_url = f"http://127.0.0.1:{app_port}"
+        if args.server == 'async':
+            server_args = ['async_app:app', '--worker-class', 'aiohttp.GunicornWebWorker']
+        else:
+            server_args = ['app:app', '--threads', '8']
+
+        started = time.perf_counter()
+        backend = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', *server_args, '--bind', f"127.0.0.1:{app_port}",
+             '--workers', str(args.workers), '--timeout', '120', '--log-level', 'warning'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            cold = first_requests(app_url, resume, started)
+
+            old_workers = _workers(backend.pid)
+            restarted = time.perf_counter()
+            for pid in old_workers:
+                os.kill(pid, signal.SIGKILL)
+            # Wait until the master has noticed and every replacement is up before timing requests to them
+            _until(lambda: not set(old_workers) & set(_workers(backend.pid))
+                   and len(_workers(backend.pid)) == args.workers)
+            restart = first_requests(app_url, resume, restarted)
+        finally:
+            backend.terminate()
+            backend.wait()
+    return cold, restart
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--import-runs', type=int, default=5, help='fresh interpreters per import measurement')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn worker processes')
+    parser.add_argument('--server', choices=['flask', 'async'], default='flask')
+    parser.add_argument('--warm-caches', action='store_true', help='keep the analysis/job caches and job index on')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='extra environment for the backend (repeatable)')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    module = 'async_app' if args.server == 'async' else 'app'
+    for mode in ('eager', 'lazy'):
+        samples = [import_time(module, MODES[mode]) for _ in range(args.import_runs)]
+        print(f"import {module:<9} {mode:<7} median {statistics.median(samples) * 1000:7.0f} ms   "
+              f"min {min(samples) * 1000:7.0f} ms")
+    print()
+
+    resume = make_resume_set(1, 1)[0]
+    stub_port = _free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    stubs = subprocess.Popen(_stub_command(args, stub_port), cwd=BACKEND_DIR, stdout=subprocess.DEVNULL)
+    try:
+        _wait_until_up(stub_url, stubs)
+        print(f"{'mode':<8} {'first health':>13} {'first analyze':>14} {'restart health':>15} {'restart analyze':>16}")
+        for mode in args.modes:
+            (health, analyze), (restart_health, restart_analyze) = run_mode(args, mode, stub_url, resume)
+            print(f"{mode:<8} {health * 1000:10.0f} ms {analyze * 1000:11.0f} ms "
+                  f"{restart_health * 1000:12.0f} ms {restart_analyze * 1000:13.0f} ms")
+    finally:
+        stubs.terminate()
+        stubs.wait()
+
+
+if __name__ == '__main__':
+    main()
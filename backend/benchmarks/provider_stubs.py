@@ -0,0 +1,247 @@
+"""
+Local stand-ins for the Gemini, Adzuna and JSearch APIs.
+One HTTP server answers all three with configurable latency, error rate
+and payload size, so the backend can be load-tested offline. Point the
+backend at it with GEMINI_API_ENDPOINT, ADZUNA_SEARCH_URL and
+JSEARCH_SEARCH_URL (bench_analyze_e2e does this for you).
+
+Streamed Gemini answers are sent in chunks spread over the latency, but
+the Gemini client's REST transport reads the whole stream before
+yielding, so the early job search of ANALYSIS_STREAMING starts no
+earlier against the stub than without streaming.
+
+--gemini-capacity N makes the Gemini stub work on at most N answers at
+once, as a rate-limited upstream would; further calls wait their turn.
+
+Usage (from the backend directory):
+    python -m benchmarks.provider_stubs --port 8090 --gemini-latency 1500 --adzuna-error-rate 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.stub_server import JSONHandler, start_stub_server
+
+ROLES = ["Backend Developer", "Data Analyst", "Frontend Developer", "DevOps Engineer",
+         "Machine Learning Engineer", "Full Stack Developer", "QA Engineer", "Android Developer"]
+SKILLS = ["Python", "Java", "JavaScript", "React", "Node.js", "SQL", "PostgreSQL", "Docker",
+          "Kubernetes", "AWS", "Django", "Flask", "Git", "Linux", "TensorFlow", "Pandas",
+          "TypeScript", "Spring Boot", "MongoDB", "Redis", "Kotlin", "CI/CD", "REST APIs", "Agile"]
+COMPANIES = ["Infosys", "TCS", "Wipro", "Flipkart", "Zomato", "Swiggy", "Paytm", "Razorpay"]
+CITIES = ["Bangalore", "Hyderabad", "Pune", "Chennai", "Gurugram", "Noida", "Mumbai"]
+
+FILLER = ("You will design, build and maintain services used by millions of customers, "
+          "working closely with product and design in an agile team. ")
+
+
+def add_stub_arguments(parser):
+    """Add the latency, error and payload options of every stubbed provider to an argparse parser."""
+    for provider, latency, results in (('gemini', 1500, 8), ('adzuna', 300, 20), ('jsearch', 500, 10)):
+        parser.add_argument(f'--{provider}-latency', type=float, default=latency, help='mean latency in ms')
+        parser.add_argument(f'--{provider}-jitter', type=float, default=0.2,
+                            help='latency varies uniformly by this fraction either way')
+        parser.add_argument(f'--{provider}-error-rate', type=float, default=0.0, help='share of calls failing')
+        parser.add_argument(f'--{provider}-error-status', type=int, default=503)
+        unit = 'skills per analysis' if provider == 'gemini' else 'listings per search (at most)'
+        parser.add_argument(f'--{provider}-results', type=int, default=results, help=unit)
+    parser.add_argument('--description-chars', type=int, default=1200, help='length of each job description')
+    parser.add_argument('--gemini-chunks', type=int, default=6, help='chunks per streamed Gemini answer')
+    parser.add_argument('--gemini-capacity', type=int, default=0,
+                        help='Gemini answers worked on at once, 0 for no limit')
+
+
+def stub_config(args):
+    """Collect the stub options from parsed arguments into a per-provider dict."""
+    config = {}
+    for provider in ('gemini', 'adzuna', 'jsearch'):
+        config[provider] = {
+            name: getattr(args, f"{provider}_{name}")
+            for name in ('latency', 'jitter', 'error_rate', 'error_status', 'results')
+        }
+    config['description_chars'] = args.description_chars
+    config['gemini_chunks'] = args.gemini_chunks
+    config['gemini_capacity'] = args.gemini_capacity
+    return config
+
+
+def _seed(text):
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def _description(rng, chars):
+    text = FILLER * (chars // len(FILLER) + 1)
+    start = rng.randrange(len(FILLER))
+    return (text + text)[start:start + chars]
+
+
+def _listings(query, count, chars, page=1):
+    """Deterministic listings for a query and page, so identical searches get identical results."""
+    rng = random.Random(_seed(f"{query}|{page}"))
+    return [
+        {
+            'title': f"{rng.choice(['', 'Senior ', 'Junior '])}{query.title()}",
+            'company': rng.choice(COMPANIES),
+            'city': rng.choice(CITIES),
+            'description': f"{query} {' '.join(rng.sample(SKILLS, 4))}. " + _description(rng, chars),
+            'url': f"https://jobs.example.com/{_seed(query)}/{page}/{i}",
+            'contract_type': rng.choice(['full_time', 'contract', 'part_time'])
+        }
+        for i in range(count)
+    ]
+
+
+def _analysis(prompt, skill_count):
+    """A Gemini-style analysis whose skills and roles depend on the resume text."""
+    rng = random.Random(_seed(prompt))
+    return {
+        'skills': rng.sample(SKILLS, min(skill_count, len(SKILLS))),
+        'suitable_roles': rng.sample(ROLES, 3),
+        'experience_level': rng.choice(['entry', 'mid', 'senior']),
+        'weaknesses': ["No quantified impact in project descriptions", "Limited cloud deployment experience"]
+    }
+
+
+def make_handler(config):
+    """Build a request handler class serving the stubbed APIs with these settings."""
+    gemini_capacity = threading.BoundedSemaphore(config['gemini_capacity']) if config['gemini_capacity'] else None
+
+    class ProviderStubHandler(JSONHandler):
+
+        def _delay(self, provider, fraction=1.0):
+            settings = config[provider]
+            jitter = settings['jitter']
+            time.sleep(max(settings['latency'] * fraction * random.uniform(1 - jitter, 1 + jitter), 0) / 1000)
+
+        def _failed(self, provider):
+            settings = config[provider]
+            if random.random() >= settings['error_rate']:
+                return False
+            self._send_json({'error': f"stubbed {provider} failure"}, settings['error_status'])
+            return True
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            chars = config['description_chars']
+
+            if '/jobs/' in url.path:
+                self._delay('adzuna')
+                if self._failed('adzuna'):
+                    return
+                count = min(int(params.get('results_per_page', 10)), config['adzuna']['results'])
+                self._send_json({'results': [
+                    {
+                        'title': job['title'],
+                        'company': {'display_name': job['company']},
+                        'location': {'display_name': f"{job['city']}, Karnataka"},
+                        'description': job['description'],
+                        'redirect_url': job['url'],
+                        'contract_type': job['contract_type']
+                    }
+                    for job in _listings(params.get('what', ''), count, chars, url.path.rsplit('/', 1)[-1])
+                ]})
+
+            elif url.path.endswith('/search'):
+                self._delay('jsearch')
+                if self._failed('jsearch'):
+                    return
+                query = params.get('query', '')
+                self._send_json({'status': 'OK', 'data': [
+                    {
+                        'job_title': job['title'],
+                        'employer_name': job['company'],
+                        'job_city': job['city'],
+                        'job_country': 'IN',
+                        'job_description': job['description'],
+                        'job_apply_link': job['url'],
+                        'job_employment_type': job['contract_type'].upper()
+                    }
+                    for job in _listings(query, config['jsearch']['results'], chars, params.get('page', '1'))
+                ]})
+
+            else:
+                self._send_json({'error': 'not found'}, 404)
+
+        def do_POST(self):
+            # Gemini REST API: POST /v1beta/models/<model>:generateContent or :streamGenerateContent
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            path = urlparse(self.path).path
+            if ':generateContent' not in path and ':streamGenerateContent' not in path:
+                self._send_json({'error': 'not found'}, 404)
+                return
+
+            if gemini_capacity is None:
+                self._answer_gemini(body, path)
+                return
+            with gemini_capacity:
+                self._answer_gemini(body, path)
+
+        def _answer_gemini(self, body, path):
+            if self._failed('gemini'):
+                return
+            text = json.dumps(_analysis(body.decode('utf-8', 'replace'), config['gemini']['results']))
+            usage = {'promptTokenCount': len(body) // 4, 'candidatesTokenCount': len(text) // 4,
+                     'totalTokenCount': (len(body) + len(text)) // 4}
+
+            if ':generateContent' in path:
+                self._delay('gemini')
+                self._send_json({'candidates': [_candidate(text)], 'usageMetadata': usage})
+                return
+
+            # Streamed answers arrive as a JSON array, one element per chunk, spread over the latency
+            chunks = config['gemini_chunks']
+            size = -(-len(text) // chunks)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for index in range(chunks):
+                self._delay('gemini', 1 / chunks)
+                element = {'candidates': [_candidate(text[index * size:(index + 1) * size])]}
+                if index == chunks - 1:
+                    element['usageMetadata'] = usage
+                self._write_chunk(('[' if index == 0 else ',') + json.dumps(element)
+                                  + (']' if index == chunks - 1 else ''))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, text):
+            data = text.encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+    return ProviderStubHandler
+
+
+def _candidate(text):
+    return {'content': {'parts': [{'text': text}], 'role': 'model'}, 'finishReason': 'STOP', 'index': 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8090)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(make_handler(stub_config(args)), port=args.port)
+    print(f"Provider stubs listening on {base_url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Synthetic resume PDFs for the benchmarks.
+Each resume has the usual sections (summary, skills, experience,
+projects, education) with randomly chosen skills and roles; longer
+resumes repeat the experience and project sections over more pages.
+
+Usage (from the backend directory), to write sample files:
+    python -m benchmarks.resume_pdfs --out /tmp/resumes --count 20 --max-pages 6
+"""
+import argparse
+import os
+import random
+
+import fitz  # PyMuPDF
+
+from benchmarks.provider_stubs import COMPANIES, CITIES, ROLES, SKILLS
+
+BULLETS = [
+    "Built REST APIs serving {n}k requests per day using {skill}",
+    "Cut page load time by {n}% by profiling and caching hot {skill} queries",
+    "Led a team of {n} engineers migrating a monolith to {skill} microservices",
+    "Automated deployments with {skill}, reducing release time from days to {n} minutes",
+    "Designed data pipelines in {skill} processing {n} GB of logs nightly",
+]
+
+
+def _resume_lines(rng, sections):
+    """Return the text lines of a resume with `sections` experience/project blocks."""
+    name = f"Candidate {rng.randrange(10000):04d}"
+    skills = rng.sample(SKILLS, 10)
+    lines = [
+        name,
+        f"{rng.choice(CITIES)}, India | {name.lower().replace(' ', '.')}@example.com | +91 98{rng.randrange(10 ** 8):08d}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(ROLES)} with {rng.randrange(1, 9)} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+    for _ in range(sections):
+        lines.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randrange(2015, 2025)} - Present)")
+        for bullet in rng.sample(BULLETS, 3):
+            lines.append("- " + bullet.format(n=rng.randrange(2, 90), skill=rng.choice(skills)))
+        lines.append("")
+    lines.append("PROJECTS")
+    for index in range(sections):
+        lines.append(f"Project {index + 1}: {rng.choice(skills)} dashboard for {rng.choice(COMPANIES)}")
+        lines.append("- " + rng.choice(BULLETS).format(n=rng.randrange(2, 90), skill=rng.choice(skills)))
+    lines += ["", "EDUCATION", f"B.Tech in Computer Science, {rng.randrange(2012, 2024)}"]
+    return lines
+
+
+def make_resume_pdf(pages=1, seed=None):
+    """
+    Build a resume PDF of roughly `pages` pages.
+
+    Args:
+        pages (int): Approximate number of pages
+        seed (int): Random seed; different seeds give different resumes
+
+    Returns:
+        bytes: PDF content
+    """
+    rng = random.Random(seed)
+    lines = _resume_lines(rng, sections=max(2, pages * 3))
+    lines_per_page = max(len(lines) // pages, 1) if pages > 1 else len(lines)
+
+    doc = fitz.open()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 800), "\n".join(lines[start:start + lines_per_page]), fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_resume_set(count, max_pages=4, seed=0):
+    """
+    Build `count` distinct resumes with page counts spread over 1..max_pages.
+
+    Returns:
+        list: (filename, pages, pdf bytes) tuples
+    """
+    rng = random.Random(seed)
+    resumes = []
+    for index in range(count):
+        pages = 1 + index % max_pages
+        resumes.append((f"resume_{index:04d}_{pages}p.pdf", pages, make_resume_pdf(pages, seed=rng.random())))
+    return resumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True, help='directory to write the PDFs into')
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--max-pages', type=int, default=4)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for filename, _, data in make_resume_set(args.count, args.max_pages):
+        with open(os.path.join(args.out, filename), 'wb') as f:
+            f.write(data)
+    print(f"Wrote {args.count} resumes to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
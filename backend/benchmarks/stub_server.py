@@ -0,0 +1,78 @@
+"""
+Minimal local HTTP(S) stub servers used by the benchmarks.
+"""
+import json
+import os
+import ssl
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_self_signed_cert(directory):
+    """
+    Create a self-signed certificate for localhost using the openssl CLI.
+
+    Args:
+        directory (str): Directory to write cert.pem and key.pem into
+
+    Returns:
+        tuple: (cert_path, key_path)
+    """
+    cert_path = os.path.join(directory, 'cert.pem')
+    key_path = os.path.join(directory, 'key.pem')
+    subprocess.run(
+        [
+            'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+            '-keyout', key_path, '-out', cert_path, '-days', '1',
+            '-subj', '/CN=localhost',
+            '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'
+        ],
+        check=True,
+        capture_output=True
+    )
+    return cert_path, key_path
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that answers every GET with a fixed JSON body."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    body = json.dumps({"results": []}).encode('utf-8')
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(handler=JSONHandler, cert=None, port=0):
+    """
+    Start a threaded stub server in the background.
+
+    Args:
+        handler (type): BaseHTTPRequestHandler subclass serving requests
+        cert (tuple): Optional (cert_path, key_path) to serve HTTPS
+        port (int): Port to bind, 0 picks a free one
+
+    Returns:
+        tuple: (server, base_url)
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    scheme = 'http'
+
+    if cert:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*cert)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = 'https'
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://localhost:{server.server_address[1]}"
@@ -0,0 +1,46 @@
+"""
+Gunicorn settings for the backend, read from the working directory.
+Command-line flags (--workers, --threads, --preload, ...) still win.
+
+Workers are threaded (gthread): the batch endpoint's NDJSON stream and
+the analysis-job progress stream hold a thread, not a whole worker, for
+as long as they run. A gthread worker's heartbeat doesn't depend on its
+requests, so GUNICORN_TIMEOUT only bounds a worker that stopped
+responding; it is still raised above the default 30s for slow clients.
+Worker count comes from WEB_CONCURRENCY, as usual for gunicorn.
+
+With GUNICORN_PRELOAD=true the master imports the app and the LangChain
+/ Gemini client stack once and freezes them out of the garbage
+collector's reach, so forked workers share those pages copy-on-write
+instead of importing everything again: a new or restarted worker serves
+its first request as soon as it has forked. Per-worker state (Gemini
+clients, PDF processes, thread pools, SQLite connections) is still
+built after the fork.
+"""
+import gc
+import os
+import sys
+
+GUNICORN_PRELOAD = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 60))
+preload_app = GUNICORN_PRELOAD
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded, before any worker is forked."""
+    if GUNICORN_PRELOAD:
+        import llm_registry
+        llm_registry.import_clients()
+        # Collections would otherwise write to every preloaded object's header and un-share its page
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Runs in each new worker; the preloaded Flask app skipped its warm-up in the master."""
+    flask_app = sys.modules.get('app')
+    if GUNICORN_PRELOAD and flask_app is not None:
+        flask_app.warm_up_worker()
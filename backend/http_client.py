@@ -0,0 +1,210 @@
+"""
+Shared HTTP client for the job providers (Adzuna, JSearch).
+Each worker process creates one pooled, keep-alive session on first use
+and reuses it for every provider call, so repeat calls to the same host
+skip the TCP and TLS handshake. The async pipeline (async_app) uses one
+aiohttp session per event loop with the same pool, timeout and retry
+settings.
+
+Provider calls retry in get() and async_get_json() rather than inside
+urllib3, so a before_attempt hook runs for every request that goes
+upstream: the fetchers spend one call of the provider's quota there, and
+a retried call is counted as many times as it was sent.
+"""
+import asyncio
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+PROVIDER_POOL_CONNECTIONS = int(os.getenv('PROVIDER_POOL_CONNECTIONS', 4))  # hosts kept pooled
+PROVIDER_POOL_MAXSIZE = int(os.getenv('PROVIDER_POOL_MAXSIZE', 10))  # connections per host
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv('PROVIDER_CONNECT_TIMEOUT', 3.05))
+PROVIDER_READ_TIMEOUT = float(os.getenv('PROVIDER_READ_TIMEOUT', 10))
+PROVIDER_MAX_RETRIES = int(os.getenv('PROVIDER_MAX_RETRIES', 2))
+PROVIDER_BACKOFF_FACTOR = float(os.getenv('PROVIDER_BACKOFF_FACTOR', 0.3))
+
+# 429 is deliberately not retried: retrying a rate limit only burns more quota
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_connections=PROVIDER_POOL_CONNECTIONS,
+                   pool_maxsize=PROVIDER_POOL_MAXSIZE,
+                   max_retries=PROVIDER_MAX_RETRIES,
+                   backoff_factor=PROVIDER_BACKOFF_FACTOR):
+    """
+    Build a requests session with connection pooling and retry-with-backoff.
+
+    Args:
+        pool_connections (int): Number of per-host pools to keep
+        pool_maxsize (int): Maximum connections kept alive per host
+        max_retries (int): Retries for connection errors and 5xx responses
+        backoff_factor (float): Exponential backoff factor between retries
+
+    Returns:
+        requests.Session: Configured session
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """
+    Return this worker's shared provider session, creating it on first use.
+
+    The session is recreated after a fork so gunicorn workers never share
+    sockets inherited from the master process. It doesn't retry by
+    itself: use get() for provider calls.
+
+    Returns:
+        requests.Session: Shared pooled session
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = create_session(max_retries=0)
+                _session_pid = pid
+
+    return _session
+
+
+def get(url, before_attempt=None, **kwargs):
+    """
+    GET with the shared session, retrying like async_get_json does.
+
+    Connection errors, timeouts and RETRY_STATUS_CODES are retried up to
+    PROVIDER_MAX_RETRIES times with exponential backoff.
+
+    Args:
+        url (str): URL to fetch
+        before_attempt (callable): Optional zero-argument function called
+            before every attempt, including the first; an exception it
+            raises stops the call
+        **kwargs: Passed to requests (params, headers, timeout, ...)
+
+    Returns:
+        requests.Response: The final response (not checked for an error status)
+
+    Raises:
+        requests.exceptions.RequestException: If the request could not be made
+    """
+    session = get_session()
+    for attempt in range(PROVIDER_MAX_RETRIES + 1):
+        last_attempt = attempt == PROVIDER_MAX_RETRIES
+        if before_attempt:
+            before_attempt()
+        try:
+            response = session.get(url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_attempt:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+            response.close()
+        time.sleep(PROVIDER_BACKOFF_FACTOR * (2 ** attempt))
+
+
+def get_timeout():
+    """Return the (connect, read) timeout tuple used for provider calls."""
+    return (PROVIDER_CONNECT_TIMEOUT, PROVIDER_READ_TIMEOUT)
+
+
+_async_sessions = {}
+
+
+def get_async_session():
+    """
+    Return the aiohttp session for the running event loop, creating it on first use.
+
+    Returns:
+        aiohttp.ClientSession: Pooled keep-alive session
+    """
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=PROVIDER_POOL_CONNECTIONS * PROVIDER_POOL_MAXSIZE,
+                                         limit_per_host=PROVIDER_POOL_MAXSIZE)
+        timeout = aiohttp.ClientTimeout(sock_connect=PROVIDER_CONNECT_TIMEOUT, sock_read=PROVIDER_READ_TIMEOUT)
+        session = _async_sessions[loop] = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return session
+
+
+async def close_async_session():
+    """Close the running event loop's session (call on server shutdown)."""
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+async def async_get_json(url, params=None, headers=None, on_status=None, before_attempt=None):
+    """
+    GET a JSON document with the async session, retrying like get() does.
+
+    Connection errors and RETRY_STATUS_CODES are retried up to
+    PROVIDER_MAX_RETRIES times with exponential backoff.
+
+    Args:
+        url (str): URL to fetch
+        params (dict): Query parameters
+        headers (dict): Request headers
+        on_status (callable): Optional callback(status) with the final HTTP status
+        before_attempt (callable): Optional zero-argument function run in a
+            thread before every attempt, including the first; an exception
+            it raises stops the call
+
+    Returns:
+        dict: Decoded JSON body
+
+    Raises:
+        aiohttp.ClientResponseError: If the final response is an error status
+        aiohttp.ClientError: If the request could not be made
+    """
+    import aiohttp
+
+    session = get_async_session()
+    for attempt in range(PROVIDER_MAX_RETRIES + 1):
+        last_attempt = attempt == PROVIDER_MAX_RETRIES
+        if before_attempt:
+            # The provider quota lives in SQLite: keep it off the event loop
+            await asyncio.to_thread(before_attempt)
+        try:
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status in RETRY_STATUS_CODES and not last_attempt:
+                    await asyncio.sleep(PROVIDER_BACKOFF_FACTOR * (2 ** attempt))
+                    continue
+                if on_status:
+                    on_status(response.status)
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if last_attempt:
+                raise
+            await asyncio.sleep(PROVIDER_BACKOFF_FACTOR * (2 ** attempt))
@@ -0,0 +1,90 @@
+"""
+Incremental parser for a streamed JSON object.
+Reports each top-level field as soon as its value is complete, so callers
+can act on early fields while the rest of the object is still arriving.
+"""
+import json
+
+
+class IncrementalJSONObject:
+    """
+    Feed text chunks of a single JSON object and collect completed top-level fields.
+
+    Anything before the first '{' (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._field_start = None
+        self.complete = False
+
+    def feed(self, chunk):
+        """
+        Add a chunk of streamed text.
+
+        Args:
+            chunk (str): Next piece of the model output
+
+        Returns:
+            list: (key, value) pairs for fields completed by this chunk
+        """
+        self._buffer += chunk
+        completed = []
+
+        while self._pos < len(self._buffer) and not self.complete:
+            char = self._buffer[self._pos]
+
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                    self._field_start = self._pos + 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+
+            # A ',' or the closing '}' at the top level ends the current field
+            if not self._in_string and (
+                (char == ',' and self._depth == 1) or (char == '}' and self._depth == 0)
+            ):
+                field = self._parse_field(self._buffer[self._field_start:self._pos])
+                if field is not None:
+                    self.fields[field[0]] = field[1]
+                    completed.append(field)
+                self._field_start = self._pos + 1
+                if self._depth == 0:
+                    self.complete = True
+
+            self._pos += 1
+
+        return completed
+
+    @staticmethod
+    def _parse_field(text):
+        """Parse a '"key": value' fragment, or return None if it is empty or invalid."""
+        if not text.strip():
+            return None
+        try:
+            parsed = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            return None
+        return next(iter(parsed.items()), None)
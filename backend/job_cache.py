@@ -0,0 +1,510 @@
+"""
+Quota-aware cache for job provider search results.
+Results are stored in SQLite so every gunicorn worker shares them. Fresh
+entries are served directly; stale entries are served immediately while
+one worker refreshes them in the background. Every provider call the
+cache avoids is counted so quota usage can be tracked.
+
+Identical searches that miss at the same time share one provider call:
+within a worker they wait on the same in-flight fetch, and across
+workers the first one to claim the key fetches while the others wait up
+to JOB_COALESCE_WAIT seconds for its result to land in the cache. When a
+provider's quota is used up (see provider_quota), an expired entry is
+served rather than nothing.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from metrics import count_cache
+from provider_quota import QuotaExhaustedError
+from storage import get_connection
+
+log = logging.getLogger(__name__)
+
+JOB_CACHE_ENABLED = os.getenv('JOB_CACHE_ENABLED', 'true').lower() == 'true'
+JOB_CACHE_TTL = int(os.getenv('JOB_CACHE_TTL', 6 * 3600))  # fresh for 6 hours
+JOB_CACHE_STALE_TTL = int(os.getenv('JOB_CACHE_STALE_TTL', 7 * 24 * 3600))  # servable for 7 days
+JOB_CACHE_REFRESH_LEASE = 60  # seconds one worker owns a background refresh
+JOB_COALESCE_ENABLED = os.getenv('JOB_COALESCE_ENABLED', 'true').lower() == 'true'
+JOB_COALESCE_WAIT = float(os.getenv('JOB_COALESCE_WAIT', 10))  # seconds to wait for another worker's fetch
+JOB_COALESCE_POLL = 0.1  # seconds between checks for another worker's result
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_cache (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    refreshing_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS job_cache_counters (
+    provider TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (provider, name)
+);
+CREATE TABLE IF NOT EXISTS job_cache_inflight (
+    key TEXT PRIMARY KEY,
+    until REAL NOT NULL
+);
+"""
+
+_refresh_pool = None
+_refresh_pool_pid = None
+_refresh_pool_lock = threading.Lock()
+
+
+def _get_refresh_pool():
+    """Return this process's background refresh pool, recreating it after a fork."""
+    global _refresh_pool, _refresh_pool_pid
+
+    pid = os.getpid()
+    if _refresh_pool is None or _refresh_pool_pid != pid:
+        with _refresh_pool_lock:
+            if _refresh_pool is None or _refresh_pool_pid != pid:
+                _refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='job-cache-refresh')
+                _refresh_pool_pid = pid
+
+    return _refresh_pool
+
+
+def _connection():
+    return get_connection('job_cache', _SCHEMA)
+
+
+def normalize_query(query):
+    """Lowercase and collapse whitespace so equivalent queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+def make_cache_key(provider, query, country='in', page=1, variant=''):
+    """
+    Build the cache key for a provider search.
+
+    Args:
+        provider (str): Provider name, e.g. 'adzuna' or 'jsearch'
+        query (str): Search keywords
+        country (str): Country code searched
+        page (int): Result page
+        variant (str): Any other parameter that changes the results (e.g. page size)
+
+    Returns:
+        str: Cache key
+    """
+    return f"{provider}|{country}|{page}|{variant}|{normalize_query(query)}"
+
+
+def _increment(provider, name, amount=1):
+    try:
+        _connection().execute(
+            "INSERT INTO job_cache_counters (provider, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (provider, name) DO UPDATE SET value = value + excluded.value",
+            (provider, name, amount)
+        )
+    except Exception as e:
+        log.warning("Job cache counter update failed: %s", e)
+
+
+def _store(key, provider, results):
+    _connection().execute(
+        "INSERT OR REPLACE INTO job_cache (key, provider, value, fetched_at, refreshing_until) "
+        "VALUES (?, ?, ?, ?, 0)",
+        (key, provider, json.dumps(results), time.time())
+    )
+
+
+def _record_fetch(key, provider, results):
+    """Count a provider call and store its results."""
+    _increment(provider, 'calls_made')
+    try:
+        _store(key, provider, results)
+    except Exception as e:
+        log.warning("Job cache write failed: %s", e)
+
+
+def _fetch_and_store(key, provider, fetch):
+    results = fetch()
+    _record_fetch(key, provider, results)
+    return results
+
+
+def _release_lease(key):
+    # Let another request retry the refresh
+    try:
+        _connection().execute("UPDATE job_cache SET refreshing_until = 0 WHERE key = ?", (key,))
+    except Exception:
+        pass
+
+
+def _refresh(key, provider, fetch):
+    try:
+        _fetch_and_store(key, provider, fetch)
+        log.info("Refreshed stale job cache entry", extra={'key': key, 'sample': True})
+    except Exception as e:
+        log.warning("Background job cache refresh failed: %s", e, extra={'key': key})
+        _release_lease(key)
+
+
+async def _refresh_async(key, provider, fetch):
+    try:
+        await asyncio.to_thread(_record_fetch, key, provider, await fetch())
+        log.info("Refreshed stale job cache entry", extra={'key': key, 'sample': True})
+    except Exception as e:
+        log.warning("Background job cache refresh failed: %s", e, extra={'key': key})
+        await asyncio.to_thread(_release_lease, key)
+
+
+def _lookup(key, provider):
+    """
+    Look up a cache entry and count hits; misses are counted by _fetch_on_miss.
+
+    Returns:
+        tuple or None: (results, claimed) if the entry can be served, where
+        claimed means the caller won the lease and must refresh it; None on
+        a miss or a read failure
+    """
+    try:
+        conn = _connection()
+        row = conn.execute(
+            "SELECT value, fetched_at FROM job_cache WHERE key = ?", (key,)
+        ).fetchone()
+    except Exception as e:
+        log.warning("Job cache read failed: %s", e)
+        return None
+
+    if row is not None:
+        value, fetched_at = row
+        age = time.time() - fetched_at
+
+        if age <= JOB_CACHE_TTL:
+            count_cache('job_cache', 'hit')
+            _increment(provider, 'calls_saved')
+            return json.loads(value), False
+
+        if age <= JOB_CACHE_STALE_TTL:
+            # Serve stale now; only the worker that wins the lease refreshes
+            now = time.time()
+            try:
+                claimed = conn.execute(
+                    "UPDATE job_cache SET refreshing_until = ? WHERE key = ? AND refreshing_until < ?",
+                    (now + JOB_CACHE_REFRESH_LEASE, key, now)
+                ).rowcount
+            except Exception as e:
+                log.warning("Job cache refresh lease failed: %s", e)
+                claimed = 0
+            count_cache('job_cache', 'stale')
+            _increment(provider, 'calls_saved')
+            return json.loads(value), bool(claimed)
+
+    return None
+
+
+def _lookup_fresh(key):
+    """Return a fresh entry's results without counting the lookup, or None."""
+    try:
+        row = _connection().execute(
+            "SELECT value, fetched_at FROM job_cache WHERE key = ?", (key,)
+        ).fetchone()
+    except Exception:
+        return None
+    if row is None or time.time() - row[1] > JOB_CACHE_TTL:
+        return None
+    return json.loads(row[0])
+
+
+def _lookup_expired(key):
+    """Return an entry of any age, for when the provider may not be called; None if there is none."""
+    try:
+        row = _connection().execute("SELECT value FROM job_cache WHERE key = ?", (key,)).fetchone()
+    except Exception as e:
+        log.warning("Job cache read failed: %s", e)
+        return None
+    if row is None:
+        return None
+    log.info("Quota exhausted, serving an expired job cache entry", extra={'key': key, 'sample': True})
+    return json.loads(row[0])
+
+
+def _claim_inflight(key):
+    """Try to become the worker fetching key; False if another worker is already fetching it."""
+    now = time.time()
+    try:
+        return bool(_connection().execute(
+            "INSERT INTO job_cache_inflight (key, until) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET until = excluded.until WHERE until < ?",
+            (key, now + JOB_COALESCE_WAIT, now)
+        ).rowcount)
+    except Exception as e:
+        log.warning("Job cache in-flight claim failed: %s", e)
+        return True
+
+
+def _release_inflight(key):
+    try:
+        _connection().execute("DELETE FROM job_cache_inflight WHERE key = ?", (key,))
+    except Exception:
+        pass
+
+
+def _other_worker_result(key):
+    """
+    Check on another worker's fetch of key.
+
+    Returns:
+        tuple: (finished, results); results is None if the fetch is still
+        running, failed, or its result could not be stored
+    """
+    results = _lookup_fresh(key)
+    if results is not None:
+        return True, results
+    try:
+        running = _connection().execute(
+            "SELECT 1 FROM job_cache_inflight WHERE key = ? AND until >= ?", (key, time.time())
+        ).fetchone()
+    except Exception:
+        return True, None
+    return running is None, None
+
+
+def _wait_for_other_worker(key):
+    give_up_at = time.monotonic() + JOB_COALESCE_WAIT
+    while time.monotonic() < give_up_at:
+        time.sleep(JOB_COALESCE_POLL)
+        finished, results = _other_worker_result(key)
+        if finished:
+            return results
+    return None
+
+
+async def _wait_for_other_worker_async(key):
+    give_up_at = time.monotonic() + JOB_COALESCE_WAIT
+    while time.monotonic() < give_up_at:
+        await asyncio.sleep(JOB_COALESCE_POLL)
+        finished, results = await asyncio.to_thread(_other_worker_result, key)
+        if finished:
+            return results
+    return None
+
+
+def _fetch_on_miss(key, provider, fetch):
+    """
+    Fetch and store a missed key, unless another worker is already fetching it.
+
+    Waits for the other worker's result when it is, and falls back to
+    fetching if that doesn't arrive in time. If the provider's quota is
+    used up an expired entry is served instead.
+    """
+    claimed = _claim_inflight(key) if JOB_COALESCE_ENABLED else False
+    outcome = 'miss'
+    try:
+        if JOB_COALESCE_ENABLED and not claimed:
+            results = _wait_for_other_worker(key)
+            if results is not None:
+                outcome = 'coalesced'
+                _increment(provider, 'calls_saved')
+                return results
+        try:
+            return _fetch_and_store(key, provider, fetch)
+        except QuotaExhaustedError:
+            results = _lookup_expired(key)
+            if results is None:
+                raise
+            outcome = 'quota_fallback'
+            return results
+    finally:
+        count_cache('job_cache', outcome)
+        if claimed:
+            _release_inflight(key)
+
+
+async def _fetch_on_miss_async(key, provider, fetch):
+    """
+    Async version of _fetch_on_miss; fetch is a zero-argument coroutine function.
+
+    The SQLite helpers run in the default executor so a busy database never
+    stalls the event loop.
+    """
+    claimed = await asyncio.to_thread(_claim_inflight, key) if JOB_COALESCE_ENABLED else False
+    outcome = 'miss'
+    try:
+        if JOB_COALESCE_ENABLED and not claimed:
+            results = await _wait_for_other_worker_async(key)
+            if results is not None:
+                outcome = 'coalesced'
+                await asyncio.to_thread(_increment, provider, 'calls_saved')
+                return results
+        try:
+            results = await fetch()
+        except QuotaExhaustedError:
+            results = await asyncio.to_thread(_lookup_expired, key)
+            if results is None:
+                raise
+            outcome = 'quota_fallback'
+            return results
+        await asyncio.to_thread(_record_fetch, key, provider, results)
+        return results
+    finally:
+        count_cache('job_cache', outcome)
+        if claimed:
+            await asyncio.to_thread(_release_inflight, key)
+
+
+_inflight = {}
+_inflight_pid = None
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key, provider, fetch):
+    """
+    Run fetch once for all threads of this worker asking for key at the same time.
+
+    The first caller runs it; the others wait for and share its result or error.
+    """
+    global _inflight_pid
+
+    with _inflight_lock:
+        if _inflight_pid != os.getpid():
+            # Fetches in flight in a parent process never finish here
+            _inflight.clear()
+            _inflight_pid = os.getpid()
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        count_cache('job_cache', 'coalesced')
+        _increment(provider, 'calls_saved')
+        return future.result()
+
+    try:
+        results = fetch()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(results)
+        return results
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+_inflight_tasks = {}
+
+
+async def _single_flight_async(key, provider, fetch):
+    """Async version of _single_flight: callers on the event loop share one fetch task per key."""
+    task = _inflight_tasks.get(key)
+    if task is None:
+        task = _inflight_tasks[key] = asyncio.ensure_future(fetch())
+        task.add_done_callback(partial(_finish_inflight_task, key))
+    else:
+        count_cache('job_cache', 'coalesced')
+        await asyncio.to_thread(_increment, provider, 'calls_saved')
+    # A cancelled caller must not cancel the fetch the others are waiting on
+    return await asyncio.shield(task)
+
+
+def _finish_inflight_task(key, task):
+    if _inflight_tasks.get(key) is task:
+        del _inflight_tasks[key]
+    if not task.cancelled():
+        task.exception()
+
+
+def cached_search(provider, query, fetch, country='in', page=1, variant=''):
+    """
+    Return provider search results, using the shared cache when possible.
+
+    Args:
+        provider (str): Provider name, e.g. 'adzuna' or 'jsearch'
+        query (str): Search keywords
+        fetch (callable): Zero-argument function performing the real provider call
+        country (str): Country code searched
+        page (int): Result page
+        variant (str): Any other parameter that changes the results (e.g. page size)
+
+    Returns:
+        list: Job listings, either cached or freshly fetched
+
+    Raises:
+        QuotaExhaustedError: If the provider's quota is used up and nothing is cached
+    """
+    key = make_cache_key(provider, query, country, page, variant)
+    if not JOB_CACHE_ENABLED:
+        return _single_flight(key, provider, fetch) if JOB_COALESCE_ENABLED else fetch()
+
+    cached = _lookup(key, provider)
+    if cached is None:
+        return _single_flight(key, provider, partial(_fetch_on_miss, key, provider, fetch))
+
+    results, claimed = cached
+    if claimed:
+        _get_refresh_pool().submit(_refresh, key, provider, fetch)
+    return results
+
+
+_refresh_tasks = set()
+
+
+async def cached_search_async(provider, query, fetch, country='in', page=1, variant=''):
+    """
+    Async version of cached_search for the async pipeline.
+
+    Args:
+        provider (str): Provider name, e.g. 'adzuna' or 'jsearch'
+        query (str): Search keywords
+        fetch (callable): Zero-argument coroutine function performing the real provider call
+        country (str): Country code searched
+        page (int): Result page
+        variant (str): Any other parameter that changes the results (e.g. page size)
+
+    Returns:
+        list: Job listings, either cached or freshly fetched
+
+    Raises:
+        QuotaExhaustedError: If the provider's quota is used up and nothing is cached
+    """
+    key = make_cache_key(provider, query, country, page, variant)
+    if not JOB_CACHE_ENABLED:
+        return await (_single_flight_async(key, provider, fetch) if JOB_COALESCE_ENABLED else fetch())
+
+    cached = await asyncio.to_thread(_lookup, key, provider)
+    if cached is None:
+        return await _single_flight_async(key, provider, partial(_fetch_on_miss_async, key, provider, fetch))
+
+    results, claimed = cached
+    if claimed:
+        # Keep a reference so the refresh task isn't garbage-collected mid-flight
+        task = asyncio.create_task(_refresh_async(key, provider, fetch))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+    return results
+
+
+def get_stats():
+    """
+    Return per-provider counters of provider calls made and saved by the cache.
+
+    Returns:
+        dict: {provider: {'calls_made': int, 'calls_saved': int}}
+    """
+    stats = {}
+    try:
+        rows = _connection().execute(
+            "SELECT provider, name, value FROM job_cache_counters"
+        ).fetchall()
+    except Exception as e:
+        log.warning("Job cache stats read failed: %s", e)
+        return stats
+
+    for provider, name, value in rows:
+        stats.setdefault(provider, {'calls_made': 0, 'calls_saved': 0})[name] = value
+    return stats
@@ -0,0 +1,176 @@
+"""
+Near-duplicate detection for job listings.
+The same posting often comes back from Adzuna's job and internship
+searches, from JSearch, and from several fan-out queries with a slightly
+different title or a differently truncated description. Each listing
+gets a MinHash signature over the shingles of its normalized title,
+company and description; listings whose signatures agree on at least
+JOB_DEDUPE_THRESHOLD of their values (estimated Jaccard similarity) at
+the same company are duplicates. Signatures are split into LSH bands, so
+each listing is only compared with the few listings sharing a band and
+deduplicating stays roughly linear in the number of listings.
+"""
+import logging
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from metrics import DUPLICATES_DROPPED, increment
+
+log = logging.getLogger(__name__)
+
+JOB_DEDUPE = os.getenv('JOB_DEDUPE', 'true').lower() == 'true'
+JOB_DEDUPE_THRESHOLD = float(os.getenv('JOB_DEDUPE_THRESHOLD', 0.7))
+# Signatures kept per worker; the cache starts over when it fills up
+JOB_DEDUPE_CACHE_ITEMS = int(os.getenv('JOB_DEDUPE_CACHE_ITEMS', 5000))
+
+# 16 bands of 4 values: pairs at 0.7 similarity share a band with ~99% probability, pairs at 0.3 ~12%
+_BANDS = 16
+_ROWS = 4
+_PERMUTATIONS = _BANDS * _ROWS
+
+# Multiply-shift hashing of the 32-bit shingle hashes: the top 32 bits of (a * x + b) mod 2**64, a odd
+_random = np.random.default_rng(20240611)
+_A = _random.integers(0, 1 << 63, size=_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _random.integers(0, 1 << 63, size=_PERMUTATIONS, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_COMPANY_SUFFIXES = {'pvt', 'private', 'ltd', 'limited', 'inc', 'llc', 'llp', 'corp', 'corporation', 'co'}
+_UNKNOWN = {'', 'n/a', 'na', 'unknown', 'confidential'}
+
+_signatures = {}  # (title, company, description) -> signature
+_lock = threading.Lock()
+
+
+def job_identity(job):
+    """Identify a listing across queries and providers: its apply link, else company and title."""
+    link = job.get('apply_link') or '#'
+    if link != '#':
+        return link
+    return f"{job.get('company', '')}|{job.get('title', '')}".lower()
+
+
+def _company(job):
+    """Normalized company name, or None if the provider didn't give one."""
+    name = (job.get('company') or '').strip().lower()
+    if name in _UNKNOWN:
+        return None
+    return " ".join(token for token in _TOKEN.findall(name) if token not in _COMPANY_SUFFIXES) or None
+
+
+def _shingles(title, company, description):
+    """Title words and word pairs, the company, and three-word shingles of the description."""
+    title_tokens = _TOKEN.findall(title.lower())
+    description_tokens = _TOKEN.findall(description.lower())
+    if description.endswith('...'):
+        # Descriptions are cut at a fixed length; the cut-off last word differs between providers
+        description_tokens = description_tokens[:-1]
+    shingles = {f"t {token}" for token in title_tokens}
+    shingles.update(f"t {a} {b}" for a, b in zip(title_tokens, title_tokens[1:]))
+    shingles.update(f"d {' '.join(description_tokens[i:i + 3])}" for i in range(max(len(description_tokens) - 2, 0)))
+    if company:
+        shingles.add(f"c {company}")
+    return shingles
+
+
+def signature(job):
+    """
+    Return a listing's MinHash signature.
+
+    Returns:
+        numpy.ndarray: _PERMUTATIONS uint64 values, or None if the listing has no text
+    """
+    key = (job.get('title') or '', job.get('company') or '', job.get('description') or '')
+    cached = _signatures.get(key)
+    if cached is not None:
+        return cached
+
+    shingles = _shingles(key[0], _company(job), key[2])
+    if not shingles:
+        return None
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    values = ((hashes[:, None] * _A + _B) >> _SHIFT).min(axis=0)
+
+    with _lock:
+        if len(_signatures) >= JOB_DEDUPE_CACHE_ITEMS:
+            _signatures.clear()
+        _signatures[key] = values
+    return values
+
+
+class NearDuplicateIndex:
+    """
+    Incremental duplicate filter: add() listings in order of preference and
+    it accepts each one unless it duplicates a listing already accepted.
+    """
+
+    def __init__(self, threshold=JOB_DEDUPE_THRESHOLD, near=JOB_DEDUPE):
+        self.threshold = threshold
+        self.near = near
+        self._identities = set()
+        self._buckets = {}  # (band, band values) -> accepted listing numbers
+        self._signatures = []
+        self._companies = []
+
+    def add(self, job):
+        """
+        Accept a listing unless it duplicates an accepted one.
+
+        Returns:
+            bool: True if the listing was accepted
+        """
+        identity = job_identity(job)
+        if identity in self._identities:
+            return False
+        if not self.near:
+            self._identities.add(identity)
+            return True
+
+        values = signature(job)
+        company = _company(job)
+        bands = [] if values is None else [
+            (band, values[band * _ROWS:(band + 1) * _ROWS].tobytes()) for band in range(_BANDS)
+        ]
+
+        candidates = set()
+        for band in bands:
+            candidates.update(self._buckets.get(band, ()))
+        for number in candidates:
+            other_company = self._companies[number]
+            if company and other_company and company != other_company:
+                continue
+            if np.count_nonzero(self._signatures[number] == values) >= self.threshold * _PERMUTATIONS:
+                return False
+
+        number = len(self._signatures)
+        self._identities.add(identity)
+        self._signatures.append(values)
+        self._companies.append(company)
+        for band in bands:
+            self._buckets.setdefault(band, []).append(number)
+        return True
+
+
+def dedupe(jobs, source):
+    """
+    Drop listings that duplicate an earlier one, keeping the first (best-ranked) copy.
+
+    Args:
+        jobs (list): Job listings, most preferred first
+        source (str): Where the listings come from, for the duplicates metric
+
+    Returns:
+        list: Listings without duplicates, in their original order
+    """
+    index = NearDuplicateIndex()
+    kept = [job for job in jobs if index.add(job)]
+    dropped = len(jobs) - len(kept)
+    if dropped:
+        log.debug("Dropped duplicate listings", extra={'dropped': dropped, 'source': source})
+        increment(DUPLICATES_DROPPED, dropped, source=source)
+    return kept
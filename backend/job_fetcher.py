@@ -2,10 +2,147 @@
 Job/Internship Fetcher using JSearch API (RapidAPI).
 Searches for jobs based on skills extracted from resume.
 """
+import asyncio
+import logging
+import os
+from functools import partial
+
 import requests
 
+from http_client import async_get_json, get, get_timeout
+from job_cache import cached_search, cached_search_async
+from job_dedupe import dedupe
+from job_index import ingest_quietly
+from job_ranker import JOB_RANK_OVERFETCH, rank_jobs
+from job_search import clean_role
+from metrics import provider_call
+from provider_quota import QuotaExhaustedError, acquire
+
+log = logging.getLogger(__name__)
+
+# Overridable so benchmarks can point the fetcher at a local stub
+JSEARCH_SEARCH_URL = os.getenv('JSEARCH_SEARCH_URL', "https://jsearch.p.rapidapi.com/search")
+# Listings JSearch returns for one page (num_pages=1); fewer means it was the last page
+JSEARCH_PAGE_SIZE = 10
+
+
+# Employment type filters of /api/jobs in JSearch's terms
+JSEARCH_EMPLOYMENT_TYPES = {'full_time': 'FULLTIME', 'internship': 'INTERN'}
+
+
+def _jsearch_request(query, jsearch_api_key, page=1, location=None, employment_type=None):
+    """Return the (headers, params) of a JSearch query."""
+    headers = {
+        "X-RapidAPI-Key": jsearch_api_key,
+        "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
+    }
+    
+    params = {
+        "query": f"{query} in {location}" if location else f"{query} India",  # Add India to search
+        "page": str(page),
+        "num_pages": "1",
+        "date_posted": "all",
+        "remote_jobs_only": "false",
+        "country": "in"  # Filter for India
+    }
+    if employment_type:
+        params["employment_types"] = JSEARCH_EMPLOYMENT_TYPES[employment_type]
+    return headers, params
+
+
+def _parse_jsearch(data, max_results):
+    """Normalize a JSearch response into the common job format."""
+    # Extract relevant job information
+    jobs = []
+    for job in data.get("data", [])[:max_results]:
+        jobs.append({
+            "title": job.get("job_title", "N/A"),
+            "company": job.get("employer_name", "N/A"),
+            "location": job.get("job_city", "Remote") + ", " + job.get("job_country", ""),
+            "description": job.get("job_description", "No description available")[:300] + "...",
+            "apply_link": job.get("job_apply_link", "#"),
+            "employment_type": job.get("job_employment_type", "N/A")
+        })
+    return jobs
+
 
-def fetch_jobs_by_skills(skills, jsearch_api_key, max_results=10, job_roles=None):
+def _search_jsearch(query, jsearch_api_key, max_results, page=1, location=None, employment_type=None):
+    """
+    Run a single JSearch query and normalize its results.
+    
+    Args:
+        query (str): Search keywords (India is appended automatically)
+        jsearch_api_key (str): RapidAPI JSearch API key
+        max_results (int): Maximum number of job results to return
+        page (int): Result page, starting at 1
+        location (str): City or region to search in, None for all of India
+        employment_type (str): 'full_time' or 'internship', None for any
+        
+    Returns:
+        list: Job listings in the common job format
+    """
+    headers, params = _jsearch_request(query, jsearch_api_key, page, location, employment_type)
+    
+    with provider_call('jsearch') as call:
+        # One call of the shared quota per request sent, retries included
+        response = get(JSEARCH_SEARCH_URL, headers=headers, params=params, timeout=get_timeout(),
+                       before_attempt=partial(acquire, 'jsearch'))
+        call.status = response.status_code
+    
+    log.info("JSearch responded", extra={'query': query, 'page': page, 'status': response.status_code,
+                                         'sample': True})
+    response.raise_for_status()
+    
+    jobs = _parse_jsearch(response.json(), max_results)
+    ingest_quietly(jobs, 'jsearch')
+    return jobs
+
+
+async def _search_jsearch_async(query, jsearch_api_key, max_results, page=1, location=None, employment_type=None):
+    """Async version of _search_jsearch."""
+    headers, params = _jsearch_request(query, jsearch_api_key, page, location, employment_type)
+    
+    with provider_call('jsearch') as call:
+        data = await async_get_json(JSEARCH_SEARCH_URL, params=params, headers=headers,
+                                    on_status=lambda status: setattr(call, 'status', status),
+                                    before_attempt=partial(acquire, 'jsearch'))
+    
+    log.info("JSearch responded", extra={'query': query, 'page': page, 'status': call.status, 'sample': True})
+    jobs = _parse_jsearch(data, max_results)
+    await asyncio.to_thread(ingest_quietly, jobs, 'jsearch')
+    return jobs
+
+
+def _build_query(skills, job_roles):
+    """Build a wide JSearch query from the first role and a key technology."""
+    if job_roles and len(job_roles) > 0:
+        # Take first role and clean it - remove Junior/Senior/etc.
+        role = clean_role(job_roles[0])
+        
+        # Extract key technology from skills for broader search
+        tech_keywords = []
+        for skill in skills[:5]:  # Check top 5 skills
+            if skill.lower() in ['python', 'java', 'javascript', 'react', 'node', 'nodejs', 'angular', 'vue']:
+                tech_keywords.append(skill)
+        
+        # Combine role + tech for wide search
+        if tech_keywords:
+            return f"{role} {tech_keywords[0]}"
+        return role
+    
+    # Fallback: use top skill
+    return skills[0] if skills else "software developer"
+
+
+def _variant(fetch_count, location, employment_type):
+    variant = str(fetch_count)
+    if location or employment_type:
+        variant += f":{(location or '').lower()}:{employment_type or ''}"
+    return variant
+
+
+def fetch_jobs_by_skills(skills, jsearch_api_key, max_results=10, job_roles=None,
+                         page=1, location=None, employment_type=None):
     """
     Fetch job listings from JSearch API based on skills and roles.
     
@@ -14,84 +151,125 @@ def fetch_jobs_by_skills(skills, jsearch_api_key, max_results=10, job_roles=None
         jsearch_api_key (str): RapidAPI JSearch API key
         max_results (int): Maximum number of job results to return
         job_roles (list): Optional list of suitable job roles
+        page (int): Result page, starting at 1
+        location (str): City or region to search in, None for all of India
+        employment_type (str): 'full_time' or 'internship', None for any
         
     Returns:
-        list: Job listings with title, company, location, description, apply_link
+        list: Job listings with title, company, location, description, apply_link, most relevant first
     """
     try:
-        # JSearch API endpoint
-        url = "https://jsearch.p.rapidapi.com/search"
-        
-        # Build a wide search query
-        if job_roles and len(job_roles) > 0:
-            # Take first role and clean it - remove Junior/Senior/etc.
-            role = job_roles[0]
-            for prefix in ["Junior", "Senior", "Mid-level", "Lead", "Principal", "Entry-level", "Entry Level"]:
-                role = role.replace(prefix, "").strip()
-            
-            # Extract key technology from skills for broader search
-            tech_keywords = []
-            for skill in skills[:5]:  # Check top 5 skills
-                if skill.lower() in ['python', 'java', 'javascript', 'react', 'node', 'nodejs', 'angular', 'vue']:
-                    tech_keywords.append(skill)
-            
-            # Combine role + tech for wide search
-            if tech_keywords:
-                query = f"{role} {tech_keywords[0]}"
-            else:
-                query = role
-        else:
-            # Fallback: use top skill
-            query = skills[0] if skills else "software developer"
-        
-        print(f"🔍 Searching jobs with query: '{query}'")
-        
-        headers = {
-            "X-RapidAPI-Key": jsearch_api_key,
-            "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
-        }
-        
-        params = {
-            "query": f"{query} India",  # Add India to search
-            "page": "1",
-            "num_pages": "1",
-            "date_posted": "all",
-            "remote_jobs_only": "false",
-            "country": "in"  # Filter for India
-        }
+        query = _build_query(skills, job_roles)
+        log.info("Searching JSearch", extra={'query': query, 'sample': True})
         
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        # Keep more of the page than needed and return the most relevant ones
+        fetch_count = max_results * JOB_RANK_OVERFETCH
+        jobs = cached_search(
+            'jsearch',
+            query,
+            lambda: _search_jsearch(query, jsearch_api_key, fetch_count, page, location, employment_type),
+            page=page,
+            variant=_variant(fetch_count, location, employment_type)
+        )
         
-        print(f"📡 JSearch API Response Status: {response.status_code}")
-        
-        response.raise_for_status()
+        return dedupe(rank_jobs(jobs, skills, job_roles), 'jsearch')[:max_results]
+    
+    except QuotaExhaustedError:
+        raise
+    
+    except requests.exceptions.RequestException as e:
+        # If API fails, return sample jobs as fallback
+        if "403" in str(e) or "401" in str(e):
+            log.warning("JSearch API key issue, returning sample jobs")
+            return _get_sample_jobs(query)
+        raise Exception(f"Error fetching jobs from JSearch API: {str(e)}")
+    
+    except Exception as e:
+        raise Exception(f"Error processing job data: {str(e)}")
+
+
+def fetch_jobs_by_skills_page(skills, jsearch_api_key, job_roles=None, page=1, location=None, employment_type=None):
+    """
+    Fetch one JSearch result page for paging through a search (/api/jobs).
+    
+    Every listing of the page is kept (ranked and deduplicated), so moving
+    on to the next page skips none. Unlike fetch_jobs_by_skills there is
+    no fallback to sample jobs: they would be paged like real listings.
+    
+    Args:
+        skills (list): List of skills to search for
+        jsearch_api_key (str): RapidAPI JSearch API key
+        job_roles (list): Optional list of suitable job roles
+        page (int): Result page, starting at 1
+        location (str): City or region to search in, None for all of India
+        employment_type (str): 'full_time' or 'internship', None for any
+    
+    Returns:
+        tuple: (listings most relevant first, True if JSearch returned a
+            full page so it may have another one)
+    """
+    try:
+        query = _build_query(skills, job_roles)
+        log.info("Searching JSearch", extra={'query': query, 'page': page, 'sample': True})
         
-        data = response.json()
+        jobs = cached_search(
+            'jsearch',
+            query,
+            lambda: _search_jsearch(query, jsearch_api_key, JSEARCH_PAGE_SIZE, page, location, employment_type),
+            page=page,
+            variant=_variant(JSEARCH_PAGE_SIZE, location, employment_type)
+        )
         
-        print(f"✅ JSearch API returned {len(data.get('data', []))} jobs")
+        # Judge the end of the results by what JSearch returned, not by what survived deduplication
+        return dedupe(rank_jobs(jobs, skills, job_roles), 'jsearch'), len(jobs) >= JSEARCH_PAGE_SIZE
+    
+    except QuotaExhaustedError:
+        raise
+    
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Error fetching jobs from JSearch API: {str(e)}")
+    
+    except Exception as e:
+        raise Exception(f"Error processing job data: {str(e)}")
+
+
+async def fetch_jobs_by_skills_async(skills, jsearch_api_key, max_results=10, job_roles=None,
+                                     page=1, location=None, employment_type=None):
+    """
+    Async version of fetch_jobs_by_skills for the async pipeline.
+    
+    Returns:
+        list: Job listings with title, company, location, description, apply_link, most relevant first
+    """
+    import aiohttp  # only the async pipeline needs it; the Flask app never loads it
+    
+    try:
+        query = _build_query(skills, job_roles)
+        log.info("Searching JSearch", extra={'query': query, 'sample': True})
         
-        # Extract relevant job information
-        jobs = []
-        if "data" in data and len(data["data"]) > 0:
-            for job in data["data"][:max_results]:
-                jobs.append({
-                    "title": job.get("job_title", "N/A"),
-                    "company": job.get("employer_name", "N/A"),
-                    "location": job.get("job_city", "Remote") + ", " + job.get("job_country", ""),
-                    "description": job.get("job_description", "No description available")[:300] + "...",
-                    "apply_link": job.get("job_apply_link", "#"),
-                    "employment_type": job.get("job_employment_type", "N/A")
-                })
+        fetch_count = max_results * JOB_RANK_OVERFETCH
+        jobs = await cached_search_async(
+            'jsearch',
+            query,
+            lambda: _search_jsearch_async(query, jsearch_api_key, fetch_count, page, location, employment_type),
+            page=page,
+            variant=_variant(fetch_count, location, employment_type)
+        )
         
-        return jobs
+        return dedupe(rank_jobs(jobs, skills, job_roles), 'jsearch')[:max_results]
     
-    except requests.exceptions.RequestException as e:
-        # If API fails, return sample jobs as fallback
-        if "403" in str(e) or "401" in str(e):
-            print("⚠️  JSearch API key issue - returning sample jobs")
+    except QuotaExhaustedError:
+        raise
+    
+    except aiohttp.ClientResponseError as e:
+        if e.status in (401, 403):
+            log.warning("JSearch API key issue, returning sample jobs")
             return _get_sample_jobs(query)
         raise Exception(f"Error fetching jobs from JSearch API: {str(e)}")
     
+    except aiohttp.ClientError as e:
+        raise Exception(f"Error fetching jobs from JSearch API: {str(e)}")
+    
     except Exception as e:
         raise Exception(f"Error processing job data: {str(e)}")
 
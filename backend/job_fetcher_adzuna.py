@@ -3,106 +3,342 @@ Adzuna Job API integration for Indian jobs.
 FREE tier: 100 requests/month with real apply links.
 Sign up: https://developer.adzuna.com/signup
 """
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import requests
 
+from http_client import async_get_json, get, get_timeout
+from job_cache import cached_search, cached_search_async
+from job_dedupe import dedupe
+from job_index import ingest_quietly
+from job_ranker import JOB_RANK_OVERFETCH, rank_jobs
+from job_search import clean_role
+from metrics import provider_call
+from provider_quota import QuotaExhaustedError, acquire
+from structured_logging import in_context
+
+log = logging.getLogger(__name__)
+
+
+# Overridable so benchmarks can point the fetcher at a local stub; the page number is appended
+ADZUNA_SEARCH_URL = os.getenv('ADZUNA_SEARCH_URL', "https://api.adzuna.com/v1/api/jobs/in/search")
+ADZUNA_MAX_PER_PAGE = 50
+
+
+def _adzuna_url(page):
+    return f"{ADZUNA_SEARCH_URL}/{page}"
+
+
+def _adzuna_params(what, results_per_page, adzuna_app_id, adzuna_app_key, location=None):
+    return {
+        "app_id": adzuna_app_id,
+        "app_key": adzuna_app_key,
+        "results_per_page": results_per_page,
+        "what": what,
+        "where": location or "india",
+        "content-type": "application/json"
+    }
+
+
+def _parse_adzuna(data, employment_type):
+    """Normalize an Adzuna response into the common job format."""
+    jobs = []
+    for job in data.get("results", []):
+        jobs.append({
+            "title": job.get("title", "N/A"),
+            "company": job.get("company", {}).get("display_name", "N/A"),
+            "location": job.get("location", {}).get("display_name", "India"),
+            "description": job.get("description", "No description available")[:300] + "...",
+            "apply_link": job.get("redirect_url", "#"),
+            "employment_type": employment_type or job.get("contract_type", "Full-time")
+        })
+    return jobs
+
+
+def _search_adzuna(what, results_per_page, adzuna_app_id, adzuna_app_key, employment_type=None,
+                   page=1, location=None):
+    """
+    Run a single Adzuna search and normalize its results.
+    
+    Args:
+        what (str): Search keywords
+        results_per_page (int): Number of results to request
+        adzuna_app_id (str): Adzuna Application ID
+        adzuna_app_key (str): Adzuna Application Key
+        employment_type (str): Fixed employment type for every result, or None
+            to use each job's contract type
+        page (int): Result page, starting at 1
+        location (str): City or region to search in, None for all of India
+        
+    Returns:
+        list: Job listings in the common job format
+        
+    Raises:
+        QuotaExhaustedError: If the shared Adzuna quota is used up
+    """
+    params = _adzuna_params(what, results_per_page, adzuna_app_id, adzuna_app_key, location)
+    
+    with provider_call('adzuna') as call:
+        # One call of the shared quota per request sent, retries included
+        response = get(_adzuna_url(page), params=params, timeout=get_timeout(),
+                       before_attempt=partial(acquire, 'adzuna'))
+        call.status = response.status_code
+    log.info("Adzuna responded", extra={'query': what, 'page': page, 'status': response.status_code, 'sample': True})
+    response.raise_for_status()
+    
+    jobs = _parse_adzuna(response.json(), employment_type)
+    ingest_quietly(jobs, 'adzuna')
+    return jobs
+
+
+async def _search_adzuna_async(what, results_per_page, adzuna_app_id, adzuna_app_key, employment_type=None,
+                               page=1, location=None):
+    """Async version of _search_adzuna."""
+    params = _adzuna_params(what, results_per_page, adzuna_app_id, adzuna_app_key, location)
+    
+    with provider_call('adzuna') as call:
+        data = await async_get_json(_adzuna_url(page), params=params,
+                                    on_status=lambda status: setattr(call, 'status', status),
+                                    before_attempt=partial(acquire, 'adzuna'))
+    log.info("Adzuna responded", extra={'query': what, 'page': page, 'status': call.status, 'sample': True})
+    
+    jobs = _parse_adzuna(data, employment_type)
+    await asyncio.to_thread(ingest_quietly, jobs, 'adzuna')
+    return jobs
+
+
+def _plan_searches(skills, max_results, job_roles, employment_type=None, overfetch=JOB_RANK_OVERFETCH):
+    """
+    Pick the query and the searches (jobs, internships) for a resume.
+    
+    Args:
+        employment_type (str): 'full_time' or 'internship' to run only that
+            search, None for both
+        overfetch (int): Listings requested per result wanted, so ranking
+            has more to choose from
+    
+    Returns:
+        list: (label, keywords, results per page, employment type) per search
+    """
+    if job_roles and len(job_roles) > 0:
+        query = clean_role(job_roles[0])
+    else:
+        query = skills[0] if skills else "software developer"
+    
+    log.info("Searching Adzuna for jobs and internships", extra={'query': query, 'sample': True})
+    
+    # Search 1: Regular Jobs, Search 2: Internships (fewer of them)
+    per_page = min(max_results * overfetch, ADZUNA_MAX_PER_PAGE)
+    if employment_type == 'full_time':
+        return [("jobs", query, per_page, None)]
+    if employment_type == 'internship':
+        return [("internships", f"{query} internship", per_page, "Internship")]
+    return [
+        ("jobs", query, per_page, None),
+        ("internships", f"{query} internship", max(per_page // 2, 1), "Internship"),
+    ]
+
 
-def fetch_jobs_adzuna(skills, adzuna_app_id, adzuna_app_key, max_results=10, job_roles=None):
+def _merge_results(searches, outcomes, skills, job_roles, max_results):
+    """
+    Merge the searches' results (or exceptions) in search order, rank them and drop duplicates.
+    
+    Args:
+        max_results (int): Listings to keep, None to keep all of them
+    
+    Raises:
+        Exception: The first search's error, if every search failed
+        asyncio.CancelledError: If a search was cancelled
+    """
+    all_jobs = []
+    errors = []
+    
+    # Merge in search order so jobs always come before internships
+    for (label, _, _, _), outcome in zip(searches, outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                # Cancellation (or an interrupt) collected by gather: propagate it, don't merge around it
+                raise outcome
+            log.warning("Adzuna %s search failed: %s", label, outcome)
+            errors.append(outcome)
+            continue
+        
+        all_jobs.extend(outcome)
+    
+    if len(errors) == len(searches):
+        raise errors[0]
+    
+    if len(all_jobs) == 0:
+        log.warning("No jobs or internships found from Adzuna")
+    else:
+        log.info("Adzuna searches done", extra={
+            'results': {label: len(outcome) for (label, _, _, _), outcome in zip(searches, outcomes)
+                        if not isinstance(outcome, BaseException)},
+            'sample': True
+        })
+    
+    # Rank first so the most relevant copy of a duplicated posting is the one kept
+    return dedupe(rank_jobs(all_jobs, skills, job_roles), 'adzuna')[:max_results]
+
+
+def _outcome(future):
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+
+def _variant(per_page, employment_type, location):
+    variant = f"{per_page}:{employment_type or ''}"
+    return f"{variant}:{location.lower()}" if location else variant
+
+
+def _run_searches(searches, adzuna_app_id, adzuna_app_key, page, location):
+    """Run the planned searches concurrently; returns each one's listings or exception, in order."""
+    with ThreadPoolExecutor(max_workers=len(searches)) as pool:
+        futures = [
+            pool.submit(
+                in_context(cached_search),
+                'adzuna',
+                what,
+                partial(_search_adzuna, what, per_page, adzuna_app_id, adzuna_app_key, fixed_type,
+                        page, location),
+                page=page,
+                variant=_variant(per_page, fixed_type, location)
+            )
+            for _, what, per_page, fixed_type in searches
+        ]
+        return [_outcome(future) for future in futures]
+
+
+def fetch_jobs_adzuna(skills, adzuna_app_id, adzuna_app_key, max_results=10, job_roles=None,
+                      page=1, location=None, employment_type=None):
     """
     Fetch job listings AND internships from Adzuna API (India-focused).
     Returns real, direct apply links to company websites.
     
+    The regular-jobs and internship searches run concurrently. If one of
+    them fails the other's results are still returned; an error is only
+    raised when both fail. Each search spends one call of the shared
+    Adzuna quota unless it is answered from the job cache. Both searches over-fetch by JOB_RANK_OVERFETCH
+    and the merged results are ranked by relevance to the skills and roles;
+    postings returned by both searches are kept once.
+    
     Args:
         skills (list): List of skills to search for
         adzuna_app_id (str): Adzuna Application ID
         adzuna_app_key (str): Adzuna Application Key
         max_results (int): Maximum number of job results (will fetch jobs + internships)
         job_roles (list): Optional list of suitable job roles
+        page (int): Result page of both searches, starting at 1
+        location (str): City or region to search in, None for all of India
+        employment_type (str): 'full_time' or 'internship' to run only that search
         
     Returns:
-        list: Job listings and internships with REAL apply links
+        list: Job listings and internships with REAL apply links, most relevant first
+        
+    Raises:
+        QuotaExhaustedError: If the Adzuna quota is used up and neither search was cached
     """
-    all_jobs = []
+    try:
+        searches = _plan_searches(skills, max_results, job_roles, employment_type)
+        outcomes = _run_searches(searches, adzuna_app_id, adzuna_app_key, page, location)
+        return _merge_results(searches, outcomes, skills, job_roles, max_results)
     
+    except QuotaExhaustedError:
+        raise
+    
+    except requests.exceptions.RequestException as e:
+        log.error("Adzuna API error: %s", e)
+        raise Exception(f"Error fetching jobs from Adzuna API: {str(e)}")
+    
+    except Exception as e:
+        raise Exception(f"Error processing Adzuna data: {str(e)}")
+
+
+def fetch_jobs_adzuna_page(skills, adzuna_app_id, adzuna_app_key, per_page, job_roles=None,
+                           page=1, location=None, employment_type=None):
+    """
+    Fetch one Adzuna result page for paging through a search (/api/jobs).
+    
+    Unlike fetch_jobs_adzuna nothing is over-fetched or cut off: each
+    search asks for per_page listings and every listing returned is kept
+    (ranked and deduplicated), so moving on to the next page skips none.
+    
+    Args:
+        skills (list): List of skills to search for
+        adzuna_app_id (str): Adzuna Application ID
+        adzuna_app_key (str): Adzuna Application Key
+        per_page (int): Listings requested from the regular-jobs search
+            (the internship search asks for half as many)
+        job_roles (list): Optional list of suitable job roles
+        page (int): Result page of both searches, starting at 1
+        location (str): City or region to search in, None for all of India
+        employment_type (str): 'full_time' or 'internship' to run only that search
+    
+    Returns:
+        tuple: (listings most relevant first, True if any search returned
+            a full page so Adzuna may have another one)
+    
+    Raises:
+        QuotaExhaustedError: If the Adzuna quota is used up and neither search was cached
+    """
     try:
-        # Build search query
-        if job_roles and len(job_roles) > 0:
-            role = job_roles[0]
-            # Clean prefixes
-            for prefix in ["Junior", "Senior", "Mid-level", "Lead", "Principal", "Entry-level", "Entry Level"]:
-                role = role.replace(prefix, "").strip()
-            query = role
-        else:
-            query = skills[0] if skills else "software developer"
-        
-        print(f"🔍 Searching Adzuna for jobs and internships: '{query}'")
-        
-        # Search 1: Regular Jobs
-        jobs_url = "https://api.adzuna.com/v1/api/jobs/in/search/1"
-        jobs_params = {
-            "app_id": adzuna_app_id,
-            "app_key": adzuna_app_key,
-            "results_per_page": max_results,
-            "what": query,
-            "where": "india",
-            "content-type": "application/json"
-        }
-        
-        print(f"📡 Fetching regular jobs...")
-        jobs_response = requests.get(jobs_url, params=jobs_params, timeout=10)
-        print(f"   Status: {jobs_response.status_code}")
-        jobs_response.raise_for_status()
-        jobs_data = jobs_response.json()
-        
-        if "results" in jobs_data and len(jobs_data["results"]) > 0:
-            print(f"✅ Found {len(jobs_data['results'])} jobs")
-            for job in jobs_data["results"]:
-                all_jobs.append({
-                    "title": job.get("title", "N/A"),
-                    "company": job.get("company", {}).get("display_name", "N/A"),
-                    "location": job.get("location", {}).get("display_name", "India"),
-                    "description": job.get("description", "No description available")[:300] + "...",
-                    "apply_link": job.get("redirect_url", "#"),
-                    "employment_type": job.get("contract_type", "Full-time")
-                })
-        
-        # Search 2: Internships
-        internship_url = "https://api.adzuna.com/v1/api/jobs/in/search/1"
-        internship_params = {
-            "app_id": adzuna_app_id,
-            "app_key": adzuna_app_key,
-            "results_per_page": max_results // 2,  # Get fewer internships
-            "what": f"{query} internship",
-            "where": "india",
-            "content-type": "application/json"
-        }
-        
-        print(f"📡 Fetching internships...")
-        internship_response = requests.get(internship_url, params=internship_params, timeout=10)
-        print(f"   Status: {internship_response.status_code}")
-        internship_response.raise_for_status()
-        internship_data = internship_response.json()
-        
-        if "results" in internship_data and len(internship_data["results"]) > 0:
-            print(f"✅ Found {len(internship_data['results'])} internships")
-            for job in internship_data["results"]:
-                all_jobs.append({
-                    "title": job.get("title", "N/A"),
-                    "company": job.get("company", {}).get("display_name", "N/A"),
-                    "location": job.get("location", {}).get("display_name", "India"),
-                    "description": job.get("description", "No description available")[:300] + "...",
-                    "apply_link": job.get("redirect_url", "#"),
-                    "employment_type": "Internship"
-                })
+        searches = _plan_searches(skills, per_page, job_roles, employment_type, overfetch=1)
+        outcomes = _run_searches(searches, adzuna_app_id, adzuna_app_key, page, location)
+        jobs = _merge_results(searches, outcomes, skills, job_roles, None)
+        # Judge the end of the results by what Adzuna returned, not by what survived deduplication
+        more = any(not isinstance(outcome, BaseException) and len(outcome) >= requested
+                   for (_, _, requested, _), outcome in zip(searches, outcomes))
+        return jobs, more
+    
+    except QuotaExhaustedError:
+        raise
+    
+    except requests.exceptions.RequestException as e:
+        log.error("Adzuna API error: %s", e)
+        raise Exception(f"Error fetching jobs from Adzuna API: {str(e)}")
+    
+    except Exception as e:
+        raise Exception(f"Error processing Adzuna data: {str(e)}")
+
+
+async def fetch_jobs_adzuna_async(skills, adzuna_app_id, adzuna_app_key, max_results=10, job_roles=None,
+                                  page=1, location=None, employment_type=None):
+    """
+    Async version of fetch_jobs_adzuna: both searches run as coroutines on the event loop.
+    
+    Returns:
+        list: Job listings and internships with REAL apply links, most relevant first
+    """
+    import aiohttp  # only the async pipeline needs it; the Flask app never loads it
+    
+    try:
+        searches = _plan_searches(skills, max_results, job_roles, employment_type)
         
-        if len(all_jobs) == 0:
-            print("⚠️  No jobs or internships found from Adzuna")
-        else:
-            print(f"🎉 Total results: {len(all_jobs)} (jobs + internships)")
+        outcomes = await asyncio.gather(*[
+            cached_search_async(
+                'adzuna',
+                what,
+                partial(_search_adzuna_async, what, per_page, adzuna_app_id, adzuna_app_key, fixed_type,
+                        page, location),
+                page=page,
+                variant=_variant(per_page, fixed_type, location)
+            )
+            for _, what, per_page, fixed_type in searches
+        ], return_exceptions=True)
         
-        return all_jobs[:max_results]  # Limit to max_results
+        return _merge_results(searches, outcomes, skills, job_roles, max_results)
     
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Adzuna API error: {str(e)}")
+    except QuotaExhaustedError:
+        raise
+    
+    except aiohttp.ClientError as e:
+        log.error("Adzuna API error: %s", e)
         raise Exception(f"Error fetching jobs from Adzuna API: {str(e)}")
     
     except Exception as e:
@@ -0,0 +1,344 @@
+"""
+Local full-text index of job listings.
+Every listing a provider returns is ingested into a SQLite FTS5 table
+shared by all gunicorn workers. Analyses are answered from the index
+with BM25 ranking against the resume's roles and skills, and the live
+provider APIs are only called when the index has too few fresh matches.
+
+Bulk ingest (from the backend directory):
+    python job_index.py ingest listings.json [more.ndjson ...]
+    python job_index.py search "python developer" "data analyst"
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+from job_dedupe import dedupe, job_identity
+from job_search import clean_role
+from storage import get_connection
+
+log = logging.getLogger(__name__)
+
+JOB_INDEX_ENABLED = os.getenv('JOB_INDEX_ENABLED', 'true').lower() == 'true'
+JOB_INDEX_MIN_MATCHES = int(os.getenv('JOB_INDEX_MIN_MATCHES', 8))
+JOB_INDEX_MAX_AGE = int(os.getenv('JOB_INDEX_MAX_AGE', 2 * 24 * 3600))  # servable for 2 days
+JOB_INDEX_RETENTION = int(os.getenv('JOB_INDEX_RETENTION', 14 * 24 * 3600))  # deleted after 14 days
+# BM25 scoring reads each query term's full posting list, so search time grows with the index
+JOB_INDEX_MAX_ROWS = int(os.getenv('JOB_INDEX_MAX_ROWS', 20000))
+
+# How many of the resume's top skills are added to the search
+JOB_INDEX_QUERY_SKILLS = 8
+
+# How many of the newest matching listings are ranked per search
+JOB_INDEX_CANDIDATES = int(os.getenv('JOB_INDEX_CANDIDATES', 500))
+
+# BM25 column weights: a role in the title counts far more than in the description
+_TITLE_WEIGHT = 10.0
+_DESCRIPTION_WEIGHT = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    provider TEXT NOT NULL,
+    value TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ingested_at ON jobs (ingested_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5 (title, description);
+"""
+
+_WORD = re.compile(r"\w+")
+
+
+def _connection():
+    return get_connection('job_index', _SCHEMA)
+
+
+def _job_key(job):
+    """Row key of a listing: its hashed job_identity, so re-fetches replace it."""
+    return hashlib.sha256(job_identity(job).encode('utf-8')).hexdigest()
+
+
+def ingest(jobs, provider):
+    """
+    Add or refresh listings in the index.
+
+    Args:
+        jobs (list): Job listings in the common job format
+        provider (str): Provider the listings came from, e.g. 'adzuna'
+
+    Returns:
+        int: Number of listings ingested
+    """
+    if not jobs:
+        return 0
+
+    now = time.time()
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for job in jobs:
+            # Re-ingesting replaces the row, so ids always grow with ingest time and
+            # search() can bound freshness and its candidate window by rowid
+            key = _job_key(job)
+            conn.execute("DELETE FROM jobs_fts WHERE rowid IN (SELECT id FROM jobs WHERE job_key = ?)", (key,))
+            conn.execute("DELETE FROM jobs WHERE job_key = ?", (key,))
+            row_id = conn.execute(
+                "INSERT INTO jobs (job_key, provider, value, ingested_at) VALUES (?, ?, ?, ?)",
+                (key, provider, json.dumps(job), now)
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO jobs_fts (rowid, title, description) VALUES (?, ?, ?)",
+                (row_id, job.get('title', ''), job.get('description', ''))
+            )
+
+        # Drop listings nobody has re-ingested for a long time, then the oldest beyond the size cap
+        row = conn.execute(
+            "SELECT id FROM jobs ORDER BY id DESC LIMIT 1 OFFSET ?", (JOB_INDEX_MAX_ROWS,)
+        ).fetchone()
+        max_dropped_id = row[0] if row else 0
+        cutoff = now - JOB_INDEX_RETENTION
+        conn.execute(
+            "DELETE FROM jobs_fts WHERE rowid IN (SELECT id FROM jobs WHERE ingested_at < ? OR id <= ?)",
+            (cutoff, max_dropped_id)
+        )
+        conn.execute("DELETE FROM jobs WHERE ingested_at < ? OR id <= ?", (cutoff, max_dropped_id))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    return len(jobs)
+
+
+def ingest_quietly(jobs, provider):
+    """ingest(), but a failure is only logged so it never breaks the live search that produced the jobs."""
+    if not JOB_INDEX_ENABLED:
+        return
+    try:
+        ingest(jobs, provider)
+    except Exception as e:
+        log.warning("Job index ingest failed: %s", e)
+
+
+def _phrase(term):
+    """Quote a term as an FTS5 phrase, or return None if it has nothing searchable."""
+    words = _WORD.findall(term)
+    if not words or len("".join(words)) < 2:
+        return None  # e.g. "C" or "R" would match every stray letter
+    return '"' + " ".join(words) + '"'
+
+
+def build_match_queries(skills, job_roles):
+    """
+    Build the FTS5 MATCH expressions for a resume.
+
+    When roles are known a listing must have one of them in its title and
+    skills only add to the BM25 score. Without roles any skill matches.
+
+    Args:
+        skills (list): Skills extracted from the resume
+        job_roles (list): Suitable job roles from the analysis
+
+    Returns:
+        tuple: (required, ranked) MATCH expressions, or (None, None) if there is nothing to search for
+    """
+    roles = []
+    for role in job_roles or []:
+        phrase = _phrase(clean_role(role))
+        if phrase and phrase not in roles:
+            roles.append(phrase)
+
+    skill_phrases = []
+    for skill in (skills or [])[:JOB_INDEX_QUERY_SKILLS]:
+        phrase = _phrase(skill)
+        if phrase and phrase not in skill_phrases and phrase not in roles:
+            skill_phrases.append(phrase)
+
+    if roles:
+        required = "title : (" + " OR ".join(roles) + ")"
+        if not skill_phrases:
+            return required, required
+        # Every phrase is scored by bm25(), but only the role branch has to match
+        return required, f"{required} AND ({required} OR {' OR '.join(skill_phrases)})"
+    if skill_phrases:
+        any_skill = " OR ".join(skill_phrases)
+        return any_skill, any_skill
+    return None, None
+
+
+def search(skills, job_roles, limit=15, max_age=JOB_INDEX_MAX_AGE):
+    """
+    Return the best fresh indexed listings for a resume.
+
+    BM25 ranking costs time per matching listing, so only the newest
+    JOB_INDEX_CANDIDATES fresh listings that match a role are ranked.
+
+    Args:
+        skills (list): Skills extracted from the resume
+        job_roles (list): Suitable job roles from the analysis
+        limit (int): Maximum number of listings
+        max_age (int): Ignore listings ingested more than this many seconds ago
+
+    Returns:
+        list: Job listings without near-duplicates, best BM25 match first
+    """
+    required, ranked = build_match_queries(skills, job_roles)
+    if required is None:
+        return []
+
+    conn = _connection()
+    row = conn.execute(
+        "SELECT id FROM jobs WHERE ingested_at >= ? ORDER BY ingested_at LIMIT 1", (time.time() - max_age,)
+    ).fetchone()
+    if row is None:
+        return []
+    lowest_id = row[0]
+
+    row = conn.execute(
+        "SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ? AND rowid >= ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+        (required, lowest_id, JOB_INDEX_CANDIDATES - 1)
+    ).fetchone()
+    if row is not None:
+        lowest_id = row[0]
+
+    ids = [row_id for row_id, in conn.execute(
+        "SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ? AND rowid >= ? "
+        f"ORDER BY bm25(jobs_fts, {_TITLE_WEIGHT}, {_DESCRIPTION_WEIGHT}) LIMIT ?",
+        (ranked, lowest_id, limit * 2)  # room for near-duplicates dropped below
+    )]
+    if not ids:
+        return []
+
+    values = dict(conn.execute(
+        f"SELECT id, value FROM jobs WHERE id IN ({','.join('?' * len(ids))})", ids
+    ).fetchall())
+    jobs = [json.loads(values[row_id]) for row_id in ids if row_id in values]
+    return dedupe(jobs, 'index')[:limit]
+
+
+def search_if_enough(skills, job_roles, limit=15):
+    """
+    Answer a job search from the index when it has enough fresh matches.
+
+    Args:
+        skills (list): Skills extracted from the resume
+        job_roles (list): Suitable job roles from the analysis
+        limit (int): Maximum number of listings
+
+    Returns:
+        list or None: Indexed listings, or None if the live providers should be used
+    """
+    if not JOB_INDEX_ENABLED:
+        return None
+    try:
+        jobs = search(skills, job_roles, limit=limit)
+    except Exception as e:
+        log.warning("Job index search failed: %s", e)
+        return None
+    if len(jobs) < min(JOB_INDEX_MIN_MATCHES, limit):
+        return None
+    return jobs
+
+
+def search_fallback(skills, job_roles, limit=15):
+    """
+    Answer a job search from whatever the index holds, for when no live provider can be used.
+
+    Unlike search_if_enough, any number of matches up to
+    JOB_INDEX_RETENTION seconds old is served.
+
+    Returns:
+        list: Indexed listings, possibly empty
+    """
+    if not JOB_INDEX_ENABLED:
+        return []
+    try:
+        return search(skills, job_roles, limit=limit, max_age=JOB_INDEX_RETENTION)
+    except Exception as e:
+        log.warning("Job index search failed: %s", e)
+        return []
+
+
+def get_stats():
+    """
+    Return the number of indexed listings and how many are fresh enough to serve.
+
+    Returns:
+        dict: {'jobs': int, 'fresh': int}
+    """
+    try:
+        total, fresh = _connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(ingested_at >= ?), 0) FROM jobs",
+            (time.time() - JOB_INDEX_MAX_AGE,)
+        ).fetchone()
+    except Exception as e:
+        log.warning("Job index stats read failed: %s", e)
+        return {'jobs': 0, 'fresh': 0}
+    return {'jobs': total, 'fresh': fresh}
+
+
+def _load_listings(path):
+    """Read listings from a JSON array, a {"jobs": [...]} object or NDJSON (one listing per line)."""
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        return data.get('jobs', [])
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = commands.add_parser('ingest', help='Ingest listings from JSON or NDJSON files')
+    ingest_parser.add_argument('files', nargs='+')
+    ingest_parser.add_argument('--provider', default='bulk')
+
+    search_parser = commands.add_parser('search', help='Fetch listings for queries from the live providers')
+    search_parser.add_argument('queries', nargs='+')
+    search_parser.add_argument('--per-query', type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        for path in args.files:
+            count = ingest(_load_listings(path), args.provider)
+            print(f"📥 Ingested {count} listings from {path}")
+
+    else:
+        from dotenv import load_dotenv
+        from job_fetcher import fetch_jobs_by_skills
+        from job_fetcher_adzuna import fetch_jobs_adzuna
+
+        load_dotenv()
+        adzuna_id, adzuna_key = os.getenv('ADZUNA_APP_ID'), os.getenv('ADZUNA_APP_KEY')
+        jsearch_key = os.getenv('JSEARCH_API_KEY')
+
+        # The fetchers ingest everything they fetch, so only the searches are needed here
+        for query in args.queries:
+            try:
+                if adzuna_id and adzuna_key:
+                    jobs = fetch_jobs_adzuna([], adzuna_id, adzuna_key, max_results=args.per_query, job_roles=[query])
+                elif jsearch_key:
+                    jobs = fetch_jobs_by_skills([], jsearch_key, max_results=args.per_query, job_roles=[query])
+                else:
+                    raise Exception("No job provider credentials configured")
+                print(f"📥 '{query}': {len(jobs)} listings")
+            except Exception as e:
+                print(f"❌ '{query}': {e}")
+
+    print(f"📊 Index: {get_stats()}")
+
+
+if __name__ == '__main__':
+    main()
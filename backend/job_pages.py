@@ -0,0 +1,243 @@
+"""
+Paged job searches for the jobs-only refinement endpoint (/api/jobs).
+A client that already has an analysis asks for more jobs, or filters
+them by location or employment type, by sending back the skills and
+roles it got, so the resume is not parsed or sent to Gemini again.
+
+Each provider page is fetched as one ranked batch (JOBS_BATCH_SIZE
+listings asked of Adzuna, JSearch's fixed 10) and every listing of it is
+served, page_size at a time, behind an opaque cursor. When a page
+reaches the end of its batch, the provider's next page is fetched in
+the background into the shared job cache, so "load more" is answered
+from the cache instead of waiting on the provider. A provider page that
+came back with fewer listings than were asked for is the last one.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import job_cache
+import job_index
+import provider_quota
+from job_fetcher import fetch_jobs_by_skills_page
+from job_fetcher_adzuna import fetch_jobs_adzuna_page
+from provider_chain import ProvidersUnavailableError, search_with_provider
+
+log = logging.getLogger(__name__)
+
+JOBS_PAGE_SIZE = int(os.getenv('JOBS_PAGE_SIZE', 10))
+JOBS_BATCH_SIZE = int(os.getenv('JOBS_BATCH_SIZE', 30))  # listings asked of Adzuna per provider page
+JOBS_MAX_PROVIDER_PAGE = int(os.getenv('JOBS_MAX_PROVIDER_PAGE', 10))
+JOBS_PREFETCH = os.getenv('JOBS_PREFETCH', 'true').lower() == 'true'
+# Don't prefetch from a provider whose quota has fewer calls left than this
+JOBS_PREFETCH_MIN_QUOTA = float(os.getenv('JOBS_PREFETCH_MIN_QUOTA', 5))
+
+EMPLOYMENT_TYPES = ('full_time', 'internship')
+_MAX_TERMS = 20
+
+_prefetch_pool = None
+_prefetch_pool_pid = None
+_prefetch_pool_lock = threading.Lock()
+
+
+class InvalidJobQueryError(ValueError):
+    """Raised for a malformed jobs request or a cursor that doesn't belong to it."""
+
+
+def _get_prefetch_pool():
+    """Return this process's prefetch pool, recreating it after a fork."""
+    global _prefetch_pool, _prefetch_pool_pid
+
+    pid = os.getpid()
+    if _prefetch_pool is None or _prefetch_pool_pid != pid:
+        with _prefetch_pool_lock:
+            if _prefetch_pool is None or _prefetch_pool_pid != pid:
+                _prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='jobs-prefetch')
+                _prefetch_pool_pid = pid
+
+    return _prefetch_pool
+
+
+def _terms(payload, *names):
+    """Read a list of strings from the first of `names` present in the payload."""
+    value = next((payload[name] for name in names if payload.get(name)), [])
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(term, str) for term in value):
+        raise InvalidJobQueryError(f"'{names[0]}' must be a list of strings")
+    return [term.strip() for term in value if term.strip()][:_MAX_TERMS]
+
+
+def parse_query(payload):
+    """
+    Validate the body of a jobs request.
+
+    Args:
+        payload (dict): JSON body with 'skills' and 'roles' (or the
+            analysis' 'suitable_roles'), and optionally 'location',
+            'employment_type' ('full_time' or 'internship') and 'page_size'
+
+    Returns:
+        dict: Normalized query with skills, roles, location, employment_type and page_size
+
+    Raises:
+        InvalidJobQueryError: If the body is malformed
+    """
+    if not isinstance(payload, dict):
+        raise InvalidJobQueryError("Expected a JSON object")
+
+    skills = _terms(payload, 'skills')
+    roles = _terms(payload, 'roles', 'suitable_roles')
+    if not skills and not roles:
+        raise InvalidJobQueryError("Provide at least one skill or role")
+
+    location = payload.get('location') or None
+    if location is not None and not isinstance(location, str):
+        raise InvalidJobQueryError("'location' must be a string")
+
+    employment_type = payload.get('employment_type') or None
+    if employment_type is not None and employment_type not in EMPLOYMENT_TYPES:
+        raise InvalidJobQueryError(f"'employment_type' must be one of: {', '.join(EMPLOYMENT_TYPES)}")
+
+    try:
+        page_size = int(payload.get('page_size') or JOBS_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise InvalidJobQueryError("'page_size' must be a number")
+    if not 1 <= page_size <= JOBS_BATCH_SIZE:
+        raise InvalidJobQueryError(f"'page_size' must be between 1 and {JOBS_BATCH_SIZE}")
+
+    return {
+        'skills': skills,
+        'roles': roles,
+        'location': location.strip()[:100] if location else None,
+        'employment_type': employment_type,
+        'page_size': page_size
+    }
+
+
+def _fingerprint(query):
+    fields = {name: query[name] for name in ('skills', 'roles', 'location', 'employment_type')}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(query, provider, page, offset):
+    """Build the opaque cursor for the listings of a provider page starting at offset."""
+    data = json.dumps({'q': _fingerprint(query), 'p': provider, 'n': page, 'o': offset}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, query):
+    """
+    Read a cursor back.
+
+    Returns:
+        tuple: (provider, provider page, offset in the page's batch)
+
+    Raises:
+        InvalidJobQueryError: If the cursor is malformed or was issued for another search
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        fingerprint, provider, page, offset = data['q'], data['p'], int(data['n']), int(data['o'])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidJobQueryError("Invalid cursor")
+
+    if fingerprint != _fingerprint(query):
+        raise InvalidJobQueryError("Cursor belongs to a different search")
+    if not 1 <= page <= JOBS_MAX_PROVIDER_PAGE or offset < 0:
+        raise InvalidJobQueryError("Invalid cursor")
+    return provider, page, offset
+
+
+def _providers(query, page, adzuna_credentials, jsearch_api_key):
+    """Provider chain for one page of a search, in the same order as the analysis' job search."""
+    filters = {'page': page, 'location': query['location'], 'employment_type': query['employment_type']}
+    providers = []
+    if adzuna_credentials:
+        providers.append(('adzuna', partial(
+            fetch_jobs_adzuna_page, query['skills'], *adzuna_credentials,
+            per_page=JOBS_BATCH_SIZE, job_roles=query['roles'], **filters
+        )))
+    if jsearch_api_key:
+        providers.append(('jsearch', partial(
+            fetch_jobs_by_skills_page, query['skills'], jsearch_api_key, job_roles=query['roles'], **filters
+        )))
+    return providers
+
+
+def _should_prefetch(provider):
+    if not JOBS_PREFETCH or not job_cache.JOB_CACHE_ENABLED:
+        # Without the shared cache a prefetched page would be fetched again when asked for
+        return False
+    left = provider_quota.remaining(provider)
+    return left is None or left >= JOBS_PREFETCH_MIN_QUOTA
+
+
+def _prefetch(provider, fetch, page):
+    try:
+        search_with_provider([(provider, fetch)])
+        log.info("Prefetched the next provider page", extra={'provider': provider, 'page': page, 'sample': True})
+    except Exception as e:
+        log.warning("Prefetch failed: %s", e, extra={'provider': provider, 'page': page})
+
+
+def fetch_page(query, cursor=None, adzuna_credentials=None, jsearch_api_key=None):
+    """
+    Return one page of a jobs-only search.
+
+    The first page comes from the provider chain (Adzuna, then JSearch);
+    later pages stay with the provider that answered it. If no provider
+    answers the first page of an unfiltered search, the local job index
+    is served instead.
+
+    Args:
+        query (dict): Search from parse_query
+        cursor (str): next_cursor of the previous page, None for the first page
+        adzuna_credentials (tuple): (app ID, app key), None if Adzuna isn't configured
+        jsearch_api_key (str): JSearch key, None if JSearch isn't configured
+
+    Returns:
+        dict: {'jobs': list, 'provider': str, 'next_cursor': str or None}
+
+    Raises:
+        InvalidJobQueryError: If the cursor is invalid for this search
+        ProvidersUnavailableError: If no provider answered
+    """
+    provider, page, offset = decode_cursor(cursor, query) if cursor else (None, 1, 0)
+
+    providers = _providers(query, page, adzuna_credentials, jsearch_api_key)
+    if provider is not None:
+        providers = [entry for entry in providers if entry[0] == provider]
+        if not providers:
+            raise InvalidJobQueryError(f"Provider '{provider}' is no longer available")
+
+    try:
+        provider, (batch, more) = search_with_provider(providers)
+    except ProvidersUnavailableError:
+        if cursor or query['location'] or query['employment_type']:
+            raise
+        jobs = job_index.search_fallback(query['skills'], query['roles'], limit=query['page_size'])
+        if not jobs:
+            raise
+        return {'jobs': jobs, 'provider': 'index', 'next_cursor': None}
+
+    end = offset + query['page_size']
+    # more is False when the provider returned a short page: asking for the next one would only spend quota
+    more_pages = more and page < JOBS_MAX_PROVIDER_PAGE
+    next_cursor = None
+    if end < len(batch):
+        next_cursor = encode_cursor(query, provider, page, end)
+    elif more_pages:
+        next_cursor = encode_cursor(query, provider, page + 1, 0)
+
+    # Fetch the next provider page while this one is read if the next request will need it
+    if more_pages and end + query['page_size'] > len(batch) and _should_prefetch(provider):
+        fetch = dict(_providers(query, page + 1, adzuna_credentials, jsearch_api_key))[provider]
+        _get_prefetch_pool().submit(_prefetch, provider, fetch, page + 1)
+
+    return {'jobs': batch[offset:end], 'provider': provider, 'next_cursor': next_cursor}
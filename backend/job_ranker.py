@@ -0,0 +1,140 @@
+"""
+Relevance ranking of job listings against a resume.
+All candidate listings are scored in one batch: their titles and
+descriptions become sparse TF-IDF vectors held in flat NumPy arrays, and
+the cosine similarity with the resume's skills and roles is computed for
+every listing at once. Listings are tokenized once into term ids of a
+per-worker vocabulary, so re-ranking the cached and indexed listings
+that most searches return costs almost nothing.
+"""
+import os
+import re
+import threading
+
+import numpy as np
+
+# How many times more listings than needed the providers are asked for, to re-rank and deduplicate
+JOB_RANK_OVERFETCH = int(os.getenv('JOB_RANK_OVERFETCH', 3))
+# Tokenized listings kept per worker; the vocabulary is rebuilt when this fills up
+JOB_RANK_CACHE_ITEMS = int(os.getenv('JOB_RANK_CACHE_ITEMS', 5000))
+
+# Title terms count this many times as much as description terms
+_TITLE_WEIGHT = 3.0
+
+# Keeps "c++" and "c#" together; splits "node.js" into "node" and "js"
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+_vocabulary = {}  # term -> id
+_encoded = {}  # (title, description) -> (title term ids, description term ids)
+_lock = threading.Lock()
+
+
+def _tokens(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _encode(job, vocabulary, encoded):
+    """Return a listing's title and description as arrays of term ids, tokenizing it on first sight."""
+    key = (job.get('title') or '', job.get('description') or '')
+    fields = encoded.get(key)
+    if fields is None:
+        with _lock:
+            fields = tuple(
+                np.array([vocabulary.setdefault(token, len(vocabulary)) for token in _tokens(text)], dtype=np.int64)
+                for text in key
+            )
+            encoded[key] = fields
+    return fields
+
+
+def _current_vocabulary():
+    """Return this worker's vocabulary and listing cache, starting fresh ones when the cache is full."""
+    global _vocabulary, _encoded
+
+    with _lock:
+        if len(_encoded) >= JOB_RANK_CACHE_ITEMS:
+            # Rebind rather than clear, so batches already being scored keep consistent ids
+            _vocabulary, _encoded = {}, {}
+        return _vocabulary, _encoded
+
+
+def score_jobs(jobs, skills, job_roles=None):
+    """
+    Score listings by TF-IDF cosine similarity with the resume's skills and roles.
+
+    Args:
+        jobs (list): Job listings in the common job format
+        skills (list): Skills extracted from the resume
+        job_roles (list): Optional suitable job roles
+
+    Returns:
+        numpy.ndarray: One score in [0, 1] per listing
+    """
+    query = [token for phrase in list(skills or []) + list(job_roles or []) for token in _tokens(phrase)]
+    if not jobs or not query:
+        return np.zeros(len(jobs))
+
+    vocabulary, encoded = _current_vocabulary()
+    fields = [ids for job in jobs for ids in _encode(job, vocabulary, encoded)]
+    field_lengths = np.array([len(ids) for ids in fields])
+    if field_lengths.sum() == 0:
+        return np.zeros(len(jobs))
+
+    # Fields alternate title, description, title, ... so a field's listing is index // 2
+    field_index = np.repeat(np.arange(len(fields)), field_lengths)
+    docs = field_index // 2
+    weights = np.where(field_index % 2 == 0, _TITLE_WEIGHT, 1.0)
+
+    # Renumber the batch's terms 0..n-1 and sum term weights per (listing, term) pair
+    batch_terms, term_ids = np.unique(np.concatenate(fields), return_inverse=True)
+    vocabulary_size = len(batch_terms)
+    pairs, pair_index = np.unique(docs * vocabulary_size + term_ids, return_inverse=True)
+    tf = np.bincount(pair_index, weights=weights)
+    pair_docs = pairs // vocabulary_size
+    pair_terms = pairs % vocabulary_size
+
+    # Smoothed IDF and sublinear TF, as in scikit-learn's TfidfVectorizer
+    df = np.bincount(pair_terms, minlength=vocabulary_size)
+    idf = np.log((1 + len(jobs)) / (1 + df)) + 1
+    pair_weights = (1 + np.log(tf)) * idf[pair_terms]
+    doc_norms = np.sqrt(np.bincount(pair_docs, weights=pair_weights ** 2, minlength=len(jobs)))
+
+    # Query vector over the batch's terms; terms no listing contains cannot add to any score
+    query_ids = np.array([vocabulary[token] for token in query if token in vocabulary], dtype=np.int64)
+    positions = np.searchsorted(batch_terms, query_ids)
+    in_batch = positions < vocabulary_size
+    in_batch[in_batch] = batch_terms[positions[in_batch]] == query_ids[in_batch]
+    query_counts = np.bincount(positions[in_batch], minlength=vocabulary_size)
+    query_vector = np.where(query_counts > 0, (1 + np.log(np.maximum(query_counts, 1))) * idf, 0.0)
+    query_norm = np.sqrt((query_vector ** 2).sum())
+    if query_norm == 0:
+        return np.zeros(len(jobs))
+
+    dots = np.bincount(pair_docs, weights=pair_weights * query_vector[pair_terms], minlength=len(jobs))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(doc_norms > 0, dots / (doc_norms * query_norm), 0.0)
+    return scores
+
+
+def rank_jobs(jobs, skills, job_roles=None, top_k=None):
+    """
+    Order listings by relevance to the resume, best first.
+
+    Listings with equal scores keep their original order.
+
+    Args:
+        jobs (list): Job listings in the common job format
+        skills (list): Skills extracted from the resume
+        job_roles (list): Optional suitable job roles
+        top_k (int): Return at most this many listings (all if None)
+
+    Returns:
+        list: The top_k most relevant listings
+    """
+    if not jobs:
+        return []
+    scores = score_jobs(jobs, skills, job_roles)
+    order = np.argsort(-scores, kind='stable')
+    if top_k is not None:
+        order = order[:top_k]
+    return [jobs[i] for i in order]
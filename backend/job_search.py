@@ -0,0 +1,195 @@
+"""
+Search helpers shared by the job providers, and multi-role fan-out.
+Fan-out searches every role Gemini suggested (plus optionally the top
+skills) concurrently on a bounded per-worker pool, waits at most
+JOB_FANOUT_DEADLINE seconds, then merges the per-query results
+round-robin and drops listings that duplicate one seen under another
+query (see job_dedupe).
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from job_dedupe import DUPLICATES_DROPPED, NearDuplicateIndex
+from metrics import increment
+from structured_logging import in_context
+
+log = logging.getLogger(__name__)
+
+JOB_FANOUT = os.getenv('JOB_FANOUT', 'false').lower() == 'true'
+JOB_FANOUT_MAX_ROLES = int(os.getenv('JOB_FANOUT_MAX_ROLES', 4))
+JOB_FANOUT_SKILLS = int(os.getenv('JOB_FANOUT_SKILLS', 1))  # top skills searched on their own
+JOB_FANOUT_WORKERS = int(os.getenv('JOB_FANOUT_WORKERS', 8))
+JOB_FANOUT_DEADLINE = float(os.getenv('JOB_FANOUT_DEADLINE', 8))  # seconds
+
+ROLE_PREFIXES = ["Junior", "Senior", "Mid-level", "Lead", "Principal", "Entry-level", "Entry Level"]
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def clean_role(role):
+    """Strip seniority prefixes ("Junior", "Senior", ...) so the role searches wider."""
+    for prefix in ROLE_PREFIXES:
+        role = role.replace(prefix, "").strip()
+    return role
+
+
+def build_queries(skills, job_roles, max_roles=JOB_FANOUT_MAX_ROLES, skill_queries=JOB_FANOUT_SKILLS):
+    """
+    List the distinct searches for a resume: its cleaned roles, then its top skills.
+
+    Args:
+        skills (list): Skills extracted from the resume
+        job_roles (list): Suitable job roles from the analysis
+        max_roles (int): Maximum number of roles searched
+        skill_queries (int): Number of top skills searched on their own
+
+    Returns:
+        list: Search keywords, most important first
+    """
+    queries = []
+    seen = set()
+    candidates = [clean_role(role) for role in (job_roles or [])[:max_roles]]
+    candidates += list(skills or [])[:skill_queries]
+    for query in candidates:
+        key = " ".join(query.lower().split())
+        if key and key not in seen:
+            seen.add(key)
+            queries.append(query)
+    return queries or ["software developer"]
+
+
+def _get_pool():
+    """Return this process's fan-out pool, recreating it after a fork."""
+    global _pool, _pool_pid
+
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = ThreadPoolExecutor(max_workers=JOB_FANOUT_WORKERS, thread_name_prefix='job-fanout')
+                _pool_pid = pid
+
+    return _pool
+
+
+def interleave(result_lists, max_results):
+    """
+    Merge result lists round-robin, skipping listings that duplicate one already taken.
+
+    Args:
+        result_lists (list): One list of listings per query, best first
+        max_results (int): Maximum number of listings returned
+
+    Returns:
+        list: Merged listings
+    """
+    merged = []
+    index = NearDuplicateIndex()
+    dropped = 0
+    for rank in range(max((len(results) for results in result_lists), default=0)):
+        for results in result_lists:
+            if rank >= len(results):
+                continue
+            if not index.add(results[rank]):
+                dropped += 1
+                continue
+            merged.append(results[rank])
+            if len(merged) >= max_results:
+                break
+        if len(merged) >= max_results:
+            break
+    if dropped:
+        increment(DUPLICATES_DROPPED, dropped, source='fanout')
+    return merged
+
+
+def fan_out(queries, search, max_results=15, deadline=JOB_FANOUT_DEADLINE):
+    """
+    Run search(query) for every query concurrently and merge the results.
+
+    Queries that fail or miss the deadline are skipped; their calls finish
+    in the background (bounded by the HTTP timeouts) and still fill the
+    job cache and index for the next request.
+
+    Args:
+        queries (list): Search keywords, most important first
+        search (callable): search(query) returning a list of listings
+        max_results (int): Maximum number of listings returned
+        deadline (float): Seconds to wait for all searches
+
+    Returns:
+        list: Merged, deduplicated listings
+
+    Raises:
+        Exception: If every search failed
+    """
+    pool = _get_pool()
+    started = time.monotonic()
+    futures = [pool.submit(in_context(search), query) for query in queries]
+    done, pending = wait(futures, timeout=deadline)
+
+    outcomes = [_MISSED if future in pending else _outcome(future) for future in futures]
+    return _merge_outcomes(queries, outcomes, max_results, deadline, started)
+
+
+_MISSED = object()
+_background_tasks = set()
+
+
+def _outcome(future):
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+
+def _merge_outcomes(queries, outcomes, max_results, deadline, started):
+    """Merge per-query results, skipping searches that failed or missed the deadline."""
+    result_lists = []
+    errors = []
+    for query, outcome in zip(queries, outcomes):
+        if outcome is _MISSED:
+            log.warning("Job search missed the fan-out deadline", extra={'query': query, 'deadline': deadline})
+        elif isinstance(outcome, Exception):
+            log.warning("Job search failed: %s", outcome, extra={'query': query})
+            errors.append(outcome)
+        else:
+            result_lists.append(outcome)
+
+    if errors and len(errors) == len(queries):
+        raise errors[0]
+
+    jobs = interleave(result_lists, max_results)
+    log.info("Fan-out done", extra={'searches': len(queries), 'jobs': len(jobs),
+                                    'seconds': round(time.monotonic() - started, 3), 'sample': True})
+    return jobs
+
+
+async def fan_out_async(queries, search, max_results=15, deadline=JOB_FANOUT_DEADLINE):
+    """
+    Async version of fan_out: search(query) is a coroutine function.
+
+    Searches that miss the deadline keep running as background tasks.
+
+    Returns:
+        list: Merged, deduplicated listings
+
+    Raises:
+        Exception: If every search failed
+    """
+    started = time.monotonic()
+    tasks = [asyncio.ensure_future(search(query)) for query in queries]
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    for task in pending:
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    outcomes = [_MISSED if task in pending else _outcome(task) for task in tasks]
+    return _merge_outcomes(queries, outcomes, max_results, deadline, started)
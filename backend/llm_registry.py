@@ -0,0 +1,159 @@
+"""
+Process-wide registry of initialized LLM clients and prompt chains.
+Building a ChatGoogleGenerativeAI client sets up auth and a gRPC channel,
+so each worker builds one per (model, temperature, API key) on first use
+and reuses it for every request. The registry is keyed by process ID, so
+objects created in a gunicorn master are never reused after a fork.
+
+LangChain and the Google client stack take over a second to import, so
+with LAZY_IMPORTS (the default) they are only imported when the first
+client is built, or by import_clients() from a warm-up thread or a
+preloading gunicorn master.
+"""
+import hashlib
+import os
+import threading
+from types import SimpleNamespace
+
+LAZY_IMPORTS = os.getenv('LAZY_IMPORTS', 'true').lower() == 'true'
+
+# Point the Gemini client at another endpoint (e.g. the benchmark stub, "http://127.0.0.1:8090");
+# it is then called over REST instead of gRPC
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+
+_lock = threading.Lock()
+_pid = None
+_llms = {}
+_prompts = {}
+_chains = {}
+_classes = None
+
+
+def import_clients():
+    """
+    Import LangChain and the Gemini chat model (once per process; later calls are free).
+
+    Returns:
+        SimpleNamespace: ChatGoogleGenerativeAI, PromptTemplate and LLMChain
+    """
+    global _classes
+    if _classes is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from langchain.prompts import PromptTemplate
+        from langchain.chains import LLMChain
+        _classes = SimpleNamespace(ChatGoogleGenerativeAI=ChatGoogleGenerativeAI,
+                                   PromptTemplate=PromptTemplate, LLMChain=LLMChain)
+    return _classes
+
+
+if not LAZY_IMPORTS:
+    import_clients()
+
+
+def _check_pid():
+    """Drop everything built by a parent process (call with _lock held)."""
+    global _pid
+    pid = os.getpid()
+    if _pid != pid:
+        _pid = pid
+        _llms.clear()
+        _prompts.clear()
+        _chains.clear()
+
+
+def _api_key_id(api_key):
+    """Key the registry by a digest so raw API keys aren't kept as dict keys."""
+    return hashlib.sha256((api_key or "").encode('utf-8')).hexdigest()
+
+
+def get_llm(model, temperature, api_key):
+    """
+    Return the shared Gemini chat model for these settings, creating it on first use.
+
+    Args:
+        model (str): Gemini model name
+        temperature (float): Sampling temperature
+        api_key (str): Google Gemini API key
+
+    Returns:
+        ChatGoogleGenerativeAI: Initialized chat model
+    """
+    key = (model, temperature, _api_key_id(api_key))
+    with _lock:
+        _check_pid()
+        llm = _llms.get(key)
+        if llm is None:
+            endpoint = {}
+            if GEMINI_API_ENDPOINT:
+                endpoint = {'client_options': {'api_endpoint': GEMINI_API_ENDPOINT}, 'transport': 'rest'}
+            llm = import_clients().ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=api_key,
+                temperature=temperature,
+                **endpoint
+            )
+            _llms[key] = llm
+    return llm
+
+
+def get_prompt(template):
+    """
+    Return the compiled PromptTemplate for a template string.
+
+    Args:
+        template (str): Prompt template with a {resume_text} variable
+
+    Returns:
+        PromptTemplate: Compiled prompt
+    """
+    with _lock:
+        _check_pid()
+        prompt = _prompts.get(template)
+        if prompt is None:
+            prompt = import_clients().PromptTemplate(input_variables=["resume_text"], template=template)
+            _prompts[template] = prompt
+    return prompt
+
+
+def get_chain(model, temperature, api_key, template):
+    """
+    Return the shared LLMChain combining a chat model and a prompt template.
+
+    Args:
+        model (str): Gemini model name
+        temperature (float): Sampling temperature
+        api_key (str): Google Gemini API key
+        template (str): Prompt template with a {resume_text} variable
+
+    Returns:
+        LLMChain: Ready-to-run chain
+    """
+    llm = get_llm(model, temperature, api_key)
+    prompt = get_prompt(template)
+
+    key = (model, temperature, _api_key_id(api_key), template)
+    with _lock:
+        _check_pid()
+        chain = _chains.get(key)
+        if chain is None:
+            chain = import_clients().LLMChain(llm=llm, prompt=prompt)
+            _chains[key] = chain
+    return chain
+
+
+def warm_up(model, temperature, api_key, template):
+    """
+    Build the client and chain for these settings ahead of the first request.
+
+    Call this in each worker after it has forked (e.g. at app import time
+    without --preload); anything built before a fork is rebuilt lazily.
+    """
+    get_chain(model, temperature, api_key, template)
+
+
+def clear():
+    """Drop every cached client, prompt and chain in this process."""
+    with _lock:
+        _llms.clear()
+        _prompts.clear()
+        _chains.clear()
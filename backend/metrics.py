@@ -0,0 +1,298 @@
+"""
+Latency histograms and counters for the analyze hot path.
+Each worker accumulates samples in memory and a background thread adds
+them to a SQLite table every METRICS_FLUSH_INTERVAL seconds, so
+/api/metrics (served by any gunicorn worker) reports totals across all
+workers in the Prometheus text format.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import structured_logging
+from storage import get_connection
+
+log = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))  # seconds
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = 'careerup_stage_duration_seconds'
+PROVIDER_SECONDS = 'careerup_provider_request_duration_seconds'
+PROVIDER_REQUESTS = 'careerup_provider_requests_total'
+CACHE_REQUESTS = 'careerup_cache_requests_total'
+CACHE_HIT_RATIO = 'careerup_cache_hit_ratio'
+QUOTA_DECISIONS = 'careerup_provider_quota_decisions_total'
+DUPLICATES_DROPPED = 'careerup_job_duplicates_dropped_total'
+ADMISSION_DECISIONS = 'careerup_admission_decisions_total'
+
+_METRICS = {
+    STAGE_SECONDS: ('histogram', 'Time spent in each stage of a resume analysis'),
+    PROVIDER_SECONDS: ('histogram', 'Latency of calls to external providers (Adzuna, JSearch, Gemini)'),
+    PROVIDER_REQUESTS: ('counter', 'Calls to external providers by response status'),
+    CACHE_REQUESTS: ('counter', 'Cache and index lookups by result'),
+    CACHE_HIT_RATIO: ('gauge', 'Share of lookups answered without a provider or Gemini call'),
+    QUOTA_DECISIONS: ('counter', 'Provider quota checks by decision (granted or denied)'),
+    DUPLICATES_DROPPED: ('counter', 'Duplicate job listings dropped, by where they were merged'),
+    ADMISSION_DECISIONS: ('counter', 'LLM admission decisions (admitted, rejected_queue_full, rejected_timeout)'),
+}
+
+# Cache lookup results counted as hits in CACHE_HIT_RATIO
+_HIT_RESULTS = ('hit', 'stale', 'coalesced', 'quota_fallback')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_samples (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels)
+);
+"""
+
+_pending = {}
+_pending_lock = threading.Lock()
+_flusher_pid = None
+
+
+def _format_labels(labels):
+    """Render labels the way Prometheus expects them inside {...}, in a stable order."""
+    parts = []
+    for name, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return ",".join(parts)
+
+
+def _add(name, labels, amount):
+    _ensure_flusher()
+    key = (name, _format_labels(labels))
+    with _pending_lock:
+        _pending[key] = _pending.get(key, 0) + amount
+
+
+def observe(name, seconds, **labels):
+    """
+    Record one latency sample in a histogram.
+
+    Args:
+        name (str): Histogram name, e.g. STAGE_SECONDS
+        seconds (float): Observed duration
+        **labels: Label values, e.g. stage='parse'
+    """
+    if not METRICS_ENABLED:
+        return
+    for bound in LATENCY_BUCKETS:
+        # Empty buckets are still written so every series exposes the full bucket list
+        _add(f"{name}_bucket", {**labels, 'le': f"{bound:g}"}, 1 if seconds <= bound else 0)
+    _add(f"{name}_bucket", {**labels, 'le': '+Inf'}, 1)
+    _add(f"{name}_sum", labels, seconds)
+    _add(f"{name}_count", labels, 1)
+
+
+def increment(name, amount=1, **labels):
+    """
+    Add to a counter.
+
+    Args:
+        name (str): Counter name, e.g. PROVIDER_REQUESTS
+        amount (int): Amount to add
+        **labels: Label values, e.g. provider='adzuna', status='200'
+    """
+    if METRICS_ENABLED:
+        _add(name, labels, amount)
+
+
+def count_cache(cache, result):
+    """Count a lookup in a cache or index; result is 'hit', 'stale', 'miss', 'coalesced' or 'quota_fallback'."""
+    increment(CACHE_REQUESTS, cache=cache, result=result)
+
+
+@contextmanager
+def timer(stage):
+    """Time the wrapped block as one sample of an analysis stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(STAGE_SECONDS, time.perf_counter() - start, stage=stage)
+
+
+class ProviderCall:
+    """Status holder for provider_call; set status to the HTTP status code once known."""
+
+    def __init__(self):
+        self.status = 'ok'
+
+
+@contextmanager
+def provider_call(provider):
+    """
+    Time a call to an external provider and count it by status.
+
+    The status is whatever the block set on the yielded ProviderCall
+    (default 'ok'); if the block raises before setting one it is 'error'.
+    """
+    call = ProviderCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        if call.status == 'ok':
+            call.status = 'error'
+        raise
+    finally:
+        observe(PROVIDER_SECONDS, time.perf_counter() - start, provider=provider)
+        increment(PROVIDER_REQUESTS, provider=provider, status=call.status)
+
+
+class RequestTimings:
+    """Per-request stage timings; every stage is also recorded in the stage histogram."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        # Records logged inside the stage are tagged with it
+        token = structured_logging.stage.set(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            structured_logging.stage.reset(token)
+            # Timing the same stage twice in one request adds the durations up
+            self.stages[name] = self.stages.get(name, 0) + elapsed
+            observe(STAGE_SECONDS, elapsed, stage=name)
+
+    def as_dict(self):
+        """Return stage durations and the total so far, in milliseconds."""
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+        timings['total'] = round((time.perf_counter() - self.started) * 1000, 1)
+        return timings
+
+
+def _connection():
+    return get_connection('metrics', _SCHEMA)
+
+
+def flush():
+    """Add this worker's pending samples to the shared table."""
+    global _pending
+
+    with _pending_lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return
+
+    try:
+        conn = _connection()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO metric_samples (name, labels, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value",
+                [(name, labels, value) for (name, labels), value in pending.items()]
+            )
+    except Exception as e:
+        # Put the samples back so the next flush retries them
+        log.warning("Metrics flush failed: %s", e)
+        with _pending_lock:
+            for key, value in pending.items():
+                _pending[key] = _pending.get(key, 0) + value
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        flush()
+
+
+def _ensure_flusher():
+    """Start this process's flush thread, again after a fork."""
+    global _flusher_pid
+
+    pid = os.getpid()
+    if _flusher_pid != pid:
+        with _pending_lock:
+            if _flusher_pid != pid:
+                if _flusher_pid is not None:
+                    # Samples copied from the parent are flushed by the parent, not every child
+                    _pending.clear()
+                _flusher_pid = pid
+                threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+
+
+atexit.register(flush)
+
+
+def render():
+    """
+    Return every metric, summed over all workers, in the Prometheus text format.
+
+    Samples other workers recorded in the last METRICS_FLUSH_INTERVAL
+    seconds may not be included yet.
+    """
+    flush()
+    try:
+        rows = _connection().execute(
+            "SELECT name, labels, value FROM metric_samples ORDER BY name, labels"
+        ).fetchall()
+    except Exception as e:
+        log.warning("Metrics read failed: %s", e)
+        rows = []
+
+    samples = {}
+    for name, labels, value in rows:
+        for metric in _METRICS:
+            if name == metric or name.startswith(metric + '_'):
+                samples.setdefault(metric, []).append((name, labels, value))
+                break
+
+    # Hit ratio per cache, from the aggregated lookup counters
+    lookups = {}
+    for _, labels, value in samples.get(CACHE_REQUESTS, []):
+        fields = dict(part.split('=', 1) for part in labels.split(','))
+        cache = fields['cache'].strip('"')
+        hits, total = lookups.get(cache, (0, 0))
+        hit = fields['result'].strip('"') in _HIT_RESULTS
+        lookups[cache] = (hits + (value if hit else 0), total + value)
+    samples[CACHE_HIT_RATIO] = [
+        (CACHE_HIT_RATIO, _format_labels({'cache': cache}), hits / total)
+        for cache, (hits, total) in sorted(lookups.items()) if total
+    ]
+
+    lines = []
+    for metric, (kind, help_text) in _METRICS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, labels, value in _sort_buckets(samples.get(metric, [])):
+            label_text = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_value(value):
+    """Render a sample value exactly: {:g} would round large counters and sums to 6 digits."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _sort_buckets(samples):
+    """Order histogram buckets by their numeric upper bound rather than as strings."""
+    def sort_key(sample):
+        name, labels, _ = sample
+        series = ",".join(part for part in labels.split(',') if not part.startswith('le='))
+        bound = [part for part in labels.split(',') if part.startswith('le=')]
+        le = float(bound[0][4:-1].replace('+Inf', 'inf')) if bound else 0
+        return (series, not name.endswith('_bucket'), name, le)
+
+    return sorted(samples, key=sort_key)
@@ -0,0 +1,270 @@
+"""
+Sandboxed PDF text extraction on a pre-forked process pool.
+PyMuPDF runs in separate worker processes with a memory cap
+(RLIMIT_AS), a per-document time limit and a page limit, so a
+pathological or huge PDF fails fast with a clear error instead of
+pinning a web worker. Pages of long documents are extracted in parallel
+chunks and joined once at the end.
+
+When a document overruns its time limit inside PyMuPDF the whole pool
+has to be terminated (a ProcessPoolExecutor can't lose one process and
+keep going). Only that document is rejected: the other documents that
+were in flight on the pool are resubmitted to a fresh one with the time
+they have left. A crash can't be pinned on one document, so after one
+each in-flight task is retried alone in a throwaway process.
+"""
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from resume_parser import PAGE_BREAK, extract_pages, open_pdf
+
+try:
+    import resource
+except ImportError:  # Windows: no address-space limit
+    resource = None
+
+PDF_POOL_ENABLED = os.getenv('PDF_POOL_ENABLED', 'true').lower() == 'true'
+PDF_POOL_WORKERS = int(os.getenv('PDF_POOL_WORKERS', 2))
+PDF_PARSE_TIMEOUT = float(os.getenv('PDF_PARSE_TIMEOUT', 10))  # seconds per document
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 50))
+PDF_WORKER_MEMORY_MB = int(os.getenv('PDF_WORKER_MEMORY_MB', 1024))
+# Documents with at least this many pages are split into chunks across the pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 12))
+
+# Extra time the parent waits past PDF_PARSE_TIMEOUT before killing the pool
+_KILL_GRACE = 1.0
+
+
+class PDFRejectedError(Exception):
+    """Raised when a PDF breaks a page, time or memory limit or crashes the parser."""
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+# Pools terminated because one of their documents overran; the others in flight on them are innocent
+_overrun_pools = weakref.WeakSet()
+
+
+def _init_worker(memory_mb):
+    """Runs once in every pool process: load PyMuPDF and cap its address space."""
+    import fitz  # noqa: F401 - imported here so the first parse doesn't pay for it
+
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _on_alarm(signum, frame):
+    raise PDFRejectedError(f"PDF took longer than {PDF_PARSE_TIMEOUT:g}s to parse")
+
+
+def _extract_pages(source, start, stop, max_pages, time_limit, split_from):
+    """
+    Pool task: extract pages [start, stop) of a document.
+
+    With stop=None the whole document is extracted, unless it has at least
+    split_from pages; then only the page count is returned so the parent
+    can spread the pages over the pool.
+
+    Also used in-process (PDF_POOL_ENABLED=false) with time_limit=None,
+    since only a process's main thread can set an alarm.
+
+    Returns:
+        tuple: (page count, list of page texts or None)
+    """
+    alarm = time_limit is not None and hasattr(signal, 'setitimer')
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        doc = open_pdf(source)
+        try:
+            page_count = len(doc)
+            if page_count > max_pages:
+                raise PDFRejectedError(f"PDF has {page_count} pages; at most {max_pages} are allowed")
+            if stop is None and page_count >= split_from:
+                return page_count, None
+            return page_count, extract_pages(doc, start, stop)
+        finally:
+            doc.close()
+
+    except MemoryError:
+        raise PDFRejectedError(f"PDF needs more than {PDF_WORKER_MEMORY_MB} MB to parse")
+
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _new_pool(workers):
+    # forkserver children start from a clean process, not a copy of a threaded web worker
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(PDF_WORKER_MEMORY_MB,)
+    )
+
+
+def _get_pool():
+    """Return this process's extraction pool, recreating it after a fork or a kill."""
+    global _pool, _pool_pid
+
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = _new_pool(PDF_POOL_WORKERS)
+                _pool_pid = pid
+
+    return _pool
+
+
+def _kill_pool(pool, overrun=False):
+    """
+    Terminate a pool that is stuck or broken; the next call starts a fresh one.
+
+    Args:
+        pool (ProcessPoolExecutor): The pool to terminate
+        overrun (bool): True if a document overran its time limit, so the
+            other tasks failed with the pool should be resubmitted
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        if overrun:
+            _overrun_pools.add(pool)
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def warm_up():
+    """Start every pool process now rather than on the first uploads."""
+    pool = _get_pool()
+    # Each submit only spawns a process when none is idle, so keep them all busy at once
+    futures = [pool.submit(time.sleep, 0.2) for _ in range(PDF_POOL_WORKERS)]
+    for future in futures:
+        future.result()
+
+
+def _timed_out():
+    return PDFRejectedError(f"PDF took longer than {PDF_PARSE_TIMEOUT:g}s to parse")
+
+
+class _Task:
+    """
+    One _extract_pages call on the shared pool, resubmitted if the pool is
+    terminated under it because of another document.
+    """
+
+    def __init__(self, source, start, stop, split_from, deadline):
+        self.args = (source, start, stop, PDF_MAX_PAGES)
+        self.split_from = split_from
+        self.deadline = deadline
+        self._submit()
+
+    def _remaining(self):
+        return self.deadline - time.monotonic()
+
+    def _submit(self):
+        while True:
+            self.pool = _get_pool()
+            try:
+                self.future = self.pool.submit(_extract_pages, *self.args, max(self._remaining(), 0.1),
+                                               self.split_from)
+                return
+            except (BrokenProcessPool, RuntimeError):
+                # Killed by another request between _get_pool() and submit()
+                _kill_pool(self.pool)
+
+    def result(self):
+        """
+        Wait for the task's result.
+
+        Returns:
+            tuple: (page count, list of page texts or None)
+
+        Raises:
+            PDFRejectedError: If this document overran its time limit or crashed the parser
+        """
+        while True:
+            try:
+                return self.future.result(timeout=max(self._remaining(), 0) + _KILL_GRACE)
+            except FuturesTimeoutError:
+                # The worker ignored its alarm (stuck inside PyMuPDF)
+                _kill_pool(self.pool, overrun=True)
+                raise _timed_out()
+            except (BrokenProcessPool, CancelledError):
+                if self.pool not in _overrun_pools:
+                    # A process crashed; any document in flight may be the cause
+                    _kill_pool(self.pool)
+                    return self._run_alone()
+            if self._remaining() <= 0:
+                raise _timed_out()
+            self._submit()
+
+    def _run_alone(self):
+        """Retry in a throwaway single-process pool, so a crash there is this document's own."""
+        pool = _new_pool(1)
+        try:
+            future = pool.submit(_extract_pages, *self.args, max(self._remaining(), 0.1), self.split_from)
+            return future.result(timeout=max(self._remaining(), 0) + _KILL_GRACE)
+        except FuturesTimeoutError:
+            raise _timed_out()
+        except BrokenProcessPool:
+            raise PDFRejectedError("PDF parser crashed while reading this file")
+        finally:
+            _kill_pool(pool)
+
+
+def extract_text(source):
+    """
+    Extract text from a PDF in the sandboxed pool.
+
+    Args:
+        source (bytes or str): Raw PDF content, or a path to a PDF file
+
+    Returns:
+        str: Extracted text, pages separated by PAGE_BREAK
+
+    Raises:
+        PDFRejectedError: If the PDF exceeds a limit or crashes the parser
+        Exception: If the PDF can't be parsed
+    """
+    deadline = time.monotonic() + PDF_PARSE_TIMEOUT
+
+    try:
+        if not PDF_POOL_ENABLED:
+            _, pages = _extract_pages(source, 0, None, PDF_MAX_PAGES, None, math.inf)
+            return PAGE_BREAK.join(pages).strip()
+
+        page_count, pages = _Task(source, 0, None, PDF_PARALLEL_MIN_PAGES, deadline).result()
+
+        if pages is None:
+            # Long document: one chunk of pages per pool process, sharing the remaining time
+            chunk = math.ceil(page_count / PDF_POOL_WORKERS)
+            tasks = [_Task(source, start, start + chunk, 0, deadline) for start in range(0, page_count, chunk)]
+            pages = []
+            for task in tasks:
+                pages.extend(task.result()[1])
+
+    except PDFRejectedError:
+        raise
+
+    except Exception as e:
+        raise Exception(f"Error parsing PDF: {str(e)}")
+
+    return PAGE_BREAK.join(pages).strip()
@@ -0,0 +1,349 @@
+"""
+Job-provider orchestration: circuit breakers and hedged requests.
+Each provider has a per-worker circuit breaker that opens when too many
+recent calls failed, skips the provider while open, and lets a single
+probe through once the cool-down has passed. The chain calls the first
+available provider and, if it hasn't answered within
+PROVIDER_HEDGE_DELAY seconds (or has failed), also calls the next one;
+the first successful answer wins. The whole search gives up after
+PROVIDER_CHAIN_DEADLINE seconds, so a dead provider can't stall it. A
+provider whose quota is used up is passed over without counting
+against its breaker.
+search_async does the same with coroutines for the async pipeline.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from provider_quota import QuotaExhaustedError
+from structured_logging import in_context
+
+log = logging.getLogger(__name__)
+
+PROVIDER_HEDGING = os.getenv('PROVIDER_HEDGING', 'true').lower() == 'true'
+PROVIDER_HEDGE_DELAY = float(os.getenv('PROVIDER_HEDGE_DELAY', 3))  # seconds before the backup starts
+PROVIDER_CHAIN_DEADLINE = float(os.getenv('PROVIDER_CHAIN_DEADLINE', 12))  # seconds for the whole search
+PROVIDER_CHAIN_WORKERS = int(os.getenv('PROVIDER_CHAIN_WORKERS', 8))
+
+BREAKER_WINDOW = float(os.getenv('BREAKER_WINDOW', 60))  # seconds of outcomes considered
+BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', 4))  # outcomes needed before it can open
+BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', 0.5))
+BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', 30))  # cool-down before a probe
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class ProvidersUnavailableError(Exception):
+    """Raised when no provider answered: all failed, were skipped by their breakers or missed the deadline."""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding time window."""
+
+    def __init__(self, name, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS,
+                 failure_rate=BREAKER_FAILURE_RATE, open_seconds=BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque()  # (time, succeeded)
+        self._opened_at = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go out now; in half-open state only one probe at a time."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, succeeded):
+        """Record a call's outcome and open or close the breaker accordingly."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if succeeded:
+                    log.info("Provider recovered, circuit closed", extra={'provider': self.name})
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+
+            self._outcomes.append((now, succeeded))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                log.warning("Provider failing, circuit open",
+                            extra={'provider': self.name, 'failures': failures, 'calls': len(self._outcomes)})
+                self._open(now)
+
+    def release(self):
+        """Give back a half-open probe slot taken by a call that never reached the provider."""
+        with self._lock:
+            self._probing = False
+
+    def _open(self, now):
+        self.state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': sum(1 for _, ok in self._outcomes if not ok)
+            }
+
+
+_breakers = {}
+_pool = None
+_pid = None
+_lock = threading.Lock()
+
+
+def _check_pid():
+    """Drop breakers and the pool inherited from a parent process (call with _lock held)."""
+    global _pool, _pid
+    pid = os.getpid()
+    if _pid != pid:
+        _pid = pid
+        _breakers.clear()
+        _pool = ThreadPoolExecutor(max_workers=PROVIDER_CHAIN_WORKERS, thread_name_prefix='provider-chain')
+
+
+def get_breaker(name):
+    """Return this worker's circuit breaker for a provider, creating it on first use."""
+    with _lock:
+        _check_pid()
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def _get_pool():
+    with _lock:
+        _check_pid()
+        return _pool
+
+
+def _call(breaker, fetch):
+    try:
+        result = fetch()
+    except QuotaExhaustedError:
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(True)
+    return result
+
+
+def search(providers, hedge_delay=None, deadline=PROVIDER_CHAIN_DEADLINE):
+    """
+    Run a job search against a chain of providers.
+
+    Same as search_with_provider, without the name of the provider that answered.
+
+    Returns:
+        list: Listings from the first provider that succeeded
+
+    Raises:
+        ProvidersUnavailableError: If no provider answered in time
+    """
+    return search_with_provider(providers, hedge_delay, deadline)[1]
+
+
+def search_with_provider(providers, hedge_delay=None, deadline=PROVIDER_CHAIN_DEADLINE):
+    """
+    Run a job search against a chain of providers and say which one answered.
+
+    Providers are tried in order. The next one is started when the current
+    one fails, or when it has not answered within hedge_delay seconds; the
+    first successful answer is returned. Calls that lose the race keep
+    running in the background and still fill the job cache and index.
+
+    Args:
+        providers (list): (name, fetch) pairs, most preferred first; fetch
+            is a zero-argument function returning a list of listings
+        hedge_delay (float): Seconds to wait before hedging, None for
+            PROVIDER_HEDGE_DELAY (hedging off if PROVIDER_HEDGING is false)
+        deadline (float): Seconds to wait for any answer
+
+    Returns:
+        tuple: (provider name, listings) of the first provider that succeeded
+
+    Raises:
+        ProvidersUnavailableError: If no provider answered in time
+    """
+    if hedge_delay is None:
+        hedge_delay = PROVIDER_HEDGE_DELAY if PROVIDER_HEDGING else deadline
+
+    pool = _get_pool()
+    give_up_at = time.monotonic() + deadline
+    remaining = list(providers)
+    running = {}
+    errors = []
+
+    def start_next():
+        while remaining:
+            name, fetch = remaining.pop(0)
+            breaker = get_breaker(name)
+            if not breaker.allow():
+                log.info("Skipping provider: circuit open", extra={'provider': name, 'sample': True})
+                continue
+            if running:
+                log.info("Hedging with the next provider", extra={'provider': name, 'sample': True})
+            running[pool.submit(in_context(_call), breaker, fetch)] = name
+            return True
+        return False
+
+    start_next()
+    while running:
+        now = time.monotonic()
+        if now >= give_up_at:
+            break
+        timeout = min(give_up_at - now, hedge_delay) if remaining else give_up_at - now
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        if not done:
+            # Slow answer: hedge with the next provider (nothing happens once the chain is used up)
+            start_next()
+            continue
+
+        for future in done:
+            name = running.pop(future)
+            try:
+                return name, future.result()
+            except Exception as e:
+                log.warning("Provider call failed: %s", e, extra={'provider': name})
+                errors.append(e)
+        # A provider failed: move on to the next one right away
+        start_next()
+
+    if running:
+        names = ", ".join(running.values())
+        raise ProvidersUnavailableError(f"No job provider answered within {deadline:g}s (waiting on {names})")
+    if errors:
+        raise ProvidersUnavailableError(f"All job providers failed; last error: {errors[-1]}")
+    raise ProvidersUnavailableError("No job provider available")
+
+
+async def _call_async(breaker, fetch):
+    try:
+        result = await fetch()
+    except QuotaExhaustedError:
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(True)
+    return result
+
+
+_background_tasks = set()
+
+
+async def search_async(providers, hedge_delay=None, deadline=PROVIDER_CHAIN_DEADLINE):
+    """
+    Async version of search: fetch is a zero-argument coroutine function.
+
+    Calls that lose the race keep running as background tasks, as in search.
+
+    Returns:
+        list: Listings from the first provider that succeeded
+
+    Raises:
+        ProvidersUnavailableError: If no provider answered in time
+    """
+    if hedge_delay is None:
+        hedge_delay = PROVIDER_HEDGE_DELAY if PROVIDER_HEDGING else deadline
+
+    give_up_at = time.monotonic() + deadline
+    remaining = list(providers)
+    running = {}
+    errors = []
+
+    def start_next():
+        while remaining:
+            name, fetch = remaining.pop(0)
+            breaker = get_breaker(name)
+            if not breaker.allow():
+                log.info("Skipping provider: circuit open", extra={'provider': name, 'sample': True})
+                continue
+            if running:
+                log.info("Hedging with the next provider", extra={'provider': name, 'sample': True})
+            task = asyncio.ensure_future(_call_async(breaker, fetch))
+            # Keep losing calls referenced until they finish, and don't log their errors as unretrieved
+            _background_tasks.add(task)
+            task.add_done_callback(_finish_background)
+            running[task] = name
+            return
+
+    start_next()
+    while running:
+        now = time.monotonic()
+        if now >= give_up_at:
+            break
+        timeout = min(give_up_at - now, hedge_delay) if remaining else give_up_at - now
+        done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+        if not done:
+            start_next()
+            continue
+
+        for task in done:
+            name = running.pop(task)
+            try:
+                return task.result()
+            except Exception as e:
+                log.warning("Provider call failed: %s", e, extra={'provider': name})
+                errors.append(e)
+        start_next()
+
+    if running:
+        names = ", ".join(running.values())
+        raise ProvidersUnavailableError(f"No job provider answered within {deadline:g}s (waiting on {names})")
+    if errors:
+        raise ProvidersUnavailableError(f"All job providers failed; last error: {errors[-1]}")
+    raise ProvidersUnavailableError("No job provider available")
+
+
+def _finish_background(task):
+    _background_tasks.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+def get_stats():
+    """
+    Return the circuit breaker state of every provider used by this worker.
+
+    Returns:
+        dict: {provider: {'state', 'recent_calls', 'recent_failures'}}
+    """
+    with _lock:
+        _check_pid()
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
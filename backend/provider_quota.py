@@ -0,0 +1,199 @@
+"""
+Shared call quotas for the job providers.
+Each provider with a monthly quota gets a token bucket stored in SQLite,
+so every gunicorn worker draws from the same budget. A bucket holds at
+most <PROVIDER>_QUOTA_BURST calls and refills evenly over the month at
+<PROVIDER>_MONTHLY_QUOTA calls per 30 days. A call that finds its bucket
+empty raises QuotaExhaustedError instead of going out; the job cache then
+serves an expired entry and the provider chain moves on to the next
+provider.
+"""
+import logging
+import os
+import time
+
+from metrics import QUOTA_DECISIONS, increment
+from storage import get_connection
+
+log = logging.getLogger(__name__)
+
+PROVIDER_QUOTA_ENABLED = os.getenv('PROVIDER_QUOTA_ENABLED', 'true').lower() == 'true'
+QUOTA_PERIOD = 30 * 24 * 3600  # seconds over which the monthly quota refills
+
+# Adzuna's free tier allows 100 calls a month; 0 means no quota
+_DEFAULT_MONTHLY_QUOTA = {'adzuna': 100}
+_DEFAULT_BURST = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_buckets (
+    provider TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quota_counters (
+    provider TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (provider, name)
+);
+"""
+
+
+class QuotaExhaustedError(Exception):
+    """Raised instead of a provider call when the provider's shared quota is used up."""
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f"{provider} quota exhausted, next call allowed in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def _connection():
+    return get_connection('provider_quota', _SCHEMA)
+
+
+def get_limits(provider):
+    """
+    Return a provider's quota settings.
+
+    Returns:
+        tuple: (calls per month, bucket size); calls per month is 0 when
+        the provider has no quota
+    """
+    name = provider.upper()
+    monthly = float(os.getenv(f'{name}_MONTHLY_QUOTA', _DEFAULT_MONTHLY_QUOTA.get(provider, 0)))
+    burst = float(os.getenv(f'{name}_QUOTA_BURST', min(_DEFAULT_BURST, monthly) or 1))
+    return monthly, max(burst, 1)
+
+
+def _refilled(tokens, updated_at, now, monthly, burst):
+    return min(burst, tokens + (now - updated_at) * monthly / QUOTA_PERIOD)
+
+
+def _count(conn, provider, name):
+    conn.execute(
+        "INSERT INTO quota_counters (provider, name, value) VALUES (?, ?, 1) "
+        "ON CONFLICT (provider, name) DO UPDATE SET value = value + 1",
+        (provider, name)
+    )
+
+
+def _take(provider, monthly, burst):
+    """
+    Take one token from the provider's bucket in a single write transaction.
+
+    Returns:
+        float: 0 if a token was taken, else seconds until the next one
+    """
+    conn = _connection()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT tokens, updated_at FROM quota_buckets WHERE provider = ?", (provider,)
+        ).fetchone()
+        tokens = burst if row is None else _refilled(row[0], row[1], now, monthly, burst)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) * QUOTA_PERIOD / monthly
+
+        conn.execute(
+            "INSERT OR REPLACE INTO quota_buckets (provider, tokens, updated_at) VALUES (?, ?, ?)",
+            (provider, tokens, now)
+        )
+        _count(conn, provider, 'denied' if wait else 'granted')
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return wait
+
+
+def acquire(provider):
+    """
+    Spend one call of a provider's shared quota; call right before the request goes out.
+
+    Quota storage errors let the call through rather than blocking searches.
+
+    Args:
+        provider (str): Provider name, e.g. 'adzuna'
+
+    Raises:
+        QuotaExhaustedError: If the provider's bucket is empty
+    """
+    if not PROVIDER_QUOTA_ENABLED:
+        return
+    monthly, burst = get_limits(provider)
+    if monthly <= 0:
+        return
+
+    try:
+        wait = _take(provider, monthly, burst)
+    except Exception as e:
+        log.warning("Quota check failed, allowing the call: %s", e, extra={'provider': provider})
+        return
+
+    increment(QUOTA_DECISIONS, provider=provider, decision='denied' if wait else 'granted')
+    if wait:
+        log.info("Provider quota exhausted", extra={'provider': provider, 'retry_after': round(wait), 'sample': True})
+        raise QuotaExhaustedError(provider, wait)
+
+
+def remaining(provider):
+    """
+    Return how many calls a provider's bucket holds right now, without spending any.
+
+    Returns:
+        float or None: Calls available, None if the provider has no quota
+    """
+    monthly, burst = get_limits(provider)
+    if not PROVIDER_QUOTA_ENABLED or monthly <= 0:
+        return None
+    try:
+        row = _connection().execute(
+            "SELECT tokens, updated_at FROM quota_buckets WHERE provider = ?", (provider,)
+        ).fetchone()
+    except Exception as e:
+        log.warning("Quota read failed: %s", e, extra={'provider': provider})
+        return None
+    if row is None:
+        return burst
+    return _refilled(row[0], row[1], time.time(), monthly, burst)
+
+
+def get_stats():
+    """
+    Return the quota state of every provider that has a quota.
+
+    Returns:
+        dict: {provider: {'monthly_quota', 'burst', 'tokens', 'granted', 'denied'}}
+    """
+    stats = {}
+    try:
+        conn = _connection()
+        buckets = {
+            provider: (tokens, updated_at)
+            for provider, tokens, updated_at in conn.execute("SELECT provider, tokens, updated_at FROM quota_buckets")
+        }
+        counters = conn.execute("SELECT provider, name, value FROM quota_counters").fetchall()
+    except Exception as e:
+        log.warning("Quota stats read failed: %s", e)
+        return stats
+
+    now = time.time()
+    for provider in set(_DEFAULT_MONTHLY_QUOTA) | set(buckets):
+        monthly, burst = get_limits(provider)
+        if monthly <= 0:
+            continue
+        tokens = burst
+        if provider in buckets:
+            tokens = _refilled(*buckets[provider], now, monthly, burst)
+        stats[provider] = {'monthly_quota': monthly, 'burst': burst, 'tokens': round(tokens, 2),
+                           'granted': 0, 'denied': 0}
+    for provider, name, value in counters:
+        if provider in stats:
+            stats[provider][name] = value
+    return stats
@@ -1,29 +1,85 @@
 """
 Resume Parser using PyMuPDF (fitz) for fast PDF text extraction.
+fitz is imported on first use, so processes that only need PAGE_BREAK
+(e.g. web workers that hand PDFs to pdf_pool) don't load it.
 """
-import fitz  # PyMuPDF
+
+
+# Separates pages in the extracted text so later stages (e.g. text_compactor) can see page boundaries
+PAGE_BREAK = "\f"
+
+
+def open_pdf(source):
+    """
+    Open a PDF with PyMuPDF.
+
+    Args:
+        source (bytes or str): Raw PDF content, or a path to a PDF file
+
+    Returns:
+        fitz.Document: The open document; close() it when done
+    """
+    import fitz  # PyMuPDF
+
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def extract_pages(doc, start=0, stop=None):
+    """
+    Extract the text of pages [start, stop) of an open document.
+
+    Args:
+        doc (fitz.Document): Open document
+        start (int): First page, 0-based
+        stop (int): Page after the last one; None for the end of the document
+
+    Returns:
+        list: One string per page
+    """
+    stop = len(doc) if stop is None else min(stop, len(doc))
+    return [doc[page_num].get_text() for page_num in range(start, stop)]
+
+
+def _extract_text(doc):
+    """Join the text of every page of an open document, separated by PAGE_BREAK."""
+    try:
+        return PAGE_BREAK.join(extract_pages(doc)).strip()
+
+    finally:
+        doc.close()
 
 
 def extract_text_from_pdf(pdf_path):
     """
     Extract text from a PDF file using PyMuPDF.
-    
+
     Args:
         pdf_path (str): Path to the PDF file
-        
+
     Returns:
         str: Extracted text from all pages
     """
     try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text += page.get_text()
-        
-        doc.close()
-        return text.strip()
-    
+        return _extract_text(open_pdf(pdf_path))
+
+    except Exception as e:
+        raise Exception(f"Error parsing PDF: {str(e)}")
+
+
+def extract_text_from_bytes(pdf_bytes):
+    """
+    Extract text from an in-memory PDF without touching the filesystem.
+
+    Args:
+        pdf_bytes (bytes): Raw PDF content, e.g. an uploaded file's bytes
+
+    Returns:
+        str: Extracted text from all pages
+    """
+    try:
+        return _extract_text(open_pdf(pdf_bytes))
+
     except Exception as e:
         raise Exception(f"Error parsing PDF: {str(e)}")
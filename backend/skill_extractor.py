@@ -0,0 +1,289 @@
+"""
+Local, deterministic skill extractor.
+Matches a curated skills taxonomy against resume text with one compiled
+trie-shaped regular expression, so the whole resume is scanned in a
+single pass inside the regex engine. Used to pre-fill skills before the
+Gemini call, as a degraded mode when Gemini is slow or down, and to
+cross-check the skills Gemini returns.
+"""
+import re
+
+# Canonical skill name -> aliases (matched case-insensitively, canonical name included)
+SKILLS = {
+    # Languages
+    "Python": ["python3"],
+    "Java": ["core java", "java 8", "java se"],
+    "JavaScript": ["js", "es6", "ecmascript"],
+    "TypeScript": [],
+    "C++": ["cpp"],
+    "C#": ["c sharp", "csharp"],
+    "C": ["c programming", "c language"],
+    "Go": ["golang"],
+    "Rust": [],
+    "Kotlin": [],
+    "Swift": [],
+    "PHP": [],
+    "Ruby": [],
+    "Scala": [],
+    "R": ["r programming", "r language", "rstudio"],
+    "MATLAB": [],
+    "Dart": [],
+    "Bash": ["shell scripting", "shell script"],
+    "SQL": ["mysql", "postgresql", "postgres", "sqlite", "pl/sql", "t-sql", "oracle sql"],
+    "HTML": ["html5"],
+    "CSS": ["css3", "sass", "scss"],
+    # Frontend
+    "React": ["react.js", "reactjs", "react js"],
+    "Angular": ["angular.js", "angularjs"],
+    "Vue.js": ["vue", "vuejs"],
+    "Next.js": ["nextjs"],
+    "Redux": [],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Bootstrap": [],
+    "jQuery": [],
+    # Backend
+    "Node.js": ["nodejs", "node js"],
+    "Express.js": ["expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring Boot": ["springboot", "spring framework"],
+    "ASP.NET": [".net", "dotnet", ".net core", "asp.net core"],
+    "Laravel": [],
+    "Ruby on Rails": ["rails"],
+    "GraphQL": [],
+    "REST APIs": ["rest api", "restful", "restful apis"],
+    "Microservices": ["microservice"],
+    # Mobile
+    "Android": ["android development"],
+    "iOS": ["ios development"],
+    "Flutter": [],
+    "React Native": [],
+    # Data & ML
+    "Machine Learning": ["ml"],
+    "Deep Learning": [],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": ["opencv"],
+    "TensorFlow": ["tensorflow 2", "keras"],
+    "PyTorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Data Analysis": ["data analytics"],
+    "Data Visualization": ["matplotlib", "seaborn", "plotly"],
+    "Statistics": ["statistical analysis"],
+    "Power BI": ["powerbi"],
+    "Tableau": [],
+    "Excel": ["ms excel", "microsoft excel", "advanced excel"],
+    "Apache Spark": ["spark", "pyspark"],
+    "Hadoop": [],
+    "Generative AI": ["genai", "llm", "llms", "large language models"],
+    "LangChain": [],
+    # Databases
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Firebase": [],
+    "Elasticsearch": [],
+    "Cassandra": [],
+    # Cloud & DevOps
+    "AWS": ["amazon web services", "ec2", "aws lambda"],
+    "Azure": ["microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Docker": [],
+    "Kubernetes": ["k8s"],
+    "Terraform": [],
+    "Jenkins": [],
+    "CI/CD": ["ci cd", "continuous integration"],
+    "Git": ["github", "gitlab", "bitbucket"],
+    "Linux": ["unix", "ubuntu"],
+    # Testing
+    "Selenium": [],
+    "Unit Testing": ["pytest", "junit", "jest", "unittest"],
+    # Design & other
+    "Figma": [],
+    "UI/UX Design": ["ui/ux", "ux design", "ui design", "user experience"],
+    "Data Structures": ["data structures and algorithms", "dsa"],
+    "Algorithms": [],
+    "Object-Oriented Programming": ["oop", "oops", "object oriented programming"],
+    "Agile": ["agile methodology", "agile development", "scrum", "kanban"],
+    "Cybersecurity": ["cyber security", "network security", "information security"],
+    "Networking": ["computer networks", "tcp/ip"],
+    "Blockchain": ["solidity", "web3"],
+    "SEO": ["search engine optimization"],
+    "Digital Marketing": [],
+    # Soft skills
+    "Communication": ["communication skills"],
+    "Leadership": ["team lead", "led a team"],
+    "Teamwork": ["team player", "collaboration"],
+    "Problem Solving": ["problem-solving"],
+}
+
+# Role -> skills that indicate it (order of roles breaks ties)
+ROLES = {
+    "Software Developer": ["Python", "Java", "C++", "C#", "Go", "Data Structures", "Algorithms",
+                           "Object-Oriented Programming", "Git"],
+    "Frontend Developer": ["JavaScript", "TypeScript", "React", "Angular", "Vue.js", "Next.js",
+                           "HTML", "CSS", "Redux", "Tailwind CSS"],
+    "Backend Developer": ["Node.js", "Express.js", "Django", "Flask", "FastAPI", "Spring Boot",
+                          "ASP.NET", "SQL", "MongoDB", "REST APIs", "Microservices", "Redis"],
+    "Full Stack Developer": ["React", "Node.js", "Express.js", "MongoDB", "JavaScript", "Django",
+                             "HTML", "CSS", "SQL"],
+    "Python Developer": ["Python", "Django", "Flask", "FastAPI", "Pandas"],
+    "Java Developer": ["Java", "Spring Boot", "Microservices", "SQL"],
+    "Data Analyst": ["SQL", "Excel", "Power BI", "Tableau", "Data Analysis", "Data Visualization",
+                     "Statistics", "Pandas"],
+    "Data Scientist": ["Python", "Machine Learning", "Statistics", "Pandas", "NumPy", "scikit-learn",
+                       "Deep Learning", "R"],
+    "Machine Learning Engineer": ["Machine Learning", "Deep Learning", "TensorFlow", "PyTorch",
+                                  "scikit-learn", "Natural Language Processing", "Computer Vision",
+                                  "Generative AI"],
+    "Data Engineer": ["Apache Spark", "Hadoop", "SQL", "Python", "AWS", "Cassandra"],
+    "DevOps Engineer": ["Docker", "Kubernetes", "AWS", "Azure", "Terraform", "Jenkins", "CI/CD", "Linux"],
+    "Cloud Engineer": ["AWS", "Azure", "Google Cloud", "Terraform", "Docker", "Kubernetes"],
+    "Android Developer": ["Android", "Kotlin", "Java", "Firebase"],
+    "iOS Developer": ["iOS", "Swift"],
+    "Mobile App Developer": ["Flutter", "React Native", "Dart", "Android", "iOS"],
+    "QA Engineer": ["Selenium", "Unit Testing"],
+    "UI/UX Designer": ["Figma", "UI/UX Design"],
+    "Cybersecurity Analyst": ["Cybersecurity", "Networking", "Linux"],
+    "Blockchain Developer": ["Blockchain"],
+    "Digital Marketing Executive": ["SEO", "Digital Marketing"],
+}
+
+SOFT_SKILLS = {"Communication", "Leadership", "Teamwork", "Problem Solving"}
+
+# Canonical names that are ordinary words or initials on their own; only their aliases are matched
+AMBIGUOUS_NAMES = {"C", "R", "Go", "Excel", "Agile"}
+
+# Characters that may not touch a match on either side ("java" must not match inside "javascript",
+# ".net" must not match inside "asp.net", "c" must not match the "c" of "c++")
+_WORD_CHARS = r"\w+#"
+
+
+def _build_trie_pattern(phrases):
+    """Compile phrases into a regex whose alternations share common prefixes."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node):
+        end = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Optional suffix is greedy, so the longest alias is tried first
+        return '(?:' + body + ')?' if end else body
+
+    return emit(trie)
+
+
+def _build_matcher():
+    alias_to_skill = {}
+    matchable = []
+    for skill, aliases in SKILLS.items():
+        for alias in [skill] + aliases:
+            alias_to_skill[alias.lower()] = skill
+            if alias not in AMBIGUOUS_NAMES:
+                matchable.append(alias.lower())
+
+    # The leading lookahead on the possible first characters lets the regex engine skip
+    # most positions before evaluating the boundary check and the trie
+    first_chars = "".join(sorted({re.escape(alias[0]) for alias in matchable}))
+    pattern = (
+        rf"(?=[{first_chars}])(?<![{_WORD_CHARS}.])("
+        + _build_trie_pattern(matchable)
+        + rf")(?![{_WORD_CHARS}]|\.\w)"
+    )
+    return re.compile(pattern, re.IGNORECASE), alias_to_skill
+
+
+_MATCHER, _ALIAS_TO_SKILL = _build_matcher()
+
+
+def extract_skills(resume_text):
+    """
+    Find taxonomy skills mentioned in the resume.
+
+    Args:
+        resume_text (str): Extracted resume text
+
+    Returns:
+        list: Canonical skill names, most frequently mentioned first
+    """
+    counts = {}
+    for match in _MATCHER.finditer(resume_text):
+        skill = _ALIAS_TO_SKILL.get(match.group(1).lower())
+        if skill:
+            counts[skill] = counts.get(skill, 0) + 1
+
+    # Stable sort keeps first-mention order among equally frequent skills
+    return sorted(counts, key=lambda skill: -counts[skill])
+
+
+def suggest_roles(skills, limit=4):
+    """
+    Rank taxonomy roles by how many of their indicator skills were found.
+
+    Args:
+        skills (list): Canonical skill names
+        limit (int): Maximum number of roles to return
+
+    Returns:
+        list: Role names, best match first
+    """
+    found = set(skills)
+    scored = []
+    for order, (role, indicators) in enumerate(ROLES.items()):
+        hits = len(found.intersection(indicators))
+        if hits:
+            scored.append((-hits, -hits / len(indicators), order, role))
+    return [role for *_, role in sorted(scored)[:limit]]
+
+
+def local_analysis(resume_text):
+    """
+    Build an analysis in the same shape as ai_analyzer.analyze_resume, without an LLM.
+
+    Args:
+        resume_text (str): Extracted resume text
+
+    Returns:
+        dict: skills, weaknesses, suitable_roles and experience_level
+    """
+    skills = extract_skills(resume_text)
+    roles = suggest_roles(skills)
+    return {
+        "skills": skills,
+        "weaknesses": ["Detailed feedback is unavailable right now - please try again later"],
+        "suitable_roles": roles or ["Software Developer"],
+        "experience_level": "unknown"
+    }
+
+
+def cross_check(llm_skills, local_skills):
+    """
+    Compare the skills Gemini returned with the locally extracted ones.
+
+    Args:
+        llm_skills (list): Skills from the LLM analysis
+        local_skills (list): Skills from extract_skills
+
+    Returns:
+        dict: 'confirmed' (found by both), 'llm_only' (possibly inferred or
+            hallucinated) and 'local_only' (mentioned but missed by the LLM)
+    """
+    local = set(local_skills)
+    llm_canonical = {}
+    for skill in llm_skills:
+        llm_canonical[skill] = _ALIAS_TO_SKILL.get(skill.lower(), skill)
+
+    matched = set(llm_canonical.values())
+    return {
+        "confirmed": [skill for skill, canonical in llm_canonical.items() if canonical in local],
+        "llm_only": [skill for skill, canonical in llm_canonical.items() if canonical not in local],
+        "local_only": [skill for skill in local_skills if skill not in matched and skill not in SOFT_SKILLS]
+    }
@@ -0,0 +1,45 @@
+"""
+Shared SQLite storage helpers.
+Every gunicorn worker opens the same database files, so anything stored
+here (caches, counters) is visible to all workers on the machine.
+"""
+import os
+import sqlite3
+import threading
+
+DATA_DIR = os.getenv('CAREERUP_DATA_DIR', 'data')
+
+_local = threading.local()
+
+
+def get_connection(name, schema=None):
+    """
+    Return a connection to the shared database DATA_DIR/<name>.sqlite3.
+
+    Connections are cached per thread and per process, so a worker that
+    was forked from a parent never reuses the parent's connection.
+
+    Args:
+        name (str): Database name (without extension)
+        schema (str): Optional SQL script run when the connection is opened
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode with WAL enabled
+    """
+    pid = os.getpid()
+    if getattr(_local, 'pid', None) != pid:
+        _local.pid = pid
+        _local.connections = {}
+
+    conn = _local.connections.get(name)
+    if conn is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        path = os.path.join(DATA_DIR, f"{name}.sqlite3")
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if schema:
+            conn.executescript(schema)
+        _local.connections[name] = conn
+
+    return conn
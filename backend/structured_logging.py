@@ -0,0 +1,225 @@
+"""
+Non-blocking structured logging.
+configure() sends every record through a handler that only puts it on a
+bounded in-memory queue; a background thread formats the records, one
+JSON object per line (plain text with LOG_FORMAT=text), and writes them
+to stdout. A request never waits on a slow log sink: when the queue is
+full the record is dropped and counted instead.
+
+Each record carries the request ID and analysis stage it was logged
+under, taken from context variables that the apps set per request and
+metrics.RequestTimings sets per stage. Work submitted to thread pools
+keeps them when wrapped with in_context().
+
+LOG_LEVELS sets per-module levels, e.g. "job_fetcher=WARNING,app=DEBUG".
+Records logged with extra={'sample': True} are the high-volume ones (one
+per provider call); below WARNING only LOG_SAMPLE_RATE of them are kept.
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from functools import partial
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.1))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+
+request_id = contextvars.ContextVar('request_id', default=None)
+stage = contextvars.ContextVar('stage', default=None)
+
+_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+# LogRecord attributes that aren't extra fields of the JSON output
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'sample', 'request_id', 'stage'
+}
+
+_handler = None
+_configure_lock = threading.Lock()
+
+
+def start_request(incoming=None):
+    """
+    Set the request ID for everything logged while handling the current request.
+
+    Args:
+        incoming (str): The client's X-Request-ID header, reused if well-formed
+
+    Returns:
+        str: The request ID
+    """
+    value = incoming if incoming and _REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex[:16]
+    request_id.set(value)
+    stage.set(None)
+    return value
+
+
+def in_context(function):
+    """Wrap a function submitted to a thread pool so it logs under the submitter's request ID and stage."""
+    return partial(contextvars.copy_context().run, function)
+
+
+class _ContextFilter(logging.Filter):
+    """Stamp records with the request ID and stage of the thread or task that logged them."""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        record.stage = stage.get()
+        return True
+
+
+class _Sampler(logging.Filter):
+    """Keep LOG_SAMPLE_RATE of the records marked sample=True, unless they are warnings or worse."""
+
+    def filter(self, record):
+        if getattr(record, 'sample', False) and record.levelno < logging.WARNING:
+            return random.random() < LOG_SAMPLE_RATE
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, with the extra= fields next to the standard ones."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'stage': getattr(record, 'stage', None)
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s%(stage_suffix)s] %(message)s')
+
+    def format(self, record):
+        record.request_id = getattr(record, 'request_id', None) or '-'
+        record.stage_suffix = f" {record.stage}" if getattr(record, 'stage', None) else ''
+        return super().format(record)
+
+
+class QueueWriterHandler(logging.Handler):
+    """
+    Hand records to a background writer thread through a bounded queue.
+
+    The writer thread and its queue are created on first use in each
+    process, so the handler keeps working in gunicorn workers forked
+    after it was configured.
+    """
+
+    def __init__(self, stream, max_size=LOG_QUEUE_SIZE):
+        super().__init__()
+        self.stream = stream
+        self.max_size = max_size
+        self.dropped = 0
+        self._queue = None
+        self._writer = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _records(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._start_lock:
+                if self._pid != pid:
+                    self._queue = queue.Queue(self.max_size)
+                    self._writer = threading.Thread(target=self._write, args=(self._queue,),
+                                                    name='log-writer', daemon=True)
+                    self._writer.start()
+                    self.dropped = 0
+                    self._pid = pid
+        return self._queue
+
+    def emit(self, record):
+        # Bind the arguments now: they may change once the caller moves on
+        record.msg, record.args = record.getMessage(), None
+        try:
+            self._records().put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, records):
+        while True:
+            record = records.get()
+            if record is None:
+                return
+            try:
+                self.stream.write(self.format(record) + "\n")
+                if records.empty():
+                    self.stream.flush()
+            except Exception:
+                self.handleError(record)
+
+    def close(self):
+        # Write out what is queued before the process exits
+        if self._pid == os.getpid():
+            try:
+                self._queue.put(None, timeout=1)
+                self._writer.join(timeout=2)
+            except queue.Full:
+                pass
+            self._pid = None
+        super().close()
+
+
+def _parse_levels(setting):
+    """Parse "module=LEVEL,other=LEVEL" into {module: LEVEL}."""
+    levels = {}
+    for entry in setting.split(','):
+        name, _, level = entry.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure():
+    """
+    Route logging through the queue writer; safe to call more than once.
+
+    Returns:
+        QueueWriterHandler: The handler, for its dropped-record count
+    """
+    global _handler
+
+    with _configure_lock:
+        if _handler is not None:
+            return _handler
+
+        handler = QueueWriterHandler(sys.stdout)
+        handler.setFormatter(TextFormatter() if LOG_FORMAT == 'text' else JSONFormatter())
+        handler.addFilter(_ContextFilter())
+        handler.addFilter(_Sampler())
+
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        for name, level in _parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        _handler = handler
+        return handler
+
+
+def get_stats():
+    """Return the writer's queue depth and how many records it dropped in this worker."""
+    if _handler is None or _handler._pid != os.getpid():
+        return {'queued': 0, 'dropped': 0}
+    return {'queued': _handler._queue.qsize(), 'dropped': _handler.dropped}
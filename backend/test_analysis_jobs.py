@@ -0,0 +1,100 @@
+"""
+Tests for analysis jobs whose worker stops, and for the progress stream's
+end states.
+Run from the backend directory:
+    python -m pytest test_analysis_jobs.py
+"""
+import threading
+import time
+from functools import partial
+
+import pytest
+
+import analysis_jobs
+import storage
+
+
+@pytest.fixture(autouse=True)
+def scratch_database(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    # Connections are cached per thread: drop the ones opened on another test's database
+    storage._local.pid = None
+
+
+def _wait_for(job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = analysis_jobs.get_job(job_id)
+        if job['status'] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job never became {status}: {job}")
+
+
+def test_job_of_a_dead_worker_is_marked_failed(monkeypatch):
+    monkeypatch.setattr(analysis_jobs, 'ANALYSIS_JOB_STALE_AFTER', 0.2)
+    job_id = analysis_jobs.submit(lambda progress: progress('parse') or {})
+    _wait_for(job_id, 'done')
+
+    # A job left 'running' by a worker that was killed: nothing updates it any more
+    now = time.time()
+    storage.get_connection('analysis_jobs').execute(
+        "INSERT INTO analysis_jobs (id, status, stage, stages, created_at, updated_at) "
+        "VALUES ('orphan', 'running', 'gemini', '[]', ?, ?)", (now, now)
+    )
+    assert analysis_jobs.get_job('orphan')['status'] == 'running'
+
+    time.sleep(0.3)
+    job = analysis_jobs.get_job('orphan')
+    assert job['status'] == 'failed'
+    assert job['error'] == analysis_jobs.ORPHANED_ERROR
+    assert analysis_jobs.get_job('orphan')['stages'][-1]['stage'] == 'failed'
+
+
+def test_heartbeat_keeps_a_long_job_alive(monkeypatch):
+    monkeypatch.setattr(analysis_jobs, 'ANALYSIS_JOB_HEARTBEAT', 0.05)
+    monkeypatch.setattr(analysis_jobs, 'ANALYSIS_JOB_STALE_AFTER', 0.3)
+    # A fresh pool, so its heartbeat thread runs with the short interval
+    monkeypatch.setattr(analysis_jobs, '_executor', None)
+    release = threading.Event()
+
+    def slow_analysis(progress):
+        progress('gemini')
+        release.wait(5)
+        return {'ok': True}
+
+    job_id = analysis_jobs.submit(slow_analysis)
+    _wait_for(job_id, 'running')
+    time.sleep(0.8)  # well past ANALYSIS_JOB_STALE_AFTER with no stage change
+    assert analysis_jobs.get_job(job_id)['status'] == 'running'
+
+    release.set()
+    assert _wait_for(job_id, 'done')['result'] == {'ok': True}
+
+
+@pytest.fixture
+def client():
+    import app
+    return app.app.test_client()
+
+
+def test_stream_ends_with_timeout_event(monkeypatch, client):
+    monkeypatch.setattr(analysis_jobs, 'iter_progress',
+                        partial(analysis_jobs.iter_progress, poll_interval=0.01, timeout=0.2))
+    release = threading.Event()
+    job_id = analysis_jobs.submit(lambda progress: release.wait(5) and {})
+    try:
+        response = client.get(f"/api/analyze/jobs/{job_id}/events", environ_overrides={'wsgi.multithread': True})
+        events = [line for line in response.get_data(as_text=True).splitlines() if line.startswith('event:')]
+        assert events[-1] == 'event: timeout'
+    finally:
+        release.set()
+
+
+def test_single_threaded_worker_only_offers_polling(client):
+    job_id = analysis_jobs.submit(lambda progress: {})
+
+    response = client.get(f"/api/analyze/jobs/{job_id}/events", environ_overrides={'wsgi.multithread': False})
+
+    assert response.status_code == 501
+    assert response.get_json()['status_url'] == f"/api/analyze/jobs/{job_id}"
@@ -0,0 +1,66 @@
+"""
+Tests for batch analysis' failure reporting: a failed shared job search
+and unreadable zip members must show up in the affected resumes' results.
+Run from the backend directory:
+    python -m pytest test_batch_analysis.py
+"""
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_analysis import SharedJobSearch, iter_uploaded_pdfs
+
+
+def _analysis(role):
+    return {'success': True, 'analysis': {'skills': ['Python'], 'suitable_roles': [role]}, 'jobs': []}
+
+
+def test_failed_shared_search_flags_every_resume_sharing_it():
+    def fetch_jobs(skills, job_roles):
+        if job_roles[0] == 'Data Analyst':
+            return [{'title': 'Data Analyst'}]
+        raise RuntimeError("providers down")
+
+    shared = SharedJobSearch(fetch_jobs)
+
+    def analyze(role):
+        result = _analysis(role)
+        result['jobs'] = shared(['Python'], [role])
+        return shared.annotate(result)
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(analyze, ['Backend Developer'] * 3 + ['Data Analyst']))
+
+    failed, ok = results[:3], results[3]
+    assert all(result['jobs'] == [] and 'providers down' in result['jobs_error'] for result in failed)
+    assert ok['jobs'] == [{'title': 'Data Analyst'}] and 'jobs_error' not in ok
+    assert (shared.searches, shared.reused, shared.failed) == (2, 2, 1)
+
+
+class _Upload:
+    """The parts of a FileStorage that iter_uploaded_pdfs uses."""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.stream = io.BytesIO(data)
+
+
+def _zip_with_corrupt_member():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        archive.writestr('broken.pdf', b'%PDF-1.4 broken')
+        archive.writestr('good.pdf', b'%PDF-1.4 good')
+    data = bytearray(buffer.getvalue())
+    # Flip a byte of broken.pdf's stored content so its CRC check fails on read
+    offset = data.index(b'%PDF-1.4 broken')
+    data[offset] ^= 0xFF
+    return bytes(data)
+
+
+def test_unreadable_zip_member_is_reported_and_the_batch_goes_on():
+    results = list(iter_uploaded_pdfs([_Upload('resumes.zip', _zip_with_corrupt_member())], 1 << 20))
+
+    (broken, data, error), good = results
+    assert broken == 'broken.pdf' and data is None
+    assert error.startswith('Could not read this file from the zip')
+    assert good == ('good.pdf', b'%PDF-1.4 good', None)
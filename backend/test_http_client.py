@@ -0,0 +1,109 @@
+"""
+Tests for provider call retries: every attempt that goes upstream runs
+before_attempt, which the fetchers use to spend provider quota.
+Run from the backend directory:
+    python -m pytest test_http_client.py
+"""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_client
+import job_fetcher_adzuna
+from provider_quota import QuotaExhaustedError
+
+
+class _FlakyProvider(BaseHTTPRequestHandler):
+    """Answers 503 to the first `failures` requests, then a one-listing Adzuna response."""
+
+    failures = 0
+    requests = 0
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests += 1
+        if cls.requests <= cls.failures:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({'results': [{'title': 'Python Developer', 'company': {'display_name': 'Acme'}}]})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    monkeypatch.setattr(http_client, 'PROVIDER_BACKOFF_FACTOR', 0)
+    monkeypatch.setattr(http_client, 'PROVIDER_MAX_RETRIES', 2)
+    _FlakyProvider.failures = _FlakyProvider.requests = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyProvider)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield _FlakyProvider, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_every_retry_runs_before_attempt(provider):
+    handler, url = provider
+    handler.failures = 2
+    attempts = []
+
+    response = http_client.get(url, before_attempt=lambda: attempts.append(1), timeout=5)
+
+    assert response.status_code == 200
+    assert len(attempts) == handler.requests == 3
+
+
+def test_async_retries_run_before_attempt(provider):
+    handler, url = provider
+    handler.failures = 1
+    attempts = []
+
+    async def fetch():
+        try:
+            return await http_client.async_get_json(url, before_attempt=lambda: attempts.append(1))
+        finally:
+            await http_client.close_async_session()
+
+    assert asyncio.run(fetch())['results']
+    assert len(attempts) == handler.requests == 2
+
+
+def test_adzuna_search_spends_quota_per_attempt(provider, monkeypatch):
+    handler, url = provider
+    handler.failures = 2
+    spent = []
+    monkeypatch.setattr(job_fetcher_adzuna, 'ADZUNA_SEARCH_URL', url)
+    monkeypatch.setattr(job_fetcher_adzuna, 'ingest_quietly', lambda jobs, source: None)
+    monkeypatch.setattr(job_fetcher_adzuna, 'acquire', spent.append)
+
+    jobs = job_fetcher_adzuna._search_adzuna('python', 10, 'id', 'key')
+
+    assert len(jobs) == 1
+    assert spent == ['adzuna'] * 3
+
+
+def test_exhausted_quota_stops_the_retries(provider, monkeypatch):
+    handler, url = provider
+    handler.failures = 5
+    spent = []
+
+    def acquire(provider_name):
+        if spent:
+            raise QuotaExhaustedError(provider_name, 60)
+        spent.append(provider_name)
+
+    monkeypatch.setattr(job_fetcher_adzuna, 'ADZUNA_SEARCH_URL', url)
+    monkeypatch.setattr(job_fetcher_adzuna, 'acquire', acquire)
+
+    with pytest.raises(QuotaExhaustedError):
+        job_fetcher_adzuna._search_adzuna('python', 10, 'id', 'key')
+    assert handler.requests == 1
@@ -0,0 +1,98 @@
+"""
+Tests for job_pages' paging through provider results: every listing a
+provider returns is served exactly once, and paging stops after the
+provider's last (short) page, for both Adzuna and JSearch.
+Run from the backend directory:
+    python -m pytest test_job_pages.py
+"""
+import pytest
+
+import job_cache
+import job_fetcher
+import job_fetcher_adzuna
+import job_pages
+
+
+def _listings(provider, page, count):
+    # Distinct companies and descriptions so no two listings are near-duplicates
+    return [{
+        'title': f"Python Developer {provider} {page}-{index}",
+        'company': f"Company {provider} {page}-{index}",
+        'location': "Bangalore, India",
+        'description': f"Listing {index} of page {page} from {provider}, reference {page * 1000 + index}",
+        'apply_link': f"https://example.com/{provider}/{page}/{index}",
+        'employment_type': "Full-time"
+    } for index in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def no_shared_state(monkeypatch):
+    """Call the stubbed providers directly: no job cache, no background prefetch."""
+    monkeypatch.setattr(job_cache, 'JOB_CACHE_ENABLED', False)
+    monkeypatch.setattr(job_pages, 'JOBS_PREFETCH', False)
+
+
+def _walk(query, **credentials):
+    """Follow next_cursor to the end; return the titles served and the number of pages."""
+    titles, cursor, pages = [], None, 0
+    while True:
+        result = job_pages.fetch_page(query, cursor, **credentials)
+        titles.extend(job['title'] for job in result['jobs'])
+        pages += 1
+        cursor = result['next_cursor']
+        if cursor is None:
+            return titles, pages
+
+
+def test_adzuna_pages_serve_every_listing(monkeypatch):
+    # Share of the requested listings returned: two full provider pages, then a short last one
+    filled = {1: 1, 2: 1, 3: 0.4}
+    calls = []
+
+    def search(what, results_per_page, app_id, app_key, employment_type=None, page=1, location=None):
+        calls.append((what, results_per_page, page))
+        count = round(results_per_page * filled.get(page, 0))
+        return _listings(f"adzuna-{employment_type or 'jobs'}", page, count)
+
+    monkeypatch.setattr(job_fetcher_adzuna, '_search_adzuna', search)
+    query = job_pages.parse_query({'skills': ['Python'], 'roles': ['Python Developer'], 'page_size': 10})
+
+    titles, _ = _walk(query, adzuna_credentials=('id', 'key'))
+
+    # No over-fetch: exactly JOBS_BATCH_SIZE jobs and half as many internships per page, and no page 4
+    assert {(per_page, page) for _, per_page, page in calls} == {
+        (30, 1), (30, 2), (30, 3), (15, 1), (15, 2), (15, 3)
+    }
+    # Every listing of every page was served once: (30 + 15) * 2 full pages + (12 + 6) from the short one
+    assert len(titles) == len(set(titles)) == 45 * 2 + 18
+
+
+def test_jsearch_pages_continue_past_the_first(monkeypatch):
+    counts = {1: 10, 2: 10, 3: 4}
+
+    def search(query, api_key, max_results, page=1, location=None, employment_type=None):
+        return _listings('jsearch', page, counts.get(page, 0))[:max_results]
+
+    monkeypatch.setattr(job_fetcher, '_search_jsearch', search)
+    query = job_pages.parse_query({'skills': ['Python'], 'roles': ['Python Developer'], 'page_size': 5})
+
+    titles, pages = _walk(query, jsearch_api_key='key')
+
+    assert len(titles) == len(set(titles)) == 24
+    assert pages == 5  # 2 pages of 5 per full provider page, then the 4 of the last one
+
+
+def test_deduplicated_full_page_keeps_paging(monkeypatch):
+    # A provider page that dedupes below its size still came back full: the next page must be asked for
+    def search(query, api_key, max_results, page=1, location=None, employment_type=None):
+        if page == 1:
+            return _listings('jsearch', 1, 1) * 10
+        return _listings('jsearch', page, 3 if page == 2 else 0)
+
+    monkeypatch.setattr(job_fetcher, '_search_jsearch', search)
+    query = job_pages.parse_query({'skills': ['Python'], 'page_size': 10})
+
+    titles, pages = _walk(query, jsearch_api_key='key')
+
+    assert pages == 2
+    assert len(titles) == 4
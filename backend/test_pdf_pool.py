@@ -0,0 +1,84 @@
+"""
+Tests for pdf_pool's failure isolation: a PDF that hangs inside PyMuPDF
+must be rejected without failing the other documents on the pool.
+Run from the backend directory:
+    python -m pytest test_pdf_pool.py
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+import pdf_pool
+from benchmarks.resume_pdfs import make_resume_pdf
+from pdf_pool import PDFRejectedError
+from resume_parser import extract_text_from_bytes
+
+PARSE_TIMEOUT = 3
+
+
+def make_hanging_pdf(text_ops=30_000_000):
+    """
+    Build a small PDF whose one page holds millions of text-showing operators.
+
+    get_text() spends many seconds inside MuPDF on it without returning to
+    Python, so the worker's alarm can't interrupt it and the pool has to
+    be killed: the same as a genuinely pathological upload.
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 50), "x", fontsize=8)
+    font = page.get_fonts()[0][4]
+    content = f"BT /{font} 1 Tf 1 0 0 1 10 10 Tm " + "(x) Tj " * text_ops + "ET"
+    doc.update_stream(page.get_contents()[0], content.encode())
+    data = doc.tobytes(deflate=True)
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def pool_settings(monkeypatch):
+    """Give each test its own pool with a short time limit, and tear it down afterwards."""
+    def configure(workers):
+        monkeypatch.setattr(pdf_pool, 'PDF_POOL_ENABLED', True)
+        monkeypatch.setattr(pdf_pool, 'PDF_POOL_WORKERS', workers)
+        monkeypatch.setattr(pdf_pool, 'PDF_PARSE_TIMEOUT', PARSE_TIMEOUT)
+        pdf_pool.warm_up()
+
+    yield configure
+    if pdf_pool._pool is not None:
+        pdf_pool._kill_pool(pdf_pool._pool)
+
+
+def _extract_after(delay, source):
+    time.sleep(delay)
+    return pdf_pool.extract_text(source)
+
+
+def test_hanging_pdf_alongside_good_pdf(pool_settings):
+    pool_settings(workers=2)
+    # Slow but well within the limit (about a second), and still parsing when the hanging one's pool is killed
+    slow_pdf = make_hanging_pdf(3_000_000)
+
+    with ThreadPoolExecutor(2) as threads:
+        hanging = threads.submit(pdf_pool.extract_text, make_hanging_pdf())
+        good = threads.submit(_extract_after, PARSE_TIMEOUT + pdf_pool._KILL_GRACE - 0.5, slow_pdf)
+
+        with pytest.raises(PDFRejectedError, match="longer than"):
+            hanging.result()
+        assert good.result() == extract_text_from_bytes(slow_pdf)
+
+
+def test_queued_pdf_is_resubmitted_after_kill(pool_settings):
+    # One process: the good PDF waits behind the hanging one and is cancelled when the pool is killed
+    pool_settings(workers=1)
+    good_pdf = make_resume_pdf(1, seed=2)
+
+    with ThreadPoolExecutor(2) as threads:
+        hanging = threads.submit(pdf_pool.extract_text, make_hanging_pdf())
+        good = threads.submit(_extract_after, PARSE_TIMEOUT / 2, good_pdf)
+
+        with pytest.raises(PDFRejectedError, match="longer than"):
+            hanging.result()
+        assert good.result() == extract_text_from_bytes(good_pdf)
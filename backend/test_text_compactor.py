@@ -0,0 +1,51 @@
+"""
+Tests for text_compactor's header/footer removal.
+Run from the backend directory:
+    python -m pytest test_text_compactor.py
+"""
+from resume_parser import PAGE_BREAK
+from text_compactor import compact_resume_text
+
+
+def _resume(*pages):
+    return PAGE_BREAK.join("\n".join(lines) for lines in pages)
+
+
+def test_two_page_education_keeps_lines_that_differ_only_in_digits():
+    text = _resume(
+        ["Asha Verma", "asha@example.com", "EDUCATION", "B.Tech Computer Science",
+         "2017 - 2021", "CGPA: 8.4/10"],
+        ["Higher Secondary", "2015 - 2017", "CGPA: 9.1/10", "SKILLS", "Python, SQL"]
+    )
+
+    compacted, stats = compact_resume_text(text)
+
+    for line in ("2017 - 2021", "CGPA: 8.4/10", "2015 - 2017", "CGPA: 9.1/10"):
+        assert line in compacted.splitlines()
+    assert stats['lines_removed'] == 0
+
+
+def test_running_footer_with_page_numbers_is_dropped():
+    body = [["EXPERIENCE", "Backend Engineer at Acme", "Built billing services in Python"],
+            ["PROJECTS", "Job board", "Rank listings by relevance"],
+            ["EDUCATION", "B.Tech Computer Science", "2017 - 2021"]]
+    text = _resume(*(lines + [f"Asha Verma - Page {number} of 3"] for number, lines in enumerate(body, 1)))
+
+    compacted, _ = compact_resume_text(text)
+
+    # The first copy stays (it carries the name); the others go
+    assert compacted.count("Asha Verma - Page") == 1
+    assert "2017 - 2021" in compacted
+
+
+def test_repeated_line_in_the_middle_of_pages_is_kept():
+    middle = "Python, SQL, Docker"
+    text = _resume(
+        ["Asha Verma", "SKILLS", "Tools", middle, "Languages", "English", "Hindi"],
+        ["PROJECTS", "Job board", "Stack", middle, "Dates", "2022", "2023"],
+        ["EXPERIENCE", "Acme", "Stack", middle, "Dates", "2023", "2024"]
+    )
+
+    compacted, _ = compact_resume_text(text)
+
+    assert compacted.count(middle) == 3
@@ -0,0 +1,210 @@
+"""
+Token-budgeted resume text compaction.
+Runs between PDF parsing and the Gemini call: collapses whitespace, drops
+headers/footers repeated on every page and common boilerplate, detects
+resume sections and, if the text is still over budget, keeps the
+highest-priority sections first. Fewer input tokens means a faster and
+cheaper Gemini call.
+"""
+import math
+import os
+import re
+
+from resume_parser import PAGE_BREAK
+
+RESUME_COMPACTION = os.getenv('RESUME_COMPACTION', 'true').lower() == 'true'
+COMPACT_TOKEN_BUDGET = int(os.getenv('COMPACT_TOKEN_BUDGET', 2000))
+
+# Bump when the compaction rules change, so cached analyses of old compactions aren't reused
+COMPACTION_VERSION = "3"
+
+# Section -> heading keywords. A heading is a short line made of one of these phrases.
+SECTION_HEADINGS = {
+    'summary': ['summary', 'profile', 'professional summary', 'career objective', 'objective', 'about me'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core competencies', 'technologies',
+               'tech stack', 'tools', 'skills and tools', 'technical expertise'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment history',
+                   'internships', 'internship', 'work history'],
+    'projects': ['projects', 'academic projects', 'personal projects', 'key projects'],
+    'education': ['education', 'academic background', 'academics', 'qualifications',
+                  'educational qualifications'],
+    'certifications': ['certifications', 'certificates', 'courses', 'training', 'licenses'],
+    'achievements': ['achievements', 'awards', 'honors', 'accomplishments', 'publications'],
+    'activities': ['extracurricular activities', 'activities', 'volunteering', 'leadership',
+                   'positions of responsibility'],
+    'interests': ['interests', 'hobbies', 'languages'],
+    'declaration': ['declaration', 'references'],
+}
+
+# Sections kept first when trimming to the budget; 'header' is the text before the first heading
+SECTION_PRIORITY = ['header', 'skills', 'experience', 'projects', 'summary', 'education',
+                    'certifications', 'achievements', 'activities', 'other', 'interests']
+
+# Sections that never help the analysis
+DROPPED_SECTIONS = {'declaration'}
+
+_HEADING_TO_SECTION = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+
+# Page numbers ("3", "Page 3", "3 of 5", "Page 3/5") are matched only as short whole lines, so lines
+# that are just a year, phone number or other figure are kept
+_BOILERPLATE = re.compile(
+    r"^((page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?|curriculum vitae|resume|r[eé]sum[eé]|"
+    r"references available (up)?on request\.?)$",
+    re.IGNORECASE
+)
+# Page numbers inside a header or footer line ("Page 2", "Page 2 of 3", "2 of 3")
+_PAGE_NUMBER = re.compile(r"\bpage\s*\d{1,3}(\s*(of|/)\s*\d{1,3})?\b|\b\d{1,3}\s+of\s+\d{1,3}\b", re.IGNORECASE)
+# Lines at the top and at the bottom of each page that may be a running header or footer
+_EDGE_LINES = 3
+_SPACES = re.compile(r"[ \t\u00a0]+")
+
+
+def estimate_tokens(text):
+    """Estimate Gemini tokens for text (about four characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+def compaction_signature(token_budget=COMPACT_TOKEN_BUDGET):
+    """Identify the compaction settings, for use in cache keys."""
+    if not RESUME_COMPACTION:
+        return "raw"
+    return f"compact-v{COMPACTION_VERSION}-{token_budget}"
+
+
+def _heading_section(line):
+    """Return the section a heading line starts, or None if the line isn't a heading."""
+    if len(line) > 40:
+        return None
+    key = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    key = " ".join(key.split())
+    return _HEADING_TO_SECTION.get(key)
+
+
+def _clean_pages(text):
+    """Split into pages of whitespace-collapsed, non-empty lines."""
+    pages = []
+    for page in text.split(PAGE_BREAK):
+        lines = [_SPACES.sub(" ", line).strip() for line in page.splitlines()]
+        pages.append([line for line in lines if line])
+    return pages
+
+
+def _edge_indexes(page):
+    """Indexes of the lines of a page that can be part of its header or footer."""
+    return set(range(min(_EDGE_LINES, len(page)))) | set(range(max(len(page) - _EDGE_LINES, 0), len(page)))
+
+
+def _line_key(line, mask_page_numbers):
+    key = line.lower()
+    return _PAGE_NUMBER.sub("page #", key) if mask_page_numbers else key
+
+
+def _repeated_lines(pages):
+    """
+    Find running headers and footers: lines at the top or bottom of most pages.
+
+    Page numbers are masked when comparing lines only from three pages up;
+    on two pages a line must repeat exactly, so e.g. the date ranges of an
+    education section split over both pages are not taken for a footer.
+
+    Returns:
+        tuple: (set of repeated line keys, whether the keys mask page numbers)
+    """
+    mask = len(pages) >= 3
+    if len(pages) < 2:
+        return set(), mask
+
+    seen_on = {}
+    for page in pages:
+        for key in {_line_key(page[index], mask) for index in _edge_indexes(page)}:
+            seen_on[key] = seen_on.get(key, 0) + 1
+
+    threshold = max(2, math.ceil(len(pages) * 0.6))
+    return {key for key, count in seen_on.items() if count >= threshold}, mask
+
+
+def compact_resume_text(text, token_budget=COMPACT_TOKEN_BUDGET):
+    """
+    Compact resume text to fit a token budget.
+
+    Args:
+        text (str): Text from resume_parser (pages separated by PAGE_BREAK)
+        token_budget (int): Maximum estimated tokens to keep
+
+    Returns:
+        tuple: (compacted text, stats dict with tokens_before, tokens_after,
+            lines_removed, sections and truncated_sections)
+    """
+    tokens_before = estimate_tokens(text)
+    pages = _clean_pages(text)
+    repeated, mask = _repeated_lines(pages)
+
+    # Walk all lines once: drop repeated headers/footers (keeping their first
+    # occurrence, which usually carries the candidate's name and contact details)
+    # and boilerplate, and group the rest into sections.
+    sections = [['header', []]]
+    kept_repeated = set()
+    total_lines = 0
+
+    for page in pages:
+        edges = _edge_indexes(page)
+        for index, line in enumerate(page):
+            total_lines += 1
+            key = _line_key(line, mask) if index in edges else None
+            if key in repeated:
+                if key in kept_repeated:
+                    continue
+                kept_repeated.add(key)
+            if _BOILERPLATE.match(line):
+                continue
+
+            section = _heading_section(line)
+            if section:
+                sections.append([section, [line]])
+            else:
+                sections[-1][1].append(line)
+
+    sections = [(name, lines) for name, lines in sections if lines and name not in DROPPED_SECTIONS]
+    kept_lines = sum(len(lines) for _, lines in sections)
+
+    # Grant the budget to sections in priority order; output keeps document order
+    budget = token_budget
+    allowed = {}
+    truncated = []
+
+    def priority(index):
+        name = sections[index][0]
+        return SECTION_PRIORITY.index(name) if name in SECTION_PRIORITY else SECTION_PRIORITY.index('other')
+
+    for index in sorted(range(len(sections)), key=priority):
+        name, lines = sections[index]
+        kept = []
+        for line in lines:
+            cost = estimate_tokens(line) + 1  # + newline
+            if cost > budget:
+                break
+            kept.append(line)
+            budget -= cost
+        if len(kept) < len(lines):
+            truncated.append(name)
+            if name != 'header' and len(kept) == 1:
+                # Only the heading fit; drop it and give its tokens back
+                budget += estimate_tokens(kept[0]) + 1
+                kept = []
+        allowed[index] = kept
+
+    compacted = "\n".join(
+        "\n".join(allowed[index]) for index in range(len(sections)) if allowed.get(index)
+    )
+
+    stats = {
+        'tokens_before': tokens_before,
+        'tokens_after': estimate_tokens(compacted),
+        'token_budget': token_budget,
+        'lines_removed': total_lines - kept_lines,
+        'sections': [name for name, _ in sections],
+        'truncated_sections': truncated,
+    }
+    return compacted, stats